@@ -4,7 +4,7 @@ _termsaver () {
   cur="${COMP_WORDS[COMP_CWORD]}"
   prev="${COMP_WORDS[COMP_CWORD-1]}"
   if [[ ${cur} == -* ]]; then
-    opts="--help --verbose"
+    opts="--help --verbose --capabilities"
   else
     opts="asciiartfarts clock img2ascii jokes4all matrix programmer quotes4all randtxt rfc rssfeed urlfetcher starwars sysmon"
   fi
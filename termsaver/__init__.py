@@ -49,7 +49,8 @@ import errno
 import sys
 from signal import SIGINT, signal
 
-from termsaver.termsaverlib import common, constants, exception
+from termsaver.termsaverlib import (capabilities, common, constants,
+                                   exception, registry)
 from termsaver.termsaverlib.helper.smartformatter import SmartFormatter
 from termsaver.termsaverlib.helper.utilities import (hide_stdout_cursor,
                                                      show_stdout_cursor)
@@ -57,8 +58,7 @@ from termsaver.termsaverlib.i18n import _
 #
 # Internal modules
 #
-from termsaver.termsaverlib.screen import (build_screen_usage_list,
-                                           get_available_screens)
+from termsaver.termsaverlib.screen import build_screen_usage_list
 from termsaver.termsaverlib.screen.base import ScreenBase
 from termsaver.termsaverlib.screen.helper import ScreenHelperBase
 
@@ -87,13 +87,16 @@ Screens:
 
 Options:
 
- -h, --help     Displays this help message
- -v, --verbose  Displays python exception errors (for debugging)
+ -h, --help          Displays this help message
+ -v, --verbose       Displays python exception errors (for debugging)
+ --capabilities      Displays the optional modules detected (and enabled
+                     features)
 
 Enhanced Features:
  * Install the following modules to enable enhanced features:
     * pynput - Enables the 'Press any key to exit' feature.
     * pygments - Colorizes the output of the Programmer screen.
+ * Use --capabilities to check which of them are currently available.
 
 Refer also to each screen's help by typing: %(app_name)s [screen] -h
 """) % {
@@ -112,11 +115,9 @@ def handler(signal_received, frame):
     # Handle any cleanup here
     print('SIGINT or CTRL-C detected. Exiting gracefully')
     # if pygments is installed, reset the terminal colors to default
-    try:
+    if capabilities.is_available('pygments'):
         from pygments import formatters
         print(formatters.TerminalFormatter().reset)
-    except ImportError:
-        pass
     show_stdout_cursor()
     sys.exit(0)
             
@@ -127,7 +128,44 @@ def entryPoint():
     if tscreen:
         (screen, parser) = tscreen
         screen(parser=parser)._parse_args()
-        
+
+
+def sysmondEntryPoint():
+    """
+    The entry point of termsaver-sysmond, which samples the system metrics
+    shown by `termsaver sysmon --shared` (on a host with many instances of
+    it), so they only read them.
+    """
+    from termsaver.termsaverlib.helper.collectors import get_collectors
+    from termsaver.termsaverlib.helper.sampler import SharedSampler
+
+    parser = argparse.ArgumentParser(prog="termsaver-sysmond",
+        description=_("Samples the system metrics for the instances of "
+                      "'%(app_name)s sysmon --shared'.")
+                    % {'app_name': constants.App.NAME})
+    parser.add_argument("-d", "--delay", type=float, default=0.5,
+        help=_("Sets the seconds between two samples (must be the same "
+               "as the delay of sysmon). Default is 0.5 seconds."))
+    parser.add_argument("-c", "--collectors", default="system",
+        help=_("Sets the metrics sampled, as a comma-separated list of "
+               "collectors (must be the same as the ones of sysmon)."))
+    args = parser.parse_args()
+
+    try:
+        sampler = SharedSampler(args.delay, get_collectors(
+            [name.strip() for name in args.collectors.split(',')
+             if name.strip()] or ['system']))
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    try:
+        sampler.serve()
+    except KeyboardInterrupt:
+        pass
+    except (OSError, ValueError) as e:
+        parser.exit(errno.EPERM, "%s: %s\n" % (parser.prog, e))
+    finally:
+        sampler.stop()
+
 
 def getScreen():
     verbose = False
@@ -144,6 +182,7 @@ def getScreen():
                   action="store_true", dest="verbose", default=False,
                   help="Displays python exception errors (for debugging)")
         parser.add_argument("-h", "--help", action="store_true",dest="help",default=False)
+        parser.add_argument("--capabilities", action="store_true", dest="capabilities", default=False)
 
         # Override the default format/help/error functions so we only see the information we want
         parser.format_usage = skip
@@ -156,20 +195,20 @@ def getScreen():
         
         # Assign the important arguments on module init.
         verbose = True if args.verbose else False
+        if args.capabilities:
+            ScreenBase.usage_header()
+            print(capabilities.build_report())
+            show_stdout_cursor()
+            sys.exit(0)
+
         if args.screen == None or (args.screen == None and args.help == True):
             usage()
             show_stdout_cursor()
             sys.exit(0)
 
-        # Find the screen we're using and create it's parser as well as check validity with args.
-        parsers = {}
-        screenparsers = parser.add_subparsers()
-        screen = None
-        for s in get_available_screens():
-            # Create the parsers for each screen.
-            parsers[s.__name__.lower()] = screenparsers.add_parser(s.__name__.lower(), formatter_class=SmartFormatter, conflict_handler='resolve')
-            if s().name.lower() == args.screen:
-                screen = s
+        # Find the screen we're using from the registry (this only imports
+        # the module of the selected screen).
+        screen = registry.find_screen(args.screen)
 
         if screen == None:
             print(_("Invalid Screen."))
@@ -177,8 +216,9 @@ def getScreen():
             show_stdout_cursor()
             sys.exit(0)
 
-        # Pass the parser to the selected screen.
-        parser = parsers[screen.__name__.lower()]
+        # Create the parser of the selected screen only, and pass it to the
+        # screen (this is the only screen instance created).
+        parser = argparse.ArgumentParser(prog=screen.__name__.lower(), formatter_class=SmartFormatter, conflict_handler='resolve')
         
         # Display usage if screen is select but help is requested.
         if (args.screen != None and args.help == True):
@@ -35,8 +35,14 @@ The modules available in this package are:
 
     * `exceptions`: various exceptions classes to handle termsaver errors
 
+    * `capabilities`: detects optional third-party modules (without importing
+      them)
+
     * `i18n`: handles internationalization for termsaver application
 
+    * `registry`: keeps an on-disk manifest of the available screens, so
+      only the selected screen module needs to be imported
+
 This also contains the following sub-packages:
 
     * `screen`: holds all screens accessible by termsaver application. Also
@@ -0,0 +1,240 @@
+###############################################################################
+#
+# file:     capabilities.py
+#
+# Purpose:  detects optional third-party modules used by termsaver screens.
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Detects which optional third-party modules are available to termsaver,
+without importing them.
+
+Detection relies only on `importlib.util.find_spec`, which looks the module up
+in the import path and is much cheaper than actually importing it (or asking
+pip about it). Results are memoized for the lifetime of the process, so
+screens and helpers can call these functions as often as they like.
+
+The functions available here are:
+
+    * `is_available`: returns True if an optional module can be imported
+
+    * `get_version`: returns the installed version of an optional module,
+       based on its distribution metadata
+
+    * `detect_all`: probes all modules listed in `OPTIONAL_MODULES`
+
+    * `build_report`: builds a human-readable report of the detection, used
+       by the `--capabilities` command-line option
+
+    * `lazy_import`: returns a placeholder for a module that is only imported
+       when one of its attributes is first accessed
+"""
+
+#
+# Python built-in modules
+#
+import importlib
+import importlib.util
+import time
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib.i18n import _
+
+OPTIONAL_MODULES = {
+    'pynput': {
+        'distribution': 'pynput',
+        'feature': _("Enables the 'Press any key to exit' feature."),
+    },
+    'pygments': {
+        'distribution': 'pygments',
+        'feature': _("Colorizes the output of the Programmer screen."),
+    },
+    'PIL': {
+        'distribution': 'pillow',
+        'feature': _("Converts images for the Img2Ascii screen."),
+    },
+    'requests': {
+        'distribution': 'requests',
+        'feature': _("Fetches online images for the Img2Ascii screen."),
+    },
+}
+"""
+Holds the optional modules termsaver knows about, keyed by their import name,
+with the distribution name (as known by pip) and the feature they enable.
+"""
+
+__available = {}
+"""
+Memoized results of `is_available`, keyed by module name.
+"""
+
+__versions = {}
+"""
+Memoized results of `get_version`, keyed by module name.
+"""
+
+detection_time = 0.0
+"""
+Accumulated time, in seconds, spent probing modules with `is_available`.
+"""
+
+
+def is_available(module_name):
+    """
+    Returns True if the informed module can be imported, without actually
+    importing it. The result is memoized per process.
+
+    Arguments:
+
+        * module_name: the import name of the module (eg. 'PIL')
+    """
+    global detection_time
+
+    if module_name not in __available:
+        start = time.perf_counter()
+        try:
+            found = importlib.util.find_spec(module_name) is not None
+        except (ImportError, ValueError):
+            # parent package missing or broken module spec
+            found = False
+        __available[module_name] = found
+        detection_time += time.perf_counter() - start
+
+    return __available[module_name]
+
+
+def get_version(module_name):
+    """
+    Returns the installed version of the informed module, or None if it is
+    not available. The result is memoized per process.
+
+    Arguments:
+
+        * module_name: the import name of the module (eg. 'PIL')
+    """
+    if module_name not in __versions:
+        version = None
+        if is_available(module_name):
+            # only needed for reports, so the metadata module is loaded here
+            from importlib import metadata
+            distribution = OPTIONAL_MODULES.get(module_name, {}).get(
+                'distribution', module_name)
+            try:
+                version = metadata.version(distribution)
+            except metadata.PackageNotFoundError:
+                version = None
+        __versions[module_name] = version
+
+    return __versions[module_name]
+
+
+def detect_all():
+    """
+    Probes all modules listed in `OPTIONAL_MODULES`, returning a dictionary
+    with the module name as key and its availability as value.
+    """
+    return dict([(name, is_available(name)) for name in OPTIONAL_MODULES])
+
+
+def build_report():
+    """
+    Builds a human-readable report of the optional modules detected, and the
+    time it took to detect them.
+    """
+    detected = detect_all()
+    name_space = max([len(name) for name in detected])
+
+    lines = []
+    for name, found in detected.items():
+        if found:
+            status = _("found")
+            version = get_version(name)
+            if version:
+                status = "%s (%s)" % (status, version)
+        else:
+            status = _("not installed")
+        lines.append(" %s %s %s\n %s %s" % (
+            name, ' ' * (name_space - len(name)), status,
+            ' ' * (name_space + 1), OPTIONAL_MODULES[name]['feature']))
+
+    return _("""Optional modules:
+
+%(modules)s
+
+Detection took %(time).2f ms.""") % {
+        'modules': '\n'.join(lines),
+        'time': detection_time * 1000,
+    }
+
+
+class LazyModule(object):
+    """
+    A placeholder for a module that is only imported when one of its
+    attributes is accessed for the first time. Use `lazy_import` to create
+    instances of this class.
+
+    Accessed attributes are cached in the instance, so the cost of going
+    through the placeholder is only paid once per attribute.
+    """
+
+    def __init__(self, module_name):
+        """
+        Creates a new placeholder for the informed module (not imported yet).
+        """
+        self.__dict__['_LazyModule__name'] = module_name
+        self.__dict__['_LazyModule__module'] = None
+
+    def __getattr__(self, attribute):
+        """
+        Imports the module (if not yet done) and returns its attribute.
+        """
+        if self.__module is None:
+            self.__dict__['_LazyModule__module'] = \
+                importlib.import_module(self.__name)
+        value = getattr(self.__module, attribute)
+        self.__dict__[attribute] = value
+        return value
+
+    def __setattr__(self, attribute, value):
+        """
+        Sets the attribute in the actual module, importing it if needed.
+        """
+        setattr(importlib.import_module(self.__name), attribute, value)
+        self.__dict__.pop(attribute, None)
+
+    def __repr__(self):
+        return "<lazy module '%s'%s>" % (self.__name,
+            '' if self.__module is None else ' (loaded)')
+
+
+def lazy_import(module_name):
+    """
+    Returns a `LazyModule` for the informed module, which is only imported
+    when actually used. Use `is_available` before touching optional modules.
+
+    Arguments:
+
+        * module_name: the full import name of the module (eg. 'PIL.Image')
+    """
+    return LazyModule(module_name)
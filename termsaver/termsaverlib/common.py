@@ -157,6 +157,20 @@ def get_day_suffix(day):
         return 'th'
 
 
+def parse_duration(text):
+    """
+    Returns the seconds of a duration, such as 90s, 30m, 1h or 2d (or a
+    plain number of seconds). Raises ValueError if it is not valid.
+    """
+    units = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+    text = text.strip().lower()
+    scale = units.get(text[-1:], None)
+    seconds = float(text[:-1] if scale else text) * (scale or 1)
+    if not 0 < seconds < float('inf'):
+        raise ValueError("invalid duration: %s" % text)
+    return seconds
+
+
 def execute_shell(cmd, ignore_errors=False):
     """
     Simple routine to execute shell commands.
@@ -199,28 +213,17 @@ def get_cpu_usage(sleep_delay, ignore_errors=False):
             return float(cpu.strip()[:-1])
 
         else:
-            # linux
-            def getTimeList():
-                statFile = open("/proc/stat", "r")
-                timeList = statFile.readline().split(" ")[2:6]
-                statFile.close()
-                for i in range(len(timeList))  :
-                    timeList[i] = int(timeList[i])
-                return timeList
-            def deltaTime()  :
-                x = getTimeList()
-                time.sleep(sleep_delay)
-                y = getTimeList()
-                for i in range(len(x))  :
-                    y[i] -= x[i]
-                return y
-            dt = deltaTime()
-            if sum(dt) > 0:
-                cpu = 100 - (dt[len(dt) - 1] * 100.00 / sum(dt))
-            else:
-                cpu = 0
-
-            return cpu
+            # linux (imported here, as collectors depends on this module)
+            from termsaver.termsaverlib.helper import collectors
+
+            def get_cpu_times():
+                with open(os.path.join(collectors.PROC_ROOT, 'stat'),
+                          'r') as stat_file:
+                    return collectors.parse_cpu_times(stat_file.readline())
+
+            x = get_cpu_times()
+            time.sleep(sleep_delay)
+            return collectors.get_cpu_usage(x, get_cpu_times())
 
     except Exception as e:
         if not ignore_errors:
@@ -107,6 +107,21 @@ class Settings(PropertyClass):
     values between 0.01 and 0.001.
     """
 
+    TYPING_FRAME_SECONDS = 1.0 / 60
+    """
+    Defines the minimum interval between two writes of text being typed on
+    screen. Characters due within this interval are written all at once, so
+    the typing speed does not depend on the system timer precision. Default
+    value is 1/60 of a second.
+    """
+
+    STREAM_CHUNK_SIZE = 4096
+    """
+    Defines the size, in bytes, of the chunks read from files and URLs that
+    are typed on screen as they are read (see
+    `TypingHelperBase.typing_print_stream`). Default value is 4 KiB.
+    """
+
     FETCH_INTERVAL_SECONDS = 3600
     """
     Defines the interval between each fetching of data over the Internet.
@@ -0,0 +1,633 @@
+###############################################################################
+#
+# file:     collectors.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Collectors of system metrics (Linux only), sampled by `ProcSampler` for the
+system monitor screen.
+
+A collector reads its files (kept open, see `ProcFile`) once per sample, and
+returns a record with a fixed number of values (its `fields`), decided when
+the collector is created (eg. one per CPU core). Collectors also tell which
+of their fields are charted, and how a record is summarized in text.
+
+The built-in collectors (selected by their names) are:
+
+    * `system` (`SystemCollector`): CPU and memory usage (relative to the
+      limits of the container, if any, see `CgroupCollector`)
+
+    * `cores` (`CoresCollector`): usage of each CPU core
+
+    * `disk` (`DiskCollector`): disk reads and writes
+
+    * `net` (`NetCollector`): network traffic
+
+    * `load` (`LoadCollector`): load average
+
+    * `temp` (`HwmonCollector`): hardware temperature sensors
+
+The functions available here are:
+
+    * `get_collectors`: creates collectors by their names
+
+    * `parse_cpu_times`, `parse_mem_info`, `parse_cpu_max`: parse the
+      contents of /proc (and cgroup) files
+"""
+
+#
+# Python built-in modules
+#
+import glob
+import os
+import time
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib import common
+from termsaver.termsaverlib.helper.sampler import ProcFile
+
+PROC_ROOT = '/proc'
+"""
+The location of the proc file system.
+"""
+
+SYS_ROOT = '/sys'
+"""
+The location of the sys file system.
+"""
+
+CGROUP_ROOT = os.path.join('fs', 'cgroup')
+"""
+The location of the unified (v2) control group hierarchy, relative to the
+sys file system.
+"""
+
+SECTOR_SIZE = 512
+"""
+The size of the sectors counted in /proc/diskstats, in bytes (always 512,
+regardless of the device).
+"""
+
+
+def parse_cpu_times(line):
+    """
+    Returns the accumulated CPU times (user, nice, system, idle) of a line of
+    /proc/stat.
+    """
+    return [int(x) for x in line.split()[1:5]]
+
+
+def get_cpu_usage(previous, current):
+    """
+    Returns the CPU usage percentage between two results of
+    `parse_cpu_times`.
+    """
+    dt = [y - x for x, y in zip(previous, current)]
+    if sum(dt) > 0:
+        return 100 - (dt[-1] * 100.00 / sum(dt))
+    return 0
+
+
+def parse_mem_info(data):
+    """
+    Returns the total and free memory (in kB), from the contents of
+    /proc/meminfo.
+    """
+    lines = data.split(b'\n', 2)
+    if lines[0].startswith(b'MemTotal:') and lines[1].startswith(b'MemFree:'):
+        # the usual order, since the first kernels
+        return int(lines[0].split()[1]), int(lines[1].split()[1])
+    values = {}
+    for line in data.split(b'\n'):
+        fields = line.split()
+        if len(fields) > 1:
+            values[fields[0]] = int(fields[1])
+    return values[b'MemTotal:'], values[b'MemFree:']
+
+
+def parse_cpu_max(data):
+    """
+    Returns the number of CPUs allowed by the contents of the cpu.max file
+    of a control group ("quota period", in microseconds), or None if there
+    is no quota ("max").
+    """
+    values = data.split()
+    if not values or values[0] == b'max':
+        return None
+    period = int(values[1]) if len(values) > 1 else 100000
+    return int(values[0]) / float(period)
+
+
+class Collector(object):
+    """
+    The base class of collectors. Sub-classes define their `name`, `fields`
+    and `charts`, open their files on creation (with `open`), and implement
+    `sample` and `format`.
+    """
+
+    name = None
+    """
+    The name of the collector, used to select it (see `get_collectors`).
+    """
+
+    fields = ()
+    """
+    The names of the values of each record.
+    """
+
+    charts = ()
+    """
+    The fields charted, as tuples (field, title, unit). Fields with the '%'
+    unit can be charted on a fixed 0 ~ 100 scale.
+    """
+
+    clock = time.monotonic
+    """
+    The clock used to calculate rates (can be replaced, eg. for testing).
+    """
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        """
+        Creates the collector, opening its files. Raises OSError if they are
+        not available.
+
+        Arguments:
+
+            * root: the location of the proc file system
+
+            * sys_root: the location of the sys file system
+        """
+        self.root = root
+        self.sys_root = sys_root
+        self.files = []
+
+    def open(self, *path):
+        """
+        Opens a file of the proc file system (relative to `root`), kept open
+        until `close`.
+        """
+        proc_file = ProcFile(os.path.join(self.root, *path))
+        self.files.append(proc_file)
+        return proc_file
+
+    def sample(self):
+        """
+        Returns a record (a tuple of values, one per field) with the current
+        metrics.
+        """
+        raise NotImplementedError()
+
+    def format(self, record, gauge):
+        """
+        Returns a line of text summarizing a record. The `gauge` function
+        returns a symbol representing a percentage.
+        """
+        return ""
+
+    def close(self):
+        """
+        Closes the files of the collector.
+        """
+        for proc_file in self.files:
+            proc_file.close()
+
+
+class RateCollector(Collector):
+    """
+    The base class of collectors of accumulated counters (eg. bytes sent),
+    reported as rates per second between two samples (zero on the first).
+    """
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        Collector.__init__(self, root, sys_root)
+        self.__previous = None
+
+    def get_rates(self, counters, scale=1.0):
+        """
+        Returns the rates per second of the counters since the previous call,
+        multiplied by `scale`.
+        """
+        now = self.clock()
+        previous, self.__previous = self.__previous, (now, counters)
+        if previous is None or now <= previous[0]:
+            return [0.0] * len(counters)
+        dt = now - previous[0]
+        return [max(0, y - x) * scale / dt
+                for x, y in zip(previous[1], counters)]
+
+
+class SystemCollector(Collector):
+    """
+    Collects the CPU usage (since the previous sample) and memory usage of
+    the system, as percentages, and the total memory (in MB).
+    """
+
+    name = 'system'
+
+    fields = ('cpu', 'mem', 'total_mem')
+
+    charts = (('cpu', "CPU Monitor", '%'), ('mem', "MEM Monitor", '%'))
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        Collector.__init__(self, root, sys_root)
+        self.stat = self.open('stat')
+        self.meminfo = self.open('meminfo')
+        self.cpu_times = None
+
+    def sample(self):
+        data = self.stat.read()
+        cpu_times = parse_cpu_times(data[:data.index(b'\n')])
+        cpu = get_cpu_usage(self.cpu_times or [0] * len(cpu_times), cpu_times)
+        self.cpu_times = cpu_times
+
+        total, free = parse_mem_info(self.meminfo.read())
+        return (cpu, (total - free) * 100 / total, total / 1024)
+
+    def format(self, record, gauge):
+        return "%s  CPU: %s%%   %s  MEM: %s%% (total %sMB)" % (
+            gauge(record[0]), '%.1f' % record[0], gauge(record[1]),
+            record[1], int(record[2]))
+
+
+class MacSystemCollector(SystemCollector):
+    """
+    The `SystemCollector` for macOS (which has no proc file system), based
+    on the system commands (see `common.get_cpu_usage`).
+    """
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        Collector.__init__(self, root, sys_root)
+
+    def sample(self):
+        mem, total_mem = common.get_mem_usage()
+        return (common.get_cpu_usage(0), mem, total_mem)
+
+
+class CgroupCollector(RateCollector):
+    """
+    The `SystemCollector` of a container (or any process with limits set
+    through a unified (v2) control group), used instead of it when limits
+    are detected (see `is_limited`): the CPU usage is the share of the CPU
+    quota used by the group (see cpu.stat and cpu.max), and the memory usage
+    the share of its memory limit (see memory.current and memory.max), as
+    the ones of the system are meaningless against these limits. Limits not
+    set are the ones of the system (its CPUs, and its memory), and limits
+    are read on every sample, as they can be changed at any time.
+    """
+
+    name = 'system'
+
+    fields = ('cpu', 'mem', 'total_mem', 'cpus')
+
+    charts = SystemCollector.charts
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        RateCollector.__init__(self, root, sys_root)
+        self.path = self.get_path(root, sys_root)
+        self.cpu_stat = self.open_group('cpu.stat')
+        self.cpu_max = self.open_group('cpu.max')
+        self.memory_current = self.open_group('memory.current')
+        self.memory_max = self.open_group('memory.max')
+        self.meminfo = self.open('meminfo')
+
+        # the limits of the system (the CPUs listed in /proc/stat)
+        stat = ProcFile(os.path.join(root, 'stat'))
+        self.host_cpus = max(1, len(CoresCollector.parse(stat.read())))
+        stat.close()
+
+    @staticmethod
+    def get_path(root=PROC_ROOT, sys_root=SYS_ROOT):
+        """
+        Returns the location of the control group of this process (see
+        /proc/self/cgroup), or the root of the hierarchy (eg. the one of
+        the container) if it is not known, or not found under it (as in
+        containers without a cgroup namespace, where the path is the one
+        of the host).
+        """
+        path = os.path.join(sys_root, CGROUP_ROOT)
+        try:
+            with open(os.path.join(root, 'self', 'cgroup'), 'rb') as f:
+                for line in f:
+                    if line.startswith(b'0::'):
+                        group = os.path.join(
+                            path, line[3:].strip().decode().lstrip('/'))
+                        if os.path.isdir(group):
+                            return group
+                        break
+        except OSError:
+            pass
+        return path
+
+    @staticmethod
+    def is_limited(root=PROC_ROOT, sys_root=SYS_ROOT):
+        """
+        Returns True if this process runs in a control group (v2) with a
+        CPU quota or a memory limit.
+        """
+        path = CgroupCollector.get_path(root, sys_root)
+        try:
+            with open(os.path.join(path, 'cpu.max'), 'rb') as f:
+                cpus = parse_cpu_max(f.read())
+            with open(os.path.join(path, 'memory.max'), 'rb') as f:
+                memory = f.read().strip()
+        except (OSError, ValueError):
+            return False
+        return cpus is not None or memory != b'max'
+
+    def open_group(self, name):
+        """
+        Opens a file of the control group, kept open until `close`.
+        """
+        group_file = ProcFile(os.path.join(self.path, name))
+        self.files.append(group_file)
+        return group_file
+
+    def sample(self):
+        usage = 0
+        for line in self.cpu_stat.read().split(b'\n'):
+            if line.startswith(b'usage_usec '):
+                usage = int(line.split()[1])
+                break
+        cpus = parse_cpu_max(self.cpu_max.read()) or self.host_cpus
+        # CPU seconds used per second, out of the CPUs allowed
+        cpu = min(100.0, self.get_rates([usage], 1e-6)[0] * 100 / cpus)
+
+        limit = self.memory_max.read().strip()
+        if limit == b'max':
+            limit = parse_mem_info(self.meminfo.read())[0] * 1024
+        limit = max(1, int(limit))
+        mem = min(100.0, int(self.memory_current.read()) * 100.0 / limit)
+        return (cpu, mem, limit / 1048576.0, cpus)
+
+    def format(self, record, gauge):
+        return "%s  CPU: %.1f%% (of %g)   %s  MEM: %.1f%% (limit %dMB)" % (
+            gauge(record[0]), record[0], round(record[3], 2),
+            gauge(record[1]), record[1], int(record[2]))
+
+
+class CoresCollector(Collector):
+    """
+    Collects the usage of each CPU core (since the previous sample), and of
+    the busiest one, as percentages.
+    """
+
+    name = 'cores'
+
+    charts = (('busiest', "CPU Cores (busiest)", '%'),)
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        Collector.__init__(self, root, sys_root)
+        self.stat = self.open('stat')
+        self.cores = sorted(self.parse(self.stat.read()),
+                            key=lambda name: int(name[3:]))
+        self.fields = tuple(['busiest'] + self.cores)
+        self.cpu_times = {}
+
+    @staticmethod
+    def parse(data):
+        """
+        Returns the CPU times of each core in the contents of /proc/stat.
+        """
+        cores = {}
+        for line in data.split(b'\n')[1:]:
+            if not line.startswith(b'cpu'):
+                # the cores always come first
+                break
+            name = line[:line.index(b' ')].decode()
+            cores[name] = parse_cpu_times(line)
+        return cores
+
+    def sample(self):
+        cores = self.parse(self.stat.read())
+        usage = []
+        for name in self.cores:
+            # offline cores are missing
+            current = cores.get(name, [0] * 4)
+            usage.append(get_cpu_usage(
+                self.cpu_times.get(name, [0] * len(current)), current))
+        self.cpu_times = cores
+        return tuple([max(usage or [0])] + usage)
+
+    def format(self, record, gauge):
+        return "Cores: %s (busiest %.0f%%)" % (
+            ''.join([gauge(value) for value in record[1:]]), record[0])
+
+
+class DiskCollector(RateCollector):
+    """
+    Collects the reads and writes of the disks (in KB per second), and
+    their sum.
+    """
+
+    name = 'disk'
+
+    fields = ('io', 'read', 'write')
+
+    charts = (('io', "Disk I/O", 'KB/s'),)
+
+    ignored = ('loop', 'ram', 'zram', 'fd', 'sr')
+    """
+    The prefixes of block devices that are not (physical) disks.
+    """
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        RateCollector.__init__(self, root, sys_root)
+        self.diskstats = self.open('diskstats')
+        self.disks = None
+        try:
+            # whole disks only (partitions are not in /sys/block)
+            self.disks = set([name for name in
+                              os.listdir(os.path.join(sys_root, 'block'))
+                              if not name.startswith(self.ignored)])
+        except OSError:
+            pass
+
+    def sample(self):
+        read = write = 0
+        for line in self.diskstats.read().split(b'\n'):
+            fields = line.split()
+            if len(fields) < 10:
+                continue
+            name = fields[2].decode()
+            if self.disks is None and name.startswith(self.ignored) \
+                    or self.disks is not None and name not in self.disks:
+                continue
+            read += int(fields[5])
+            write += int(fields[9])
+        read, write = self.get_rates([read, write], SECTOR_SIZE / 1024.0)
+        return (read + write, read, write)
+
+    def format(self, record, gauge):
+        return "Disk: read %.0f KB/s  write %.0f KB/s" % record[1:]
+
+
+class NetCollector(RateCollector):
+    """
+    Collects the network traffic received and transmitted by all interfaces
+    but the loopback (in KB per second), and their sum.
+    """
+
+    name = 'net'
+
+    fields = ('traffic', 'rx', 'tx')
+
+    charts = (('traffic', "Network", 'KB/s'),)
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        RateCollector.__init__(self, root, sys_root)
+        self.dev = self.open('net', 'dev')
+
+    def sample(self):
+        rx = tx = 0
+        # the first two lines are headers
+        for line in self.dev.read().split(b'\n')[2:]:
+            name, __, counters = line.partition(b':')
+            counters = counters.split()
+            if len(counters) < 9 or name.strip() == b'lo':
+                continue
+            rx += int(counters[0])
+            tx += int(counters[8])
+        rx, tx = self.get_rates([rx, tx], 1 / 1024.0)
+        return (rx + tx, rx, tx)
+
+    def format(self, record, gauge):
+        return "Net: rx %.0f KB/s  tx %.0f KB/s" % record[1:]
+
+
+class LoadCollector(Collector):
+    """
+    Collects the load average of the system (1, 5 and 15 minutes).
+    """
+
+    name = 'load'
+
+    fields = ('load1', 'load5', 'load15')
+
+    charts = (('load1', "Load Average", ''),)
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        Collector.__init__(self, root, sys_root)
+        self.loadavg = self.open('loadavg')
+
+    def sample(self):
+        return tuple([float(x) for x in self.loadavg.read().split()[:3]])
+
+    def format(self, record, gauge):
+        return "Load: %.2f %.2f %.2f" % record
+
+
+class HwmonCollector(Collector):
+    """
+    Collects the temperature sensors of /sys/class/hwmon (in degrees
+    Celsius), and the highest one.
+    """
+
+    name = 'temp'
+
+    charts = (('max', "Temperature (max)", 'C'),)
+
+    def __init__(self, root=PROC_ROOT, sys_root=SYS_ROOT):
+        Collector.__init__(self, root, sys_root)
+        self.sensors = []
+        labels = []
+        for path in sorted(glob.glob(os.path.join(
+                sys_root, 'class', 'hwmon', 'hwmon*', 'temp*_input'))):
+            label = self.get_label(path)
+            self.sensors.append(ProcFile(path))
+            labels.append(label)
+        self.files.extend(self.sensors)
+        if not self.sensors:
+            raise OSError(2, "No temperature sensors found",
+                          os.path.join(sys_root, 'class', 'hwmon'))
+        self.fields = tuple(['max'] + labels)
+
+    @staticmethod
+    def get_label(path):
+        """
+        Returns the label of a sensor (its own, or the name of its device
+        followed by its number).
+        """
+        for label_path, prefix in ((path[:-len('input')] + 'label', ''),
+                                   (os.path.join(os.path.dirname(path),
+                                                 'name'), None)):
+            try:
+                with open(label_path) as f:
+                    label = f.read().strip()
+            except OSError:
+                continue
+            if prefix is None:
+                label += os.path.basename(path)[4:-len('_input')]
+            return label
+        return os.path.basename(path)[:-len('_input')]
+
+    def sample(self):
+        values = []
+        for sensor in self.sensors:
+            try:
+                values.append(int(sensor.read()) / 1000.0)
+            except (OSError, ValueError):
+                # some sensors fail while the device is suspended
+                values.append(0.0)
+        return tuple([max(values)] + values)
+
+    def format(self, record, gauge):
+        return "Temp: %s" % "  ".join(["%s %.0fC" % (label, value)
+                                       for label, value in
+                                       zip(self.fields[1:], record[1:])])
+
+
+COLLECTORS = dict([(collector.name, collector) for collector in (
+    SystemCollector, CoresCollector, DiskCollector, NetCollector,
+    LoadCollector, HwmonCollector)])
+"""
+The built-in collectors, by name.
+"""
+
+
+def get_collectors(names, root=PROC_ROOT, sys_root=SYS_ROOT):
+    """
+    Creates the collectors of the informed names (see `COLLECTORS`), in the
+    same order. Raises ValueError for unknown names, and OSError if the
+    files of a collector are not available.
+    """
+    collectors = []
+    try:
+        for name in names:
+            if name not in COLLECTORS:
+                raise ValueError("Unknown collector: %s" % name)
+            collector = COLLECTORS[name]
+            if collector is SystemCollector and common.is_macos():
+                collector = MacSystemCollector
+            elif collector is SystemCollector and \
+                    CgroupCollector.is_limited(root, sys_root):
+                # in a container, usage is relative to its limits
+                collector = CgroupCollector
+            collectors.append(collector(root, sys_root))
+    except (OSError, ValueError):
+        for collector in collectors:
+            collector.close()
+        raise
+    return collectors
@@ -0,0 +1,251 @@
+###############################################################################
+#
+# file:     figlet.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Loads FIGlet fonts (.flf files, see http://www.figlet.org/), used by screens
+that display big text (eg. the clock).
+
+Fonts are parsed into a table of glyphs (each a tuple of rows, all with the
+same width), with characters side by side at full width (no kerning nor
+smushing). The compiled table is cached in the termsaver directory (see
+`common.get_app_dir`), keyed by the hash of the font file, so later loads of
+the same font skip the parsing altogether.
+
+The functions available here are:
+
+    * `parse_font`: parses the contents of a FIGlet font
+
+    * `load_font`: loads a FIGlet font file, using the compiled cache
+"""
+
+#
+# Python built-in modules
+#
+import collections
+import hashlib
+import io
+import json
+import os
+import zipfile
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib import common
+
+CACHE_DIR = 'fonts'
+"""
+The name of the directory, inside the termsaver directory, holding the
+compiled fonts.
+"""
+
+CACHE_FORMAT = 1
+"""
+The version of the compiled font structure. Change it whenever the structure
+changes, to force cached fonts to be compiled again.
+"""
+
+REQUIRED_CODES = list(range(32, 127)) + [196, 214, 220, 228, 246, 252, 223]
+"""
+The characters every FIGlet font defines, in order, before the code-tagged
+ones: printable ASCII, followed by the Deutsch characters (which can be
+missing in older fonts).
+"""
+
+Font = collections.namedtuple('Font', ['height', 'glyphs'])
+Font.__doc__ = """
+A compiled FIGlet font: the `height` of its glyphs (in rows), and the
+`glyphs` themselves, a dictionary of tuples of rows keyed by character.
+"""
+
+
+def _parse_code(tag):
+    """
+    Returns the character code of a code tag (decimal, 0x hexadecimal or 0
+    octal, as in FIGlet).
+    """
+    sign = 1
+    if tag.startswith('-'):
+        sign, tag = -1, tag[1:]
+    if tag[:2] in ('0x', '0X'):
+        return sign * int(tag[2:], 16)
+    if tag.startswith('0') and len(tag) > 1:
+        return sign * int(tag[1:], 8)
+    return sign * int(tag)
+
+
+def parse_font(text):
+    """
+    Parses the contents of a FIGlet font, returning a `Font`. Raises
+    ValueError if the contents are not a valid font.
+    """
+    lines = text.splitlines()
+    header = lines[0].split() if lines else []
+    if len(header) < 6 or header[0][:5] not in ('flf2a', 'tlf2a') \
+            or len(header[0]) < 6:
+        raise ValueError("missing FIGlet font header")
+    hardblank = header[0][5]
+    try:
+        height, comments = int(header[1]), int(header[5])
+    except ValueError:
+        raise ValueError("invalid FIGlet font header")
+    if height < 1:
+        raise ValueError("invalid FIGlet font height")
+
+    def read_glyph(start):
+        rows = []
+        for row in lines[start:start + height]:
+            # trailing end marks (usually @) are not part of the glyph
+            row = row.rstrip()
+            row = row.rstrip(row[-1:]) if row else row
+            rows.append(row.replace(hardblank, ' '))
+        width = max([len(row) for row in rows])
+        return tuple([row.ljust(width) for row in rows])
+
+    glyphs = {}
+    i = 1 + comments
+    for code in REQUIRED_CODES:
+        if i + height > len(lines):
+            if code < 127:
+                raise ValueError("missing FIGlet font characters")
+            break
+        glyphs[chr(code)] = read_glyph(i)
+        i += height
+
+    while i + height < len(lines):
+        tag = lines[i].split(None, 1)
+        try:
+            code = _parse_code(tag[0]) if tag else -1
+        except ValueError:
+            break
+        if code >= 0:
+            glyphs[chr(code)] = read_glyph(i + 1)
+        i += height + 1
+
+    return Font(height, glyphs)
+
+
+def _read_font_file(path):
+    """
+    Returns the raw contents of a font file (extracting it, if zipped).
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data[:2] == b'PK':
+        # FIGlet also accepts fonts compressed with zip
+        with zipfile.ZipFile(io.BytesIO(data)) as z:
+            return data, z.read(z.namelist()[0])
+    return data, data
+
+
+def get_cache_dir():
+    """
+    Returns the location of the compiled fonts cache, or None if the
+    termsaver directory is not accessible.
+    """
+    try:
+        return os.path.join(common.get_app_dir(), CACHE_DIR)
+    except (KeyError, OSError):
+        return None
+
+
+def read_cache(path):
+    """
+    Returns the `Font` stored in a cache file, or None if it does not
+    exist or can not be read.
+    """
+    try:
+        with open(path, 'r') as f:
+            cached = json.load(f)
+        if cached.get('format') != CACHE_FORMAT:
+            return None
+        return Font(cached['height'], dict([
+            (char, tuple(rows.split('\n')))
+            for char, rows in cached['glyphs'].items()]))
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        return None
+
+
+def write_cache(path, font):
+    """
+    Stores a `Font` in a cache file. Errors here are ignored, as fonts can
+    always be parsed again.
+    """
+    temp_path = "%s.%d" % (path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.mkdir(os.path.dirname(path))
+        with open(temp_path, 'w') as f:
+            json.dump({
+                'format': CACHE_FORMAT,
+                'height': font.height,
+                'glyphs': dict([(char, '\n'.join(rows))
+                                for char, rows in font.glyphs.items()]),
+            }, f, separators=(',', ':'))
+        # atomic, so concurrent launches never read a partial cache
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def load_font(path, cache_dir=False):
+    """
+    Loads a FIGlet font file, returning a `Font`. The font is only parsed
+    if it is not in the compiled cache yet. Raises OSError if the file can
+    not be read, and ValueError if it is not a valid font.
+
+    Arguments:
+
+        * path: the location of the .flf file (zipped or not)
+
+        * cache_dir: the location of the compiled fonts. Defaults to
+          `get_cache_dir`; use None to disable the cache.
+    """
+    data, contents = _read_font_file(path)
+
+    if cache_dir is False:
+        cache_dir = get_cache_dir()
+    cache_path = None
+    if cache_dir is not None:
+        cache_path = os.path.join(cache_dir, "%s.json" %
+                                  hashlib.sha1(data).hexdigest())
+        font = read_cache(cache_path)
+        if font is not None:
+            return font
+
+    try:
+        text = contents.decode('utf-8')
+    except UnicodeDecodeError:
+        # most fonts are plain latin-1
+        text = contents.decode('latin-1')
+    font = parse_font(text)
+
+    if cache_path is not None:
+        write_cache(cache_path, font)
+    return font
@@ -0,0 +1,129 @@
+###############################################################################
+#
+# file:     layout.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+A layout engine for blocks of text, used by `PositionHelperBase` to center,
+align and wrap text on screen.
+
+A text is wrapped to the terminal width only once, and the resulting block
+(its lines, width and height) is aligned in the terminal as a whole. Layouts
+are memoized on the text, the terminal dimensions and the alignment, so
+static content (eg. quotes, weather reports or ascii art) re-centered on
+every frame costs only a dictionary lookup.
+
+Text is measured by the columns it takes on screen (see `textwidth`), so
+coloured text and wide characters are wrapped and centered properly.
+
+The functions available here are:
+
+    * `layout`: wraps and aligns a text in the terminal (memoized)
+
+    * `indent`: joins the lines of a block, shifted to a column
+"""
+
+#
+# Python built-in modules
+#
+import collections
+import functools
+import math
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib.helper.textwidth import display_width, wrap
+
+CACHE_SIZE = 256
+"""
+The maximum number of layouts kept in memory (least recently used ones are
+discarded first).
+"""
+
+HORIZONTAL_MODES = ('left', 'center', 'right')
+"""
+The horizontal alignments supported by `layout`.
+"""
+
+VERTICAL_MODES = ('top', 'center', 'bottom')
+"""
+The vertical alignments supported by `layout`.
+"""
+
+Layout = collections.namedtuple('Layout', ['lines', 'width', 'height',
+                                           'x', 'y', 'text'])
+Layout.__doc__ = """
+The result of `layout`: the wrapped `lines` of the block (all padded to its
+`width`), its `height`, the position (`x`, `y`) of its top left corner in the
+terminal, and the `text` of the block already shifted to column `x`.
+"""
+
+
+def indent(lines, x):
+    """
+    Returns the lines joined by new lines, each shifted to column `x`.
+    """
+    prefix = " " * x
+    return prefix + ("\n" + prefix).join(lines)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def layout(text, width, height, horizontal='left', vertical='top'):
+    """
+    Wraps the text to the terminal width and aligns the resulting block in
+    the terminal, returning a `Layout`. The result is memoized.
+
+    Arguments:
+
+        * text: the text to be laid out
+
+        * width, height: the terminal dimensions (zero width means no
+          wrapping, zero height means no vertical alignment)
+
+        * horizontal: one of `HORIZONTAL_MODES`
+
+        * vertical: one of `VERTICAL_MODES`
+    """
+    lines = wrap(text, width)
+    widths = [display_width(line) for line in lines]
+    block_width = max(widths)
+    lines = tuple([line + " " * (block_width - size)
+                   for line, size in zip(lines, widths)])
+    block_height = len(lines)
+
+    x = y = 0
+    if width > 0:
+        if horizontal == 'center':
+            x = int(math.ceil((width - block_width) / 2.0))
+        elif horizontal == 'right':
+            x = width - block_width
+    if height > 0:
+        if vertical == 'center':
+            y = int(math.floor((height - block_height) / 2.0))
+        elif vertical == 'bottom':
+            y = height - block_height
+
+    x, y = max(0, x), max(0, y)
+    return Layout(lines, block_width, block_height, x, y, indent(lines, x))
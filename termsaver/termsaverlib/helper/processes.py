@@ -0,0 +1,195 @@
+###############################################################################
+#
+# file:     processes.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Scans the processes of the system (Linux only, from /proc/[pid]/stat), to
+list the heaviest ones in the system monitor screen (see `sysmon --top`).
+
+Hosts may run tens of thousands of processes, so they are scanned
+incrementally: each scan reads at most a `budget` of processes, resuming
+where the previous one stopped, and the list of processes (the directory
+/proc) is only read again once all of them were read, comparing it with the
+previous one, so only processes that appeared are added, and the ones gone
+are dropped. The previous counters of each process are kept, so its CPU
+usage is the one between its two latest reads, and the heaviest ones are
+selected with a heap (instead of sorting all of them).
+
+The class available here is:
+
+    * `ProcessScanner`
+"""
+
+#
+# Python built-in modules
+#
+import collections
+import heapq
+import operator
+import os
+import time
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib.helper.collectors import PROC_ROOT
+
+Process = collections.namedtuple('Process', ['pid', 'name', 'start',
+                                             'ticks', 'time', 'cpu', 'rss'])
+Process.__doc__ = """
+The latest read of a process: its `pid`, `name`, `start` (in clock ticks
+since boot, to tell reused PIDs apart), CPU `ticks` used so far and `time`
+of the read (monotonic), `cpu` usage (percentage of a CPU, since the
+previous read) and `rss` (resident memory, in bytes).
+"""
+
+
+class ProcessScanner(object):
+    """
+    Scans the processes of the system incrementally, keeping the latest
+    read of each one.
+
+    The main methods available here are:
+
+        * `scan`: reads the next processes (up to the `budget`)
+
+        * `top`: the processes using the most CPU
+    """
+
+    budget = 1024
+    """
+    The maximum number of processes read by each scan.
+    """
+
+    processes = None
+    """
+    The latest `Process` read of each PID.
+    """
+
+    cost = 0
+    """
+    The seconds spent by the latest scan.
+    """
+
+    scanned = 0
+    """
+    The number of processes read by the latest scan.
+    """
+
+    clock = time.monotonic
+    """
+    The clock used to calculate the CPU usage (can be replaced, eg. for
+    testing).
+    """
+
+    def __init__(self, root=PROC_ROOT, budget=None):
+        """
+        Creates a new scanner.
+
+        Arguments:
+
+            * root: the location of the proc file system
+
+            * budget: the maximum number of processes read by each scan
+        """
+        self.root = root
+        if budget is not None:
+            self.budget = max(1, budget)
+        self.hz = os.sysconf('SC_CLK_TCK')
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.processes = {}
+        self.__queue = collections.deque()
+
+    def list_pids(self):
+        """
+        Returns the PIDs of the processes currently running.
+        """
+        with os.scandir(self.root) as entries:
+            return set([int(entry.name) for entry in entries
+                        if entry.name.isdigit()])
+
+    def scan(self):
+        """
+        Reads the next processes, up to the `budget`. Once all processes
+        were read, the list of processes is read again first: processes
+        that appeared are read before the others (so their usage is known
+        sooner), and the ones gone are dropped.
+        """
+        start = time.perf_counter()
+        queue = self.__queue
+        if not queue:
+            pids = self.list_pids()
+            known = set(self.processes)
+            for pid in known - pids:
+                del self.processes[pid]
+            queue.extend(sorted(pids - known))
+            queue.extend(sorted(pids & known))
+
+        count = min(self.budget, len(queue))
+        for __ in range(count):
+            self.read(queue.popleft())
+        self.scanned = count
+        self.cost = time.perf_counter() - start
+
+    def read(self, pid):
+        """
+        Reads a process, calculating its CPU usage since its previous read
+        (zero on the first one). Processes gone are dropped.
+        """
+        try:
+            fd = os.open(os.path.join(self.root, str(pid), 'stat'),
+                         os.O_RDONLY)
+            try:
+                data = os.read(fd, 4096)
+            finally:
+                os.close(fd)
+            # the name may hold spaces and parenthesis, but it is the only
+            # value that may
+            end = data.rindex(b')')
+            name = data[data.index(b'(') + 1:end].decode('utf-8', 'replace')
+            values = data[end + 2:].split()
+            ticks = int(values[11]) + int(values[12])
+            start = int(values[19])
+            rss = int(values[21]) * self.page_size
+        except (OSError, ValueError, IndexError):
+            self.processes.pop(pid, None)
+            return
+
+        now = self.clock()
+        cpu = 0.0
+        previous = self.processes.get(pid)
+        if previous is not None and previous.start == start \
+                and now > previous.time:
+            cpu = max(0, ticks - previous.ticks) * 100.0 / self.hz \
+                / (now - previous.time)
+        self.processes[pid] = Process(pid, name, start, ticks, now, cpu, rss)
+
+    def top(self, count):
+        """
+        Returns the `count` processes using the most CPU, from the heaviest
+        one.
+        """
+        return heapq.nlargest(count, self.processes.values(),
+                              key=operator.attrgetter('cpu'))
@@ -0,0 +1,449 @@
+###############################################################################
+#
+# file:     sampler.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Samples system metrics (Linux only) on a thread of its own, used by the
+system monitor screen.
+
+The metrics are read by collectors (see `collectors`), whose files of /proc
+(or /sys) are opened only once, and read again from their start (with
+`os.pread`) on every sample, so each file costs a single system call per
+sample. Screens only read the latest snapshot (never blocking), and values
+depending on the previous sample (eg. CPU usage) are calculated between
+two samples, so nothing sleeps in between.
+
+Samples can also be shared by all instances of a user on a host (see
+`SharedSampler`): only one of them (or `termsaver-sysmond`) samples the
+system, writing the snapshots into a memory-mapped ring file (see
+`sharedring`), and the others just read them from there.
+
+The classes available here are:
+
+    * `ProcFile`: a file of /proc, kept open
+
+    * `ProcSampler`: the sampling thread
+
+    * `SharedSampler`: the sampling shared between processes
+"""
+
+#
+# Python built-in modules
+#
+import collections
+import os
+import threading
+import time
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib import common
+from termsaver.termsaverlib.helper.sharedring import SharedRing, \
+    get_ring_path
+
+Snapshot = collections.namedtuple('Snapshot', ['time', 'records'])
+Snapshot.__doc__ = """
+A sample of the system metrics: its `time` (epoch), and the `records` of
+the collectors, keyed by collector name.
+"""
+
+
+class ProcFile(object):
+    """
+    A file of the proc file system, kept open to be read again (from its
+    start) on each `read`.
+    """
+
+    size = 4096
+    """
+    The number of bytes read at once (doubled whenever the contents do not
+    fit in it).
+    """
+
+    def __init__(self, path):
+        """
+        Opens the file. Raises OSError if it can not be opened.
+        """
+        self.path = path
+        self.fd = os.open(path, os.O_RDONLY)
+
+    def read(self):
+        """
+        Returns the current contents of the file, as bytes.
+        """
+        while True:
+            data = os.pread(self.fd, self.size, 0)
+            if len(data) < self.size:
+                return data
+            self.size *= 2
+
+    def close(self):
+        """
+        Closes the file (it can not be read anymore).
+        """
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+
+
+class ProcSampler(object):
+    """
+    Samples the metrics of collectors every `interval` seconds, on a thread
+    of its own, keeping the latest `Snapshot`.
+
+    The main methods available here are:
+
+        * `start`: takes the first sample, and starts the sampling thread
+
+        * `stop`: stops the thread, and closes the collectors
+
+        * `sample`: takes a sample (called by the thread)
+
+        * `get_snapshots`: the snapshots taken since the previous call
+    """
+
+    interval = 0
+    """
+    The seconds between two samples.
+    """
+
+    snapshot = None
+    """
+    The latest `Snapshot` taken (replaced at once, so it can be read from
+    other threads without locks).
+    """
+
+    error = None
+    """
+    The error (OSError or ValueError) that stopped the sampling, if any.
+    """
+
+    collectors = None
+    """
+    The collectors sampled (see `collectors.Collector`).
+    """
+
+    def __init__(self, interval, collectors):
+        """
+        Creates a new sampler.
+
+        Arguments:
+
+            * interval: the seconds between two samples
+
+            * collectors: the collectors sampled (closed along with the
+              sampler)
+        """
+        self.interval = interval
+        self.collectors = collectors
+        self.__stopped = threading.Event()
+        self.__thread = None
+        self.__returned = None
+
+    def sample(self):
+        """
+        Takes a sample of all collectors, returning the new `Snapshot`.
+        """
+        self.snapshot = Snapshot(time.time(), dict([
+            (collector.name, collector.sample())
+            for collector in self.collectors]))
+        return self.snapshot
+
+    def get_snapshots(self, limit=1):
+        """
+        Returns the snapshots taken since the previous call (at most the
+        `limit` most recent ones, if informed), from the oldest to the most
+        recent. Only the latest snapshot is kept here, so this is either it
+        or nothing.
+        """
+        snapshot = self.snapshot
+        if snapshot is self.__returned or (limit is not None and limit < 1):
+            return []
+        self.__returned = snapshot
+        return [snapshot]
+
+    def start(self):
+        """
+        Takes the first sample (so there is always a snapshot to read), and
+        starts sampling on a (daemon) thread.
+        """
+        self.sample()
+        self.__thread = threading.Thread(target=self.__run,
+                                         name="termsaver-sampler")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops the sampling thread, and closes the collectors.
+        """
+        self.__stopped.set()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+        for collector in self.collectors:
+            collector.close()
+
+    def __run(self):
+        """
+        Samples on a fixed grid of a monotonic clock (so samples do not drift
+        by the time spent taking them), until stopped. The grid is half an
+        interval off the start, so readers running at the same interval
+        (starting along with the sampler) never race with it, and always
+        read a new snapshot.
+        """
+        deadline = time.monotonic() - self.interval / 2.0
+        while True:
+            deadline += self.interval
+            if self.__stopped.wait(max(0, deadline - time.monotonic())):
+                return
+            try:
+                self.sample()
+            except (OSError, ValueError) as e:
+                self.error = e
+                return
+
+
+class SharedSampler(ProcSampler):
+    """
+    Shares the samples of collectors between all processes of a user on a
+    host using the same collectors and interval, through a ring file in the temporary
+    directory, so the system is sampled once for all of them (instead of
+    once per process), and the history outlives the processes displaying
+    it.
+
+    Each process plays one of these roles:
+
+        * writer: the first process (or `termsaver-sysmond`) samples the
+          collectors on a thread, and writes the snapshots into the ring
+
+        * reader: the others only read the ring, and become the writer if
+          it stops writing (eg. the writer exited)
+
+        * local: a process that could not open the ring (eg. a file of
+          another user took its place), or not read it (eg. its writer was
+          stopped in the middle of a write), or not become its writer,
+          sampling on its own, as `ProcSampler`
+
+    The main methods available here are (besides the ones of
+    `ProcSampler`):
+
+        * `serve`: waits to be the writer, and samples until interrupted
+    """
+
+    name = 'sysmon'
+    """
+    The name of the ring file (along with a digest of its layout).
+    """
+
+    capacity = 4096
+    """
+    The number of snapshots kept in the ring.
+    """
+
+    patience = 3
+    """
+    The number of intervals (plus a second) a reader waits for a new
+    snapshot, before it considers the writer gone.
+    """
+
+    directory = None
+    """
+    The location of the ring file (the temporary directory, by default).
+    """
+
+    ring = None
+    """
+    The `SharedRing` holding the snapshots.
+    """
+
+    role = None
+    """
+    The role of this process: 'writer', 'reader' or 'local'.
+    """
+
+    def __init__(self, interval, collectors, directory=None, capacity=None):
+        """
+        Creates a new shared sampler.
+
+        Arguments:
+
+            * interval: the seconds between two samples
+
+            * collectors: the collectors sampled (closed along with the
+              sampler)
+
+            * directory: the location of the ring file
+
+            * capacity: the number of snapshots kept in the ring
+        """
+        ProcSampler.__init__(self, interval, collectors)
+        self.directory = directory or common.get_temp_dir()
+        if capacity is not None:
+            self.capacity = capacity
+        self.schema = [[collector.name, list(collector.fields)]
+                       for collector in collectors]
+        self.__count = 0
+        self.__seen = 0
+
+    def open(self):
+        """
+        Opens the ring file of the collectors (see `get_ring_path`).
+        """
+        if self.ring is None:
+            self.ring = SharedRing(
+                get_ring_path(self.name, self.schema, self.interval,
+                              self.capacity, self.directory),
+                self.schema,
+                1 + sum([len(fields) for __, fields in self.schema]),
+                self.capacity, self.interval)
+        return self.ring
+
+    def sample(self):
+        """
+        Takes a sample of all collectors, writing it into the ring (when
+        this process is the writer).
+        """
+        snapshot = ProcSampler.sample(self)
+        if self.role == 'writer':
+            values = [snapshot.time]
+            for name, __ in self.schema:
+                values.extend(snapshot.records[name])
+            self.ring.append(values)
+        return snapshot
+
+    def start(self):
+        """
+        Becomes the writer if there is none, or waits for the first snapshot
+        of the current one (so there is always a snapshot to read). Samples
+        locally if the ring can not be opened.
+        """
+        try:
+            self.open()
+        except OSError:
+            self.__sample_locally()
+            return
+        if self.__take_over(wait=False):
+            return
+        self.role = 'reader'
+        deadline = time.monotonic() + self.get_timeout()
+        while not (self.ring.attach() and self.ring.count):
+            if time.monotonic() > deadline:
+                self.__take_over()
+                return
+            time.sleep(0.01)
+        self.__seen = time.monotonic()
+
+    def serve(self):
+        """
+        Waits for the current writer to leave (if any), and then samples
+        into the ring, until interrupted (or the sampling fails). This is
+        what `termsaver-sysmond` does. Raises OSError if the ring can not
+        be written (eg. it belongs to another user).
+        """
+        if not self.open().lock(blocking=True):
+            raise PermissionError("%s can not be written" % self.ring.path)
+        self.__take_over()
+        while self.error is None:
+            time.sleep(self.interval)
+        raise self.error
+
+    def get_timeout(self):
+        """
+        Returns the seconds without new snapshots after which the writer is
+        considered gone.
+        """
+        return self.patience * self.interval + 1
+
+    def get_snapshots(self, limit=1):
+        """
+        Returns the snapshots written into the ring since the previous call
+        (at most the `limit` most recent ones, if informed), from the oldest
+        to the most recent. The first call returns the history kept in the
+        ring.
+        """
+        if self.role == 'local':
+            return ProcSampler.get_snapshots(self, limit)
+
+        try:
+            count, records = self.ring.read(self.__count, limit)
+        except TimeoutError:
+            self.__sample_locally()
+            return ProcSampler.get_snapshots(self, limit)
+        self.__count = count
+        if records:
+            self.__seen = time.monotonic()
+        elif self.role == 'reader' and \
+                time.monotonic() - self.__seen > self.get_timeout():
+            self.__take_over()
+            return self.get_snapshots(limit)
+
+        snapshots = []
+        for record in records:
+            values = {}
+            position = 1
+            for name, fields in self.schema:
+                values[name] = record[position:position + len(fields)]
+                position += len(fields)
+            snapshots.append(Snapshot(record[0], values))
+        if snapshots:
+            self.snapshot = snapshots[-1]
+        return snapshots
+
+    def stop(self):
+        """
+        Stops sampling (if this process is sampling), and closes the ring
+        (so another process can become the writer).
+        """
+        ProcSampler.stop(self)
+        if self.ring is not None:
+            self.ring.close()
+            self.ring = None
+
+    def __sample_locally(self):
+        """
+        Stops using the ring, and samples on its own (as `ProcSampler`),
+        unless it was already sampling (as the writer).
+        """
+        if self.role != 'writer':
+            ProcSampler.start(self)
+        self.role = 'local'
+
+    def __take_over(self, wait=True):
+        """
+        Becomes the writer, if the lock is free. Otherwise, unless `wait`,
+        samples locally (the writer can not be replaced). Returns True if
+        this process is sampling.
+        """
+        if self.ring.lock():
+            self.role = 'writer'
+            self.ring.initialize()
+        elif wait:
+            self.role = 'local'
+        else:
+            return False
+        ProcSampler.start(self)
+        return True
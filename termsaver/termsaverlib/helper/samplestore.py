@@ -0,0 +1,499 @@
+###############################################################################
+#
+# file:     samplestore.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+A fixed-capacity store of samples (eg. CPU and memory usage over time), used
+by the system monitor screen to keep the history displayed in its charts.
+
+Each field of the samples is kept in its own ring buffer (a packed array of
+floats, 8 bytes per value), so adding a sample never copies the history, and
+the oldest sample is simply overwritten once the store is full. The maximum
+of each field over the stored samples is kept with a monotonic queue, so it
+is also updated in constant (amortized) time, instead of scanning the whole
+history on every sample.
+
+Long histories (eg. a day) are kept as rollups: the samples are aggregated
+into buckets of fixed duration (eg. 10 seconds, 1 minute, 10 minutes), each
+holding the minimum and maximum of the samples in it, so a day of history
+costs as many buckets as the coarsest tier holds (144 buckets of 10
+minutes, 3.4 KB per field), whatever the sampling interval (the most recent
+samples are also kept as they are, for short windows). The tier covering a
+given window is then downsampled to the width of the chart, keeping the
+minimum and maximum of each column, so neither spikes nor dips are ever
+averaged away.
+
+The classes available here are:
+
+    * `RollingMax`: the maximum of the last values of a series
+
+    * `SampleStore`: the ring buffers of samples
+
+    * `Rollup`: the buckets of a single duration
+
+    * `RollupStore`: the tiers of rollups of the same samples
+"""
+
+#
+# Python built-in modules
+#
+import array
+import bisect
+import collections
+
+TIERS = ((10, 360), (60, 360), (600, 144))
+"""
+The tiers of rollups kept by default, as tuples (seconds per bucket,
+number of buckets): an hour of 10 seconds, 6 hours of a minute, and a day
+of 10 minutes.
+"""
+
+STATS = ('min', 'max')
+"""
+The statistics kept for each field of the buckets of rollups.
+"""
+
+
+class RollingMax(object):
+    """
+    Keeps the maximum of the last `window` values added, with a monotonic
+    queue: it only holds the values that can still become the maximum (each
+    smaller than the ones before it), so each value is added and removed at
+    most once.
+    """
+
+    window = 0
+    """
+    The number of (most recent) values the maximum refers to.
+    """
+
+    def __init__(self, window):
+        """
+        Creates a new rolling maximum over the last `window` values.
+        """
+        self.window = max(1, window)
+        self.__queue = collections.deque()
+        self.__count = 0
+
+    def add(self, value):
+        """
+        Adds a value, discarding the one that left the window (if any).
+        """
+        queue = self.__queue
+        while queue and queue[-1][1] <= value:
+            queue.pop()
+        queue.append((self.__count, value))
+        self.__count += 1
+        if queue[0][0] <= self.__count - 1 - self.window:
+            queue.popleft()
+
+    def get(self, default=0):
+        """
+        Returns the maximum of the values in the window (or the `default`, if
+        no value was added yet).
+        """
+        if not self.__queue:
+            return default
+        return self.__queue[0][1]
+
+
+class SampleStore(object):
+    """
+    Holds up to `capacity` samples, each with the same fields (eg. time, cpu
+    and mem), in ring buffers of floats. Samples are indexed from the oldest
+    (0) to the most recent (`len(store) - 1`), as with lists.
+
+    The main methods available here are:
+
+        * `append`: adds a sample, overwriting the oldest one when full
+
+        * `get`, `first`, `last`, `series`: read the stored values
+
+        * `max`: the maximum of a field over the stored samples
+
+        * `resize`: changes the capacity (keeping the most recent samples)
+    """
+
+    fields = None
+    """
+    The names of the fields of each sample.
+    """
+
+    capacity = 0
+    """
+    The maximum number of samples stored.
+    """
+
+    def __init__(self, fields, capacity):
+        """
+        Creates a new (empty) store.
+
+        Arguments:
+
+            * fields: the names of the fields of each sample
+
+            * capacity: the maximum number of samples stored
+        """
+        self.fields = tuple(fields)
+        self.capacity = max(1, capacity)
+        self.__index = dict([(name, i) for i, name in enumerate(self.fields)])
+        self.__buffers = [array.array('d', [0.0]) * self.capacity
+                          for __ in self.fields]
+        self.__maxima = [RollingMax(self.capacity) for __ in self.fields]
+        self.__count = 0
+        self.__length = 0
+
+    @property
+    def total(self):
+        """
+        The number of samples appended so far (including the ones already
+        overwritten).
+        """
+        return self.__count
+
+    def __len__(self):
+        return self.__length
+
+    def append(self, *values, **named):
+        """
+        Adds a sample, either with its values in the order of `fields`, or
+        named (fields not informed are stored as zero).
+        """
+        if named:
+            values = [named.get(name, 0) for name in self.fields]
+        position = self.__count % self.capacity
+        for buffer, maximum, value in zip(self.__buffers, self.__maxima,
+                                          values):
+            buffer[position] = value
+            maximum.add(value)
+        self.__count += 1
+        if self.__length < self.capacity:
+            self.__length += 1
+
+    def extend(self, *series):
+        """
+        Adds samples given as one series of values per field (in the order
+        of `fields`), as `append` would, with less overhead per sample.
+        """
+        length = min([len(values) for values in series] or [0])
+        for buffer, maximum, values in zip(self.__buffers, self.__maxima,
+                                           series):
+            for i in range(length):
+                value = values[i]
+                buffer[(self.__count + i) % self.capacity] = value
+                maximum.add(value)
+        self.__count += length
+        self.__length = min(self.capacity, self.__length + length)
+
+    def get(self, field, i):
+        """
+        Returns the value of a field of the sample `i` (negative values count
+        from the most recent, as with lists).
+        """
+        if i < 0:
+            i += self.__length
+        if not 0 <= i < self.__length:
+            raise IndexError("sample index out of range")
+        return self.__buffers[self.__index[field]][
+            (self.__count - self.__length + i) % self.capacity]
+
+    def first(self, field, default=0):
+        """
+        Returns the value of a field of the oldest sample stored.
+        """
+        return self.get(field, 0) if self.__length else default
+
+    def last(self, field, default=0):
+        """
+        Returns the value of a field of the most recent sample stored.
+        """
+        return self.get(field, -1) if self.__length else default
+
+    def series(self, field):
+        """
+        Returns the values of a field, from the oldest to the most recent.
+        """
+        buffer = self.__buffers[self.__index[field]]
+        start = (self.__count - self.__length) % self.capacity
+        if start + self.__length <= self.capacity:
+            return buffer[start:start + self.__length].tolist()
+        return (buffer[start:] + buffer[:self.__count % self.capacity]) \
+            .tolist()
+
+    def max(self, field, default=0):
+        """
+        Returns the maximum value of a field over the stored samples.
+        """
+        return self.__maxima[self.__index[field]].get(default)
+
+    def clear(self):
+        """
+        Discards all samples.
+        """
+        self.resize(self.capacity, keep=False)
+
+    def resize(self, capacity, keep=True):
+        """
+        Changes the capacity of the store, keeping the most recent samples
+        that still fit (unless `keep` is False). This costs as much as the
+        samples kept, so it should only be done on rare occasions (eg. when
+        the terminal is resized).
+        """
+        kept = [self.series(name)[-max(1, capacity):] if keep else []
+                for name in self.fields]
+        self.__init__(self.fields, capacity)
+        for values in zip(*kept):
+            self.append(*values)
+
+
+class Rollup(object):
+    """
+    Aggregates samples into buckets of `resolution` seconds (aligned to the
+    epoch), keeping the minimum and maximum of each field of each bucket in
+    a `SampleStore` (with fields named as "field:stat", eg. "cpu:max"). The
+    bucket being filled is kept apart, until a sample of the next one
+    arrives.
+    """
+
+    fields = None
+    """
+    The names of the fields of each sample.
+    """
+
+    resolution = 0
+    """
+    The seconds of each bucket (zero to keep each sample in a bucket of its
+    own).
+    """
+
+    buckets = None
+    """
+    The `SampleStore` of the buckets filled.
+    """
+
+    current = None
+    """
+    The bucket being filled, as a list: start time, and the minimum and
+    maximum of each field, or None.
+    """
+
+    def __init__(self, fields, resolution, capacity):
+        """
+        Creates a new (empty) rollup.
+
+        Arguments:
+
+            * fields: the names of the fields of each sample
+
+            * resolution: the seconds of each bucket
+
+            * capacity: the maximum number of buckets kept
+        """
+        self.fields = tuple(fields)
+        self.resolution = resolution
+        self.buckets = SampleStore(['time'] + [
+            '%s:%s' % (field, stat) for field in self.fields
+            for stat in STATS], capacity)
+        self.current = None
+
+    @property
+    def coverage(self):
+        """
+        The seconds of history the rollup can hold.
+        """
+        return self.resolution * self.buckets.capacity
+
+    def add(self, time, values):
+        """
+        Adds a sample (with its values in the order of `fields`) to its
+        bucket. Samples must be added in chronological order.
+        """
+        start = time
+        if self.resolution:
+            start = time - time % self.resolution
+        current = self.current
+        if current is not None and current[0] != start:
+            self.flush()
+            current = None
+        if current is None:
+            self.current = [start] + list(values) * 2
+            return
+        size = len(self.fields)
+        for i, value in enumerate(values):
+            if value < current[1 + i]:
+                current[1 + i] = value
+            if value > current[1 + size + i]:
+                current[1 + size + i] = value
+
+    def flush(self):
+        """
+        Stores the bucket being filled (if any).
+        """
+        current = self.current
+        if current is None:
+            return
+        size = len(self.fields)
+        values = current[:1]
+        for i in range(size):
+            values.extend((current[1 + i], current[1 + size + i]))
+        self.buckets.append(*values)
+        self.current = None
+
+    def series(self, name):
+        """
+        Returns the values of a field of the buckets (eg. "cpu:max"),
+        including the one being filled, from the oldest to the most recent.
+        """
+        result = self.buckets.series(name)
+        current = self.current
+        if current is not None:
+            if name == 'time':
+                result.append(current[0])
+            else:
+                field, stat = name.rsplit(':', 1)
+                result.append(current[1 + STATS.index(stat) * len(self.fields)
+                                      + self.fields.index(field)])
+        return result
+
+
+class RollupStore(object):
+    """
+    Keeps the most recent samples of a set of fields as they are, and all
+    of them in tiers of rollups of increasing durations, so long windows of
+    history can be charted from the tier covering them.
+
+    The main methods available here are:
+
+        * `append`: adds a sample to all tiers
+
+        * `get_rollup`: the finest tier covering a window
+
+        * `downsample`: the columns of a chart of a window
+    """
+
+    fields = None
+    """
+    The names of the fields of each sample (besides its time).
+    """
+
+    interval = 0
+    """
+    The seconds between two samples.
+    """
+
+    samples = None
+    """
+    The `SampleStore` of the most recent samples (with their time and
+    `fields`).
+    """
+
+    rollups = None
+    """
+    The tiers of `Rollup`, from the finest to the coarsest.
+    """
+
+    def __init__(self, fields, interval, raw=256, tiers=TIERS):
+        """
+        Creates a new (empty) store.
+
+        Arguments:
+
+            * fields: the names of the fields of each sample
+
+            * interval: the seconds between two samples
+
+            * raw: the number of raw samples kept
+
+            * tiers: the tiers of rollups (see `TIERS`)
+        """
+        self.fields = tuple(fields)
+        self.interval = interval
+        self.samples = SampleStore(('time',) + self.fields, raw)
+        self.rollups = [Rollup(self.fields, resolution, capacity)
+                        for resolution, capacity in tiers]
+
+    @property
+    def total(self):
+        """
+        The number of samples appended so far.
+        """
+        return self.samples.total
+
+    def append(self, time, *values):
+        """
+        Adds a sample (its time, and its values in the order of `fields`)
+        to the recent samples and to all tiers.
+        """
+        self.samples.append(time, *values)
+        for rollup in self.rollups:
+            rollup.add(time, values)
+
+    def get_rollup(self, window):
+        """
+        Returns the finest tier covering a window (in seconds), or the
+        coarsest one, if none does, or None if the recent samples cover it.
+        """
+        if self.interval * self.samples.capacity >= window \
+                or not self.rollups:
+            return None
+        for rollup in self.rollups:
+            if rollup.coverage >= window:
+                return rollup
+        return self.rollups[-1]
+
+    def downsample(self, window, width):
+        """
+        Returns a `SampleStore` of the last `window` seconds of history, in
+        at most `width` samples: consecutive buckets of the tier covering
+        the window are merged into each of them, keeping their time, the
+        maximum of each field (named as the field) and its minimum (named
+        as "field:min"), so neither the spikes nor the dips of each column
+        are smoothed out.
+        """
+        rollup = self.get_rollup(window)
+        source = self.samples if rollup is None else rollup
+        times = source.series('time')
+        start = bisect.bisect_right(times, times[-1] - window) \
+            if times else 0
+        count = len(times) - start
+        columns = min(width, count)
+        result = SampleStore(('time',) + self.fields + tuple([
+            '%s:min' % field for field in self.fields]), max(1, columns))
+        if not columns:
+            return result
+
+        bounds = [(start + column * count // columns,
+                   start + (column + 1) * count // columns)
+                  for column in range(columns)]
+        series = [[times[first] for first, __ in bounds]]
+        for stat, merge in (('max', max), ('min', min)):
+            for field in self.fields:
+                # each raw sample is its own minimum and maximum
+                values = source.series(
+                    field if rollup is None else '%s:%s' % (field, stat))
+                series.append([merge(values[first:last])
+                               for first, last in bounds])
+        result.extend(*series)
+        return result
@@ -0,0 +1,281 @@
+###############################################################################
+#
+# file:     scheduler.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+A frame scheduler, used by `ScreenBase.autorun` to run the cycles of screens
+at a steady pace.
+
+Instead of sleeping a fixed amount of time after each cycle (which adds the
+time spent on the cycle itself to the period, and makes screens drift), each
+registered tick has deadlines on a fixed grid of a monotonic clock. If a
+cycle takes longer than its interval, the missed frames are skipped, instead
+of being run late one after another.
+
+Ticks can also be aligned to the wall clock (eg. a clock that must change
+exactly when a second starts): they run right after each multiple of their
+interval in wall clock time, but still wait on the monotonic clock (so
+adjustments of the system time do not stall them).
+
+Between frames there is a single blocking wait, that can be interrupted with
+`FrameScheduler.wake` (eg. on a key press). On POSIX systems, the wait is a
+`select` on a pipe, so it can also be interrupted from signal handlers (where
+locks, as used by `threading.Event`, could deadlock).
+
+The class available here is:
+
+    * `FrameScheduler`
+"""
+
+#
+# Python built-in modules
+#
+import math
+import os
+import select
+import threading
+import time
+
+
+class FrameScheduler(object):
+    """
+    Runs callbacks (ticks) at fixed intervals, based on deadlines of a
+    monotonic clock.
+
+    The main methods available here are:
+
+        * `add`: registers a callback to be called at every interval
+
+        * `step`: waits until the next deadline, and runs the ticks due
+
+        * `wake`: interrupts the current wait (from another thread)
+
+        * `redraw`: interrupts the current wait, running all ticks right away
+          (eg. when the terminal is resized)
+
+    The clock and wait functions can be replaced (eg. for testing).
+    """
+
+    min_interval = 0
+    """
+    The minimum interval, in seconds, between two runs of the same tick,
+    defined by the frames per second cap (zero means no cap).
+    """
+
+    ticks = None
+    """
+    The registered ticks, as lists [interval, callback, next deadline,
+    aligned, next wall clock boundary].
+    """
+
+    frames = 0
+    """
+    The number of frames (ticks) run so far.
+    """
+
+    skipped = 0
+    """
+    The number of frames skipped so far, because a tick was behind schedule.
+    """
+
+    def __init__(self, fps=None, clock=None, wait=None, wall_clock=None):
+        """
+        Creates a new scheduler.
+
+        Arguments:
+
+            * fps: the maximum frames per second of each tick (None for no
+              cap)
+
+            * clock: a function returning the current time in seconds,
+              defaults to `time.monotonic`
+
+            * wait: a function that blocks for the informed seconds, returning
+              True if it was interrupted. Defaults to waiting for `wake`.
+
+            * wall_clock: a function returning the wall clock time in seconds
+              (for aligned ticks), defaults to `time.time`
+        """
+        if fps:
+            self.min_interval = 1.0 / fps
+        self.clock = clock or time.monotonic
+        self.wall_clock = wall_clock or time.time
+        self.__event = None
+        self.__pipe = None
+        if os.name == 'posix':
+            self.__pipe = os.pipe()
+            for fd in self.__pipe:
+                os.set_blocking(fd, False)
+        else:
+            self.__event = threading.Event()
+        self.__redraw = False
+        self.wait = wait or self.__wait
+        self.ticks = []
+
+    def __wait(self, timeout):
+        """
+        Blocks for the informed seconds, or until `wake` is called. Returns
+        True if it was woken up.
+        """
+        if self.__event is not None:
+            woken = self.__event.wait(timeout)
+            self.__event.clear()
+            return woken
+        if not select.select([self.__pipe[0]], [], [], timeout)[0]:
+            return False
+        try:
+            while os.read(self.__pipe[0], 512):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        """
+        Releases the resources of the scheduler (it can not wait anymore).
+        """
+        if self.__pipe is not None:
+            for fd in self.__pipe:
+                os.close(fd)
+            self.__pipe = None
+            self.__event = threading.Event()
+
+    def add(self, interval, callback, aligned=False):
+        """
+        Registers a callback to be called every `interval` seconds (limited
+        by the frames per second cap). The first call happens on the next
+        `step`.
+
+        If `aligned`, the following calls happen right after each multiple
+        of the interval in wall clock time (eg. when each second starts),
+        never before it.
+        """
+        self.ticks.append([max(interval, self.min_interval), callback, None,
+                           aligned, None])
+
+    def wake(self):
+        """
+        Interrupts the current (or next) wait of the scheduler, so the caller
+        of `step` can check its state (eg. if a key was pressed). This is
+        safe to be called from other threads and from signal handlers.
+        """
+        if self.__event is not None:
+            self.__event.set()
+            return
+        try:
+            os.write(self.__pipe[1], b'.')
+        except (BlockingIOError, OSError):
+            # already woken up (the pipe is full) or closed
+            pass
+
+    def redraw(self):
+        """
+        Interrupts the current (or next) wait of the scheduler, and makes the
+        next `step` run all ticks right away (without changing their
+        schedule).
+        """
+        self.__redraw = True
+        self.wake()
+
+    def get_timeout(self):
+        """
+        Returns the seconds left until the next deadline (zero if it already
+        passed).
+        """
+        now = self.clock()
+        deadline = None
+        for tick in self.ticks:
+            if tick[2] is None:
+                tick[2] = now
+            if deadline is None or tick[2] < deadline:
+                deadline = tick[2]
+        if deadline is None:
+            return 0
+        return max(0, deadline - now)
+
+    def step(self):
+        """
+        Waits until the next deadline, and runs all ticks due. Returns the
+        number of ticks run (zero if the wait was interrupted).
+        """
+        timeout = self.get_timeout()
+        if timeout > 0 and self.wait(timeout) and not self.__redraw:
+            return 0
+
+        if self.__redraw:
+            self.__redraw = False
+            for tick in self.ticks:
+                tick[1]()
+            self.frames += len(self.ticks)
+            return len(self.ticks)
+
+        count = 0
+        for tick in self.ticks:
+            interval, callback, deadline, aligned, boundary = tick
+            if deadline > self.clock():
+                continue
+            if aligned and boundary is not None:
+                wall = self.wall_clock()
+                if wall < boundary:
+                    # woke up early (the clocks drifted apart)
+                    tick[2] = self.clock() + boundary - wall
+                    continue
+            callback()
+            count += 1
+            self.frames += 1
+
+            now = self.clock()
+            if aligned and interval > 0:
+                self.__align(tick, now)
+                continue
+            if interval <= 0:
+                tick[2] = now
+                continue
+            deadline += interval
+            missed = int(math.floor((now - deadline) / interval))
+            if missed > 0:
+                # behind schedule: skip the frames whose time has passed
+                # (keeping the grid), and run the current one right away
+                deadline += missed * interval
+                self.skipped += missed
+            tick[2] = deadline
+        return count
+
+    def __align(self, tick, now):
+        """
+        Schedules an aligned tick to the next multiple of its interval in
+        wall clock time, skipping the ones that passed entirely.
+        """
+        interval, boundary = tick[0], tick[4]
+        wall = self.wall_clock()
+        if boundary is None:
+            boundary = math.floor(wall / interval) * interval
+        boundary += interval
+        missed = int(math.floor((wall - boundary) / interval))
+        if missed > 0:
+            boundary += missed * interval
+            self.skipped += missed
+        tick[4] = boundary
+        tick[2] = now + max(0, boundary - wall)
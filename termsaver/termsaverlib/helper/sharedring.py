@@ -0,0 +1,355 @@
+###############################################################################
+#
+# file:     sharedring.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+A ring of records (each a fixed number of floats) kept in a memory-mapped
+file, written by a single process and read by any number of others, used to
+share the samples of the system monitor between all its instances of a user
+on a host (see `sysmon --shared`).
+
+The file starts with a header page (holding its layout and the `schema` of
+the records, so readers can tell it holds what they expect), followed by
+`capacity` records. The writer holds an exclusive lock on the file (released
+by the system if it dies), and updates a sequence counter before and after
+each record (odd while writing), so readers can tell a read overlapped a
+write and try again, without any lock. A writer taking over a ring left in
+the middle of a write (its writer died) starts it empty, and readers give
+up after a number of `retries`, so a stopped writer never blocks them.
+
+Ring files are only readable and writable by their owner, and their names
+hold the user ID, so users never read (or plant) the rings of others in the
+shared temporary directory.
+
+The class available here is:
+
+    * `SharedRing`
+
+The function available here is:
+
+    * `get_ring_path`
+"""
+
+#
+# Python built-in modules
+#
+import hashlib
+import json
+import mmap
+import os
+import stat
+import struct
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # not available on Windows (the ring can not be shared there)
+    fcntl = None
+
+MAGIC = b'TSRING\0\0'
+"""
+The first bytes of a ring file.
+"""
+
+VERSION = 1
+"""
+The version of the layout of ring files (part of their name, so instances
+of different versions never share a file).
+"""
+
+HEADER = struct.Struct('<8sIIIIdQQ')
+"""
+The header of a ring file: magic, version, record width (in floats),
+capacity (in records), schema size (in bytes), interval (in seconds),
+sequence and count of records written.
+"""
+
+SEQUENCE_OFFSET = 32
+"""
+The position of the sequence counter in the header.
+"""
+
+COUNT_OFFSET = 40
+"""
+The position of the count of records written in the header.
+"""
+
+SCHEMA_OFFSET = 64
+"""
+The position of the schema (JSON) in the header page.
+"""
+
+HEADER_SIZE = 4096
+"""
+The size of the header page (records start right after it).
+"""
+
+COUNTER = struct.Struct('<Q')
+"""
+The format of the sequence and count values.
+"""
+
+
+def get_ring_path(name, schema, interval, capacity, directory):
+    """
+    Returns the path of the ring file of a given schema, interval and
+    capacity, so instances only share rings with the same layout (and the
+    same user).
+    """
+    digest = hashlib.sha1(json.dumps(
+        [VERSION, schema, interval, capacity]).encode('utf-8')).hexdigest()
+    return os.path.join(directory, "termsaver-%s-%d-%s.ring" % (
+        name, os.getuid(), digest[:16]))
+
+
+class SharedRing(object):
+    """
+    A ring of records in a memory-mapped file, shared between processes.
+
+    The main methods available here are:
+
+        * `lock`: tries to become the (only) writer of the ring
+
+        * `initialize`: prepares the file for writing (by the writer)
+
+        * `attach`: maps the file for reading (by the readers)
+
+        * `append`: writes a record (by the writer)
+
+        * `read`: reads the records written since a given count
+    """
+
+    path = None
+    """
+    The location of the ring file.
+    """
+
+    schema = None
+    """
+    The description of the records (any JSON value), which must match the
+    one in the file for it to be read.
+    """
+
+    width = 0
+    """
+    The number of floats of each record.
+    """
+
+    capacity = 0
+    """
+    The number of records kept (the oldest is overwritten when full).
+    """
+
+    interval = 0
+    """
+    The seconds between two records (informative).
+    """
+
+    writable = False
+    """
+    Defines if the file could be opened for writing (it can only be
+    written by its owner).
+    """
+
+    locked = False
+    """
+    Defines if this instance holds the lock of the writer.
+    """
+
+    retries = 10000
+    """
+    The number of times a read overlapping writes is tried again, before
+    giving up (eg. the writer was stopped in the middle of a write).
+    """
+
+    def __init__(self, path, schema, width, capacity, interval=0):
+        """
+        Opens the ring file (creating it empty, if needed). Raises OSError if
+        it can not be opened, or is not a regular file of the current user.
+
+        Arguments:
+
+            * path: the location of the ring file
+
+            * schema: the description of the records
+
+            * width: the number of floats of each record
+
+            * capacity: the number of records kept
+
+            * interval: the seconds between two records
+        """
+        self.path = path
+        self.schema = json.dumps(schema).encode('utf-8')
+        self.width = width
+        self.capacity = max(1, capacity)
+        self.interval = interval
+        self.record = struct.Struct('<%dd' % width)
+        self.size = HEADER_SIZE + self.capacity * self.record.size
+        self.map = None
+        if len(self.schema) > HEADER_SIZE - SCHEMA_OFFSET:
+            raise ValueError("schema too large for a ring file")
+
+        # never follow links planted in the (shared) temporary directory
+        flags = getattr(os, 'O_NOFOLLOW', 0)
+        try:
+            self.fd = os.open(path, os.O_RDWR | os.O_CREAT | flags, 0o600)
+            self.writable = True
+        except PermissionError:
+            self.fd = os.open(path, os.O_RDONLY | flags)
+        info = os.fstat(self.fd)
+        if not stat.S_ISREG(info.st_mode):
+            self.close()
+            raise OSError("%s is not a regular file" % path)
+        if info.st_uid != os.getuid():
+            self.close()
+            raise PermissionError("%s belongs to another user" % path)
+
+    @property
+    def count(self):
+        """
+        The number of records written to the ring so far (zero if it is not
+        mapped yet).
+        """
+        if self.map is None:
+            return 0
+        return COUNTER.unpack_from(self.map, COUNT_OFFSET)[0]
+
+    def lock(self, blocking=False):
+        """
+        Tries to become the writer of the ring, returning True if it did.
+        Only one process holds the lock at a time, until it closes the ring
+        (or dies). With `blocking`, waits for the current writer to leave.
+        """
+        if self.locked:
+            return True
+        if fcntl is None or not self.writable:
+            return False
+        try:
+            fcntl.flock(self.fd, fcntl.LOCK_EX
+                        | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            return False
+        self.locked = True
+        return True
+
+    def initialize(self):
+        """
+        Maps the file for writing (the lock must be held), keeping the
+        records it already holds if its header matches this ring (so the
+        history survives a change of writer), or starting it empty otherwise,
+        or if its previous writer died in the middle of a write (the record
+        it was writing is incomplete, and the sequence would stay odd).
+        """
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if not self.__is_valid() or COUNTER.unpack(os.pread(
+                self.fd, COUNTER.size, SEQUENCE_OFFSET))[0] % 2:
+            os.ftruncate(self.fd, 0)
+            os.ftruncate(self.fd, self.size)
+            os.pwrite(self.fd, HEADER.pack(
+                MAGIC, VERSION, self.width, self.capacity, len(self.schema),
+                self.interval, 0, 0) + b'\0' * (SCHEMA_OFFSET - HEADER.size)
+                + self.schema, 0)
+        self.map = mmap.mmap(self.fd, self.size)
+
+    def attach(self):
+        """
+        Maps the file for reading, if it was initialized by a writer with
+        the same layout and schema. Returns True if the ring can be read.
+        """
+        if self.map is None and self.__is_valid():
+            self.map = mmap.mmap(self.fd, self.size, access=mmap.ACCESS_READ)
+        return self.map is not None
+
+    def append(self, values):
+        """
+        Writes a record (the writer only), overwriting the oldest one when
+        the ring is full.
+        """
+        sequence = COUNTER.unpack_from(self.map, SEQUENCE_OFFSET)[0]
+        count = self.count
+        COUNTER.pack_into(self.map, SEQUENCE_OFFSET, sequence + 1)
+        self.record.pack_into(self.map, HEADER_SIZE + (count % self.capacity)
+                              * self.record.size, *values)
+        COUNTER.pack_into(self.map, COUNT_OFFSET, count + 1)
+        COUNTER.pack_into(self.map, SEQUENCE_OFFSET, sequence + 2)
+
+    def read(self, since=0, limit=None):
+        """
+        Returns the count of records written, and the (at most `limit`) most
+        recent records written after the first `since` ones, as tuples of
+        floats from the oldest to the most recent. Raises TimeoutError if
+        every one of the `retries` overlapped a write.
+        """
+        if self.map is None:
+            return 0, []
+        limit = self.capacity if limit is None else min(limit, self.capacity)
+        for __ in range(self.retries + 1):
+            sequence = COUNTER.unpack_from(self.map, SEQUENCE_OFFSET)[0]
+            if sequence % 2:
+                # in the middle of a write, which takes a few microseconds
+                time.sleep(0)
+                continue
+            count = self.count
+            if since > count:
+                # a new ring was started in the file
+                since = 0
+            records = [self.record.unpack_from(
+                self.map, HEADER_SIZE + (i % self.capacity) * self.record.size)
+                for i in range(max(since, count - limit), count)]
+            if COUNTER.unpack_from(self.map, SEQUENCE_OFFSET)[0] == sequence:
+                return count, records
+        raise TimeoutError("%s is being written for too long" % self.path)
+
+    def close(self):
+        """
+        Unmaps and closes the file (releasing the lock, if held).
+        """
+        if self.map is not None:
+            self.map.close()
+            self.map = None
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        self.locked = False
+
+    def __is_valid(self):
+        """
+        Checks if the file holds a ring with the layout and schema of this
+        one.
+        """
+        if os.fstat(self.fd).st_size != self.size:
+            return False
+        header = os.pread(self.fd, SCHEMA_OFFSET + len(self.schema), 0)
+        if len(header) < SCHEMA_OFFSET + len(self.schema):
+            return False
+        magic, version, width, capacity, schema_size, __, __, __ = \
+            HEADER.unpack_from(header)
+        return (magic, version, width, capacity, schema_size) == (
+            MAGIC, VERSION, self.width, self.capacity, len(self.schema)) \
+            and header[SCHEMA_OFFSET:] == self.schema
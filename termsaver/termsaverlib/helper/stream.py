@@ -0,0 +1,211 @@
+###############################################################################
+#
+# file:     stream.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Reads a stream of values (eg. metrics of an application, piped into the
+standard input, or written into a FIFO), charted by the system monitor
+screen (see `sysmon --stream`).
+
+The stream holds one or more values per line, either plain numbers or named
+ones (name=value), separated by blanks or commas, eg.:
+
+    12.5
+    latency=3.2 errors=0
+
+The stream is never waited for: each `StreamReader.read` takes whatever was
+written since the previous one, in as few (non-blocking) reads as possible,
+and aggregates the values of each series (count, sum, minimum, maximum and
+last value), so any number of values per second costs a single chart sample.
+
+The class available here is:
+
+    * `StreamReader`
+"""
+
+#
+# Python built-in modules
+#
+import collections
+import os
+
+Aggregate = collections.namedtuple('Aggregate', ['count', 'total', 'min',
+                                                 'max', 'last'])
+Aggregate.__doc__ = """
+The values of a series read at once: their `count`, `total`, minimum
+(`min`), maximum (`max`) and the `last` one.
+"""
+
+
+class StreamReader(object):
+    """
+    Reads the values of a stream without blocking, aggregated per series.
+
+    The main methods available here are:
+
+        * `read`: the values written since the previous read, per series
+
+        * `close`: stops reading (restoring the standard input)
+    """
+
+    default_name = 'value'
+    """
+    The name of the series of values without a name.
+    """
+
+    chunk = 65536
+    """
+    The number of bytes read at once.
+    """
+
+    limit = 1 << 22
+    """
+    The maximum number of bytes read by each `read` (the rest is left for
+    the next one, so a flooding stream can not stall the screen).
+    """
+
+    max_series = 8
+    """
+    The maximum number of series (values of other names are ignored).
+    """
+
+    names = None
+    """
+    The names of the series read so far, in the order they appeared.
+    """
+
+    errors = 0
+    """
+    The number of values that could not be read (not numbers, or in lines
+    longer than the `limit`).
+    """
+
+    def __init__(self, path='-'):
+        """
+        Opens the stream: a file (or FIFO) path, or "-" for the standard
+        input. Raises OSError if it can not be opened.
+        """
+        self.path = path
+        self.names = []
+        self.__buffer = b''
+        self.__skipping = False
+        self.__flags = None
+        if path == '-':
+            self.fd = 0
+            self.__flags = os.get_blocking(self.fd)
+            os.set_blocking(self.fd, False)
+        else:
+            # FIFOs opened this way do not wait for a writer
+            self.fd = os.open(path, os.O_RDONLY | os.O_NONBLOCK)
+
+    def read(self):
+        """
+        Returns the values of complete lines written since the previous
+        read, as an `Aggregate` per series name (series without values are
+        left out).
+        """
+        chunks = []
+        size = 0
+        while size < self.limit:
+            try:
+                data = os.read(self.fd, self.chunk)
+            except BlockingIOError:
+                break
+            if not data:
+                # end of the stream (or no writer on the FIFO, for now)
+                break
+            chunks.append(data)
+            size += len(data)
+        if not chunks:
+            return {}
+
+        data = self.__buffer + b''.join(chunks)
+        if self.__skipping:
+            # the rest of a line too long, dropped up to its end
+            start = data.find(b'\n') + 1
+            if not start:
+                return {}
+            data = data[start:]
+            self.__skipping = False
+        end = data.rfind(b'\n') + 1
+        self.__buffer = data[end:]
+        if len(self.__buffer) > self.limit:
+            # not a line of values (eg. binary data): the partial line is
+            # dropped, instead of growing without limit
+            self.errors += 1
+            self.__buffer = b''
+            self.__skipping = True
+        return self.parse(data[:end])
+
+    def parse(self, data):
+        """
+        Returns the values of the lines of text (bytes), as an `Aggregate`
+        per series name.
+        """
+        series = {}
+        for token in data.replace(b',', b' ').split():
+            name = self.default_name
+            if b'=' in token:
+                name, __, token = token.partition(b'=')
+                name = name.decode('utf-8', 'replace')
+            try:
+                value = float(token)
+            except ValueError:
+                self.errors += 1
+                continue
+            if value != value or value in (float('inf'), float('-inf')):
+                self.errors += 1
+                continue
+
+            values = series.get(name)
+            if values is None:
+                if name not in self.names:
+                    if len(self.names) >= self.max_series:
+                        continue
+                    self.names.append(name)
+                series[name] = [1, value, value, value, value]
+                continue
+            values[0] += 1
+            values[1] += value
+            if value < values[2]:
+                values[2] = value
+            if value > values[3]:
+                values[3] = value
+            values[4] = value
+        return dict([(name, Aggregate(*values))
+                     for name, values in series.items()])
+
+    def close(self):
+        """
+        Closes the stream (the standard input is only set back to blocking
+        reads, as it was).
+        """
+        if self.fd is None:
+            return
+        if self.__flags is not None:
+            os.set_blocking(self.fd, self.__flags)
+        else:
+            os.close(self.fd)
+        self.fd = None
@@ -0,0 +1,370 @@
+###############################################################################
+#
+# file:     textwidth.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Measures and wraps text by the columns it takes on a terminal, instead of by
+its number of characters (as `len` and `textwrap` do).
+
+ANSI escape sequences (eg. colours from pygments) take no columns at all,
+East Asian wide characters (eg. the zenkaku of the matrix screen) take two,
+and combining characters take none. Wide characters are looked up in a
+precomputed table of ranges (from the Unicode East Asian Width property), and
+the results are memoized per character; pure ASCII text skips all of that.
+
+The functions available here are:
+
+    * `char_width`: the columns a single character takes
+
+    * `display_width`: the columns a text takes (ignoring escape sequences)
+
+    * `strip_escapes`: removes the ANSI escape sequences of a text
+
+    * `apply_sgr`: applies the parameters of an SGR escape sequence (colours
+      and other attributes) to a normalized list of active ones
+
+    * `wrap`: wraps a text to a number of columns, keeping the colours (and
+      other attributes) active on each line
+"""
+
+#
+# Python built-in modules
+#
+import bisect
+import functools
+import re
+import unicodedata
+
+ESC = "\033"
+
+RESET = ESC + "(B" + ESC + "[m"
+"""
+Resets all text attributes (and the character set) of the terminal.
+"""
+
+ESCAPE_PATTERN = re.compile(
+    r'\033(?:\[[0-?]*[ -/]*[@-~]|[()][0-9A-Za-z]|[@-Z\\-_])')
+"""
+Matches ANSI escape sequences: control sequences (CSI, eg. colours or cursor
+movements), character set designations and the other two-character ones.
+"""
+
+_NO_STATE = ('', (), '')
+"""
+The state of the attributes of a text before any escape sequence (see
+`_apply_escape`).
+"""
+
+_TOKEN_PATTERN = re.compile(
+    r'(%s)|(\s+)|([^\s\033]+|\033)' % ESCAPE_PATTERN.pattern)
+"""
+Splits a line into escape sequences, white space and words (for `wrap`).
+"""
+
+WIDE_RANGES = (
+    (0x1100, 0x115F), (0x231A, 0x231B), (0x2329, 0x232A),
+    (0x23E9, 0x23EC), (0x23F0, 0x23F0), (0x23F3, 0x23F3),
+    (0x25FD, 0x25FE), (0x2614, 0x2615), (0x2648, 0x2653),
+    (0x267F, 0x267F), (0x2693, 0x2693), (0x26A1, 0x26A1),
+    (0x26AA, 0x26AB), (0x26BD, 0x26BE), (0x26C4, 0x26C5),
+    (0x26CE, 0x26CE), (0x26D4, 0x26D4), (0x26EA, 0x26EA),
+    (0x26F2, 0x26F3), (0x26F5, 0x26F5), (0x26FA, 0x26FA),
+    (0x26FD, 0x26FD), (0x2705, 0x2705), (0x270A, 0x270B),
+    (0x2728, 0x2728), (0x274C, 0x274C), (0x274E, 0x274E),
+    (0x2753, 0x2755), (0x2757, 0x2757), (0x2795, 0x2797),
+    (0x27B0, 0x27B0), (0x27BF, 0x27BF), (0x2B1B, 0x2B1C),
+    (0x2B50, 0x2B50), (0x2B55, 0x2B55), (0x2E80, 0x303E),
+    (0x3041, 0x3247), (0x3250, 0x4DBF), (0x4E00, 0xA4C6),
+    (0xA960, 0xA97C), (0xAC00, 0xD7A3), (0xF900, 0xFAD9),
+    (0xFE10, 0xFE19), (0xFE30, 0xFE6B), (0xFF01, 0xFF60),
+    (0xFFE0, 0xFFE6), (0x16FE0, 0x1B2FB), (0x1F004, 0x1F004),
+    (0x1F0CF, 0x1F0CF), (0x1F18E, 0x1F18E), (0x1F191, 0x1F19A),
+    (0x1F200, 0x1F320), (0x1F32D, 0x1F335), (0x1F337, 0x1F37C),
+    (0x1F37E, 0x1F393), (0x1F3A0, 0x1F3CA), (0x1F3CF, 0x1F3D3),
+    (0x1F3E0, 0x1F3F0), (0x1F3F4, 0x1F3F4), (0x1F3F8, 0x1F43E),
+    (0x1F440, 0x1F440), (0x1F442, 0x1F4FC), (0x1F4FF, 0x1F53D),
+    (0x1F54B, 0x1F54E), (0x1F550, 0x1F567), (0x1F57A, 0x1F57A),
+    (0x1F595, 0x1F596), (0x1F5A4, 0x1F5A4), (0x1F5FB, 0x1F64F),
+    (0x1F680, 0x1F6C5), (0x1F6CC, 0x1F6CC), (0x1F6D0, 0x1F6D2),
+    (0x1F6D5, 0x1F6DF), (0x1F6EB, 0x1F6EC), (0x1F6F4, 0x1F6FC),
+    (0x1F7E0, 0x1F7F0), (0x1F90C, 0x1F93A), (0x1F93C, 0x1F945),
+    (0x1F947, 0x1F9FF), (0x1FA70, 0x1FAF6), (0x20000, 0x3FFFD),
+)
+"""
+The ranges (first, last) of code points displayed in two columns: the ones
+with East Asian Width W (wide) or F (fullwidth), as of Unicode 14 (gaps of
+unassigned code points are merged into the surrounding ranges).
+"""
+
+_WIDE_STARTS = tuple([first for first, __ in WIDE_RANGES])
+"""
+The first code point of each of the `WIDE_RANGES`, for binary searches.
+"""
+
+_widths = {}
+"""
+Memoized results of `char_width`, keyed by character.
+"""
+
+
+class _Translation(dict):
+    """
+    Maps code points to what `display_width` counts instead of them, to be
+    used with `str.translate`: two spaces for wide characters, None (dropped)
+    for the ones taking no columns, and the character itself for the others.
+    Missing code points are measured (and memoized) on the fly.
+    """
+
+    def __missing__(self, code):
+        _measure(chr(code))
+        return self[code]
+
+
+_translation = _Translation()
+"""
+The `_Translation` used by `display_width`.
+"""
+
+_SGR_OFF = {
+    '21': ('1',),
+    '22': ('1', '2'),
+    '23': ('3',),
+    '24': ('4',),
+    '25': ('5', '6'),
+    '27': ('7',),
+    '28': ('8',),
+    '29': ('9',),
+}
+"""
+Maps SGR parameters that turn off attributes to the ones they turn off.
+"""
+
+
+def char_width(char):
+    """
+    Returns the number of terminal columns the informed (printable) character
+    uses: 0 for combining characters, 2 for wide (East Asian) ones, and 1 for
+    the others.
+    """
+    if char < '\u0300':
+        # fast path for ASCII and latin
+        return 1
+    width = _widths.get(char)
+    if width is None:
+        width = _measure(char)
+    return width
+
+
+def _measure(char):
+    """
+    Finds out (and memoizes) the number of columns a character uses.
+    """
+    code = ord(char)
+    i = bisect.bisect_right(_WIDE_STARTS, code) - 1
+    if code < 0x300:
+        width = 1
+    elif unicodedata.category(char) in ('Mn', 'Me', 'Cf') \
+            or 0x1160 <= code <= 0x11FF:
+        # combining marks, format characters and hangul medial vowels
+        width = 0
+    elif i >= 0 and code <= WIDE_RANGES[i][1]:
+        width = 2
+    else:
+        width = 1
+    _widths[char] = width
+    if width == 1:
+        _translation[code] = char
+    else:
+        _translation[code] = ' ' * width or None
+    return width
+
+
+def strip_escapes(text):
+    """
+    Returns the text without its ANSI escape sequences.
+    """
+    if ESC not in text:
+        return text
+    return ESCAPE_PATTERN.sub('', text)
+
+
+def display_width(text):
+    """
+    Returns the number of terminal columns the informed text (a single line)
+    uses, ignoring ANSI escape sequences.
+    """
+    if ESC in text:
+        text = ESCAPE_PATTERN.sub('', text)
+    if text.isascii():
+        return len(text)
+    # wide characters are doubled, and zero-width ones dropped
+    return len(text.translate(_translation))
+
+
+def _sgr_group(param):
+    """
+    Returns the kind of colour an SGR parameter sets ('fg' or 'bg'), or
+    None if it is not a colour.
+    """
+    if param.startswith('38') or param == '39':
+        return 'fg'
+    if param.startswith('48') or param == '49':
+        return 'bg'
+    if len(param) == 2 and param[1] in '01234567':
+        if param[0] in '39':
+            return 'fg'
+        if param[0] == '4':
+            return 'bg'
+    elif len(param) == 3 and param[:2] == '10':
+        return 'bg'
+    return None
+
+
+def apply_sgr(state, params):
+    """
+    Returns the new list of active SGR parameters, after applying the ones
+    of an escape sequence (eg. '1;31' from '\\033[1;31m') to `state`.
+
+    The state is kept normalized (resets and turned-off attributes are
+    removed, colours replace each other), so equivalent attributes always
+    produce the same prefix, no matter how they were reached.
+    """
+    state = list(state)
+    parts = params.split(';') if params else ['0']
+    i = 0
+    while i < len(parts):
+        param = parts[i].lstrip('0') or '0'
+        i += 1
+        if param in ('38', '48') and i < len(parts):
+            # extended colours: 38;5;n or 38;2;r;g;b
+            size = 2 if parts[i] == '5' else 4
+            param = ';'.join([param] + parts[i:i + size])
+            i += size
+        if param == '0':
+            state = []
+            continue
+        group = _sgr_group(param)
+        if group is not None:
+            state = [p for p in state if _sgr_group(p) != group]
+            if param not in ('39', '49'):
+                state.append(param)
+        elif param in _SGR_OFF:
+            state = [p for p in state if p not in _SGR_OFF[param]]
+        elif param not in state:
+            state.append(param)
+    return state
+
+
+@functools.lru_cache(maxsize=1024)
+def _apply_escape(state, sequence):
+    """
+    Returns the new state of the attributes, after an escape sequence. The
+    state is a tuple (escape sequences that make it active, active SGR
+    parameters, character set), starting with `_NO_STATE`. Sequences other
+    than SGR and character sets are ignored. The result is memoized.
+    """
+    __, sgr, charset = state
+    if sequence[1] == '[' and sequence[-1] == 'm':
+        sgr = tuple(apply_sgr(sgr, sequence[2:-1]))
+    elif sequence[1] == '(':
+        charset = '' if sequence[2] == 'B' else sequence
+    else:
+        return state
+    if sgr:
+        return charset + ESC + '[' + ';'.join(sgr) + 'm', sgr, charset
+    return charset, sgr, charset
+
+
+def wrap(text, width):
+    """
+    Returns a list of the lines of the text, wrapped (on white space, or
+    within words longer than a line) to the informed number of columns,
+    keeping its existing new lines. Zero width means no wrapping.
+
+    Escape sequences take no columns, and lines are self-contained: a line
+    starts with the attributes (colours, character set) active at its
+    beginning, and ends with a `RESET` if any is still active, so lines can be
+    placed anywhere on screen (eg. centered) without leaking colours.
+    """
+    lines = []
+    state = _NO_STATE
+    for line in text.split("\n"):
+        if '\t' in line:
+            line = line.expandtabs()
+        prefix = state[0]
+
+        if width <= 0 or display_width(line) <= width:
+            # fits as it is: only keep track of the escape sequences
+            if ESC in line:
+                for sequence in ESCAPE_PATTERN.findall(line):
+                    state = _apply_escape(state, sequence)
+            lines.append(prefix + line + (RESET if state[0] else ''))
+            continue
+
+        current, used, space, spacing = [prefix], 0, '', 0
+        for match in _TOKEN_PATTERN.finditer(line):
+            escape, blank, word = match.groups()
+            if escape:
+                if space:
+                    # the space goes before the escape (eg. a background)
+                    if used + spacing <= width:
+                        current.append(space)
+                        used += spacing
+                    space, spacing = '', 0
+                current.append(escape)
+                state = _apply_escape(state, escape)
+                continue
+            if blank:
+                # spaces are dropped at the beginning of wrapped lines
+                if used or match.start() == 0:
+                    space, spacing = blank, display_width(blank)
+                continue
+
+            size = display_width(word)
+            if used and used + spacing + size > width:
+                lines.append(''.join(current) + (RESET if state[0] else ''))
+                current, used, space, spacing = [state[0]], 0, '', 0
+            if space:
+                current.append(space)
+                used += spacing
+                space, spacing = '', 0
+            while used + size > width:
+                # a word longer than a line is broken between characters
+                taken, columns = 0, 0
+                for char in word:
+                    char_size = char_width(char)
+                    if used + columns + char_size > width and taken:
+                        break
+                    taken += 1
+                    columns += char_size
+                current.append(word[:taken])
+                lines.append(''.join(current) + (RESET if state[0] else ''))
+                current, used = [state[0]], 0
+                word = word[taken:]
+                size = display_width(word)
+            current.append(word)
+            used += size
+        lines.append(''.join(current) + (RESET if state[0] else ''))
+    return lines
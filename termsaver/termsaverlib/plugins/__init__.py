@@ -81,51 +81,16 @@ get familiar with it, it should be piece of cake to manage your own "space".
 
 """
 
-import inspect
-#
-# Python built-in modules
-#
-import os
-import sys
-
 #
 # Internal modules
 #
-from termsaver.termsaverlib.screen import base
+from termsaver.termsaverlib import registry
 
 
 def get_available_plugin_screens():
     """
     Gets the available screens in this package for dynamic instantiation.
     """
-    ignore_list = ['__init__.py']
-    screens = []
-    for plugin in os.listdir(os.path.join(os.path.dirname(__file__))):
-        
-        if ("__pycache__" in plugin): continue
-
-        if (os.path.isdir(os.path.join(os.path.dirname(__file__), plugin))):
-            # we are inside the plugin directory, get screens available in
-            # screens directory
-
-            for module in os.listdir(os.path.join(os.path.dirname(__file__),
-                    plugin, "screen")):
-
-                if module in ignore_list or module[-3:] != '.py':
-                    continue
-
-                module_name = plugin + ".screen." + module[:-3]
-
-                if os.path.join(os.path.dirname(__file__)) not in sys.path:
-                    sys.path.append(os.path.join(os.path.dirname(__file__)))
-
-                m = __import__(module_name, globals(), locals(),
-                        [module_name.rsplit(".", 1)[-1]])
-
-                # loop module's classes in search for the ones inheriting
-                # Screenbase and ignore name (no need) with underscore variable
-                for name, obj in inspect.getmembers(m):
-                    if inspect.isclass(obj) and issubclass(obj,
-                            base.ScreenBase) and not name.endswith("Base"):
-                        screens.append(obj)
-    return screens
+    return [registry.load_screen(entry) for entry in
+            registry.get_screen_entries()
+            if entry['module'].startswith(__name__ + '.')]
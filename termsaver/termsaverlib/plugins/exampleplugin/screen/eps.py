@@ -53,13 +53,17 @@ class ExamplePluginScreen(ExamplePluginScreenBase):
     An Example Plugin Screen
     """
 
+    name = "exampleplugin"
+
+    description = _("the example plugin")
+
     def __init__(self, parser = None):
         """
         The constructor of this class.
         """
         ScreenBase.__init__(self,
-            "exampleplugin",
-            _("the example plugin"),
+            self.name,
+            self.description,
             parser
         )
         self.cleanup_per_cycle = True
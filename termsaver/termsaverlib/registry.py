@@ -0,0 +1,269 @@
+###############################################################################
+#
+# file:     registry.py
+#
+# Purpose:  keeps an on-disk manifest of the screens available to termsaver.
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Keeps a registry of the screens available to termsaver (built-in and plugins),
+so the application does not need to import every screen module on launch.
+
+The registry is a manifest (screen name, module path, class name and
+description) stored in the termsaver directory (see `common.get_app_dir`).
+It is rebuilt, by importing all screen modules, only when the package version,
+the locale or the screen modules themselves (by their modification times)
+change.
+
+The functions available here are:
+
+    * `get_screen_sources`: lists the packages/directories holding screens
+
+    * `get_screen_entries`: retrieves the manifest entries of all screens
+
+    * `find_screen`: imports and returns the class of a single screen
+
+    * `load_screen`: imports and returns the class of a manifest entry
+"""
+
+#
+# Python built-in modules
+#
+import importlib
+import inspect
+import json
+import os
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib import common, constants
+
+MANIFEST_FILE = 'screens.json'
+"""
+The name of the manifest file, stored in the termsaver directory.
+"""
+
+MANIFEST_FORMAT = 1
+"""
+The version of the manifest structure. Change it whenever the structure of
+the entries changes, to force old manifests to be rebuilt.
+"""
+
+__entries = {}
+"""
+Memoized manifest entries for the current process, keyed by the sources
+they were built from.
+"""
+
+
+def get_screen_sources():
+    """
+    Returns a list of tuples (package, directory) of the locations holding
+    screen modules: the built-in `screen` package, followed by the `screen`
+    package of each installed plugin.
+    """
+    lib_dir = os.path.dirname(__file__)
+    sources = [('termsaver.termsaverlib.screen',
+                os.path.join(lib_dir, 'screen'))]
+
+    plugins_dir = os.path.join(lib_dir, 'plugins')
+    for plugin in sorted(os.listdir(plugins_dir)):
+        path = os.path.join(plugins_dir, plugin, 'screen')
+        if plugin.startswith('__') or not os.path.isdir(path):
+            continue
+        sources.append(('termsaver.termsaverlib.plugins.%s.screen' % plugin,
+                        path))
+    return sources
+
+
+def list_screen_modules(sources):
+    """
+    Returns a list of tuples (module path, file path) of all screen modules
+    available in the informed sources, without importing them.
+    """
+    modules = []
+    for package, path in sources:
+        for module in sorted(os.listdir(path)):
+            if module == '__init__.py' or module[-3:] != '.py':
+                continue
+            modules.append(("%s.%s" % (package, module[:-3]),
+                            os.path.join(path, module)))
+    return modules
+
+
+def build_fingerprint(modules):
+    """
+    Builds the data used to validate a manifest: the termsaver version,
+    the current locale (descriptions are translated), and the modification
+    time and size of each screen module.
+    """
+    files = []
+    for module, path in modules:
+        st = os.stat(path)
+        files.append([module, st.st_mtime_ns, st.st_size])
+
+    locale = [os.environ.get(key, '') for key in
+              ('LANGUAGE', 'LC_ALL', 'LC_MESSAGES', 'LANG')]
+
+    return {
+        'format': MANIFEST_FORMAT,
+        'version': constants.App.VERSION,
+        'locale': locale,
+        'files': files,
+    }
+
+
+def scan_screens(modules):
+    """
+    Imports all informed screen modules, and returns a list of manifest
+    entries for the screens found in them. This is the expensive path that
+    the manifest is meant to avoid.
+    """
+    # imported here to avoid circular imports (base imports this package)
+    from termsaver.termsaverlib.screen.base import ScreenBase
+
+    entries = []
+    for module, __ in modules:
+        m = importlib.import_module(module)
+
+        # loop module's classes in search for the ones inheriting Screenbase
+        # and ignore name (no need) with underscore variable
+        for name, obj in inspect.getmembers(m, inspect.isclass):
+            if not issubclass(obj, ScreenBase) or name.endswith("Base") \
+                    or obj.__module__ != m.__name__:
+                continue
+            if not obj.name:
+                # older screens only define their name when instantiated
+                obj = obj()
+            entries.append({
+                'name': obj.name,
+                'module': module,
+                'class': name,
+                'description': obj.description,
+            })
+    return entries
+
+
+def get_manifest_path():
+    """
+    Returns the location of the manifest file, or None if the termsaver
+    directory is not accessible.
+    """
+    try:
+        return os.path.join(common.get_app_dir(), MANIFEST_FILE)
+    except (KeyError, OSError):
+        return None
+
+
+def read_manifest(path, fingerprint):
+    """
+    Returns the entries stored in the manifest file, or None if it does not
+    exist, can not be read, or is outdated (based on the fingerprint).
+    """
+    if path is None:
+        return None
+    try:
+        with open(path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(manifest, dict) \
+            or manifest.get('fingerprint') != fingerprint:
+        return None
+    return manifest.get('screens')
+
+
+def write_manifest(path, fingerprint, entries):
+    """
+    Stores the entries in the manifest file. Errors here are ignored, as
+    the registry works (just slower) without the manifest.
+    """
+    if path is None:
+        return
+    temp_path = "%s.%d" % (path, os.getpid())
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump({'fingerprint': fingerprint, 'screens': entries}, f)
+        # atomic, so concurrent launches never read a partial manifest
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+
+def get_screen_entries(sources=None, manifest_path=False):
+    """
+    Retrieves the manifest entries of all screens available, as a list of
+    dictionaries with keys: name, module, class and description.
+
+    The manifest is only rebuilt (importing all screen modules) if it is
+    missing or outdated.
+
+    Arguments:
+
+        * sources: the list of (package, directory) to look for screens.
+          Defaults to `get_screen_sources`.
+
+        * manifest_path: the manifest location. Defaults to
+          `get_manifest_path`; use None to disable the on-disk manifest.
+    """
+    if sources is None:
+        sources = get_screen_sources()
+    key = tuple(sources)
+    if key in __entries:
+        return __entries[key]
+
+    if manifest_path is False:
+        manifest_path = get_manifest_path()
+
+    modules = list_screen_modules(sources)
+    fingerprint = build_fingerprint(modules)
+    entries = read_manifest(manifest_path, fingerprint)
+    if entries is None:
+        entries = scan_screens(modules)
+        write_manifest(manifest_path, fingerprint, entries)
+
+    __entries[key] = entries
+    return entries
+
+
+def load_screen(entry):
+    """
+    Imports the module of a manifest entry and returns its screen class.
+    """
+    return getattr(importlib.import_module(entry['module']), entry['class'])
+
+
+def find_screen(name, sources=None, manifest_path=False):
+    """
+    Returns the screen class registered with the informed name, or None if
+    there is no such screen. Only the module of that screen is imported.
+
+    See `get_screen_entries` for details on the other arguments.
+    """
+    for entry in get_screen_entries(sources, manifest_path):
+        if entry['name'].lower() == name.lower():
+            return load_screen(entry)
+    return None
@@ -29,7 +29,7 @@ This module itself holds simple functions to better handle the screens
 available within this package. Available functions:
 
     * `get_available_screens`: Gets the available screens in this package for
-       dynamic instantiation.
+       dynamic instantiation (see also `termsaverlib.registry`).
 
     * `build_screen_usage_list`: Builds a simple string with a list of all
        available screens, to be used in usage() methods.
@@ -67,57 +67,32 @@ This also contains the following sub-packages:
        reusable functionality to them
 """
 
-import inspect
-#
-# Python built-in modules
-#
-import os
-import sys
-
-from termsaver.termsaverlib.plugins import get_available_plugin_screens
 #
 # Internal modules
 #
-from termsaver.termsaverlib.screen import base
+from termsaver.termsaverlib import registry
 
 
 def get_available_screens():
     """
-    Gets the available screens in this package for dynamic instantiation.
-    """
-    ignore_list = ['__init__.py']
-    screens = []
-    
-    # for module in absoluteFilePaths(os.path.join(os.path.dirname(__file__))): 
-    sys.path.insert(1, os.path.join(os.path.dirname(__file__)))
-
-    for module in os.listdir(os.path.join(os.path.dirname(__file__))):
-        if module in ignore_list or module[-3:] != '.py':
-            continue
+    Gets the available screens in this package (and installed plugins) for
+    dynamic instantiation.
 
-        module_name = module[:-3]
-        m = __import__(module_name, globals(), locals())
-
-        # loop module's classes in search for the ones inheriting Screenbase
-        # and ignore name (no need) with underscore variable
-        for name, obj in inspect.getmembers(m):
-            if inspect.isclass(obj) and issubclass(obj, base.ScreenBase) \
-                    and not name.endswith("Base"):
-                screens.append(obj)
-
-    # find plugins
-    screens.extend(get_available_plugin_screens())
-
-    return screens
+    Note that this imports all screen modules. Prefer `registry.find_screen`
+    or `registry.get_screen_entries` when possible.
+    """
+    return [registry.load_screen(entry) for entry in
+            registry.get_screen_entries()]
 
 def build_screen_usage_list():
     """
     Builds a simple string with a list of all available screens,
-    to be used in usage() methods.
+    to be used in usage() methods. This relies only on the screen registry,
+    so no screen module is imported here.
     """
-    screens = get_available_screens()
-    screen_space = max([len(s().name) for s in screens])
+    entries = registry.get_screen_entries()
+    screen_space = max([len(e['name']) for e in entries])
 
-    return '\n '.join([''.join([s().name, ' ',
-                        ' ' * (screen_space - len(s().name) + 1),
-                        s().description]) for s in get_available_screens()])
+    return '\n '.join([''.join([e['name'], ' ',
+                        ' ' * (screen_space - len(e['name']) + 1),
+                        e['description']]) for e in entries])
@@ -70,6 +70,10 @@ class AsciiArtFartsScreen(SimpleUrlFetcherBase, PositionHelperBase):
           is displayed
     """
 
+    name = "asciiartfarts"
+
+    description = _("displays ascii images from asciiartfarts.com (NSFW)")
+
     def __init__(self, parser = None):
         """
         The constructor of this class, using most default values from its super
@@ -81,8 +85,8 @@ class AsciiArtFartsScreen(SimpleUrlFetcherBase, PositionHelperBase):
         NOTE: Maybe NSFW (Not Safe For Work)
         """
         SimpleUrlFetcherBase.__init__(self,
-            "asciiartfarts",
-            _("displays ascii images from asciiartfarts.com (NSFW)"),
+            self.name,
+            self.description,
             parser,
             'http://www.asciiartfarts.com/random.cgi',
         )
@@ -58,7 +58,8 @@ It is very simple to inherit from these base classes and create your own
 screen. See some of the examples implemented here already. Basically, you will
 need to:
 
-    * define a name and description for your screen (class instantiation)
+    * define a name and description for your screen (as class attributes,
+      so termsaver can list and select screens without instantiating them)
       and keep them as short as possible (avoid too much typing)
 
     * if applicable, define your command-line usage guidelines and options
@@ -69,6 +70,8 @@ need to:
     * build your action by overriding the `_run_cycle` method, if applicable
       (the base class will be triggered by the `autorun` method that loops
       indefinitely or until there is a keyboard interruption (ctrl+C).
+      Instead of sleeping in it, register how often it should run with
+      `register_tick`, and let the scheduler keep the pace.
 
 Before you start, though, I strongly advise you to check out the code here
 thoroughly, to avoid reinventing the wheel in parts that are already covered.
@@ -82,24 +85,23 @@ consistent).
 #
 # Python built-in modules
 #
-import subprocess
 import sys
 
+from termsaver.termsaverlib.helper.scheduler import FrameScheduler
 from termsaver.termsaverlib.helper.utilities import show_stdout_cursor
 
-pynput_installed = None
-reqs = subprocess.check_output([sys.executable, '-m', 'pip', 'freeze'])
-installed_packages = [r.decode().split('==')[0] for r in reqs.split()]
-if 'pynput' in installed_packages:
-    pynput_installed = True
-    from pynput import keyboard
-
 #
 # Internal modules
 #
-from termsaver.termsaverlib import constants
+from termsaver.termsaverlib import capabilities, constants, exception
+
+pynput_installed = capabilities.is_available('pynput')
+
+# only imported when a screen starts running (see `ScreenBase.autorun`)
+keyboard = capabilities.lazy_import('pynput.keyboard')
+
 from termsaver.termsaverlib.i18n import _
-from termsaver.termsaverlib.screen.helper import ScreenHelperBase
+from termsaver.termsaverlib.screen.helper import ScreenHelperBase, position
 
 
 class ScreenBase(ScreenHelperBase):
@@ -135,6 +137,11 @@ class ScreenBase(ScreenHelperBase):
            will inform the screen as a prefix to the message being displayed
            on screen.
 
+        * `register_tick`: defines the interval in which `_run_cycle` (or
+           any other method) is called by `autorun`, so the screen does not
+           need to sleep on its own. Screens that do not register ticks have
+           their `_run_cycle` called in a loop (limited by `fps`).
+
     You can also use the following optional property:
 
         * `cleanup_per_cycle`:  Defines if the screen should be cleaned up for
@@ -146,7 +153,8 @@ class ScreenBase(ScreenHelperBase):
 
     name = ''
     """
-    Defines the name of the screen.
+    Defines the name of the screen. Inheriting screens should set this at
+    class level, as it is read by the screen registry without instantiation.
     """
 
     parser = None
@@ -156,7 +164,14 @@ class ScreenBase(ScreenHelperBase):
 
     description = ''
     """
-    Defines the description (short) of the screen.
+    Defines the description (short) of the screen. Inheriting screens should
+    set this at class level too (see `name`).
+    """
+
+    listener = None
+    """
+    The keyboard listener (only if pynput is installed), created when the
+    screen starts running (see `autorun`).
     """
 
     cleanup_per_cycle = False
@@ -165,6 +180,24 @@ class ScreenBase(ScreenHelperBase):
     (new file).
     """
 
+    fps = None
+    """
+    Defines the maximum frames (cycles) per second of the screen, set by the
+    `--fps` command-line option. None means no limit.
+    """
+
+    ticks = None
+    """
+    The intervals (in seconds) in which methods of the screen should be
+    called by `autorun`, as tuples (interval, aligned), keyed by the methods.
+    See `register_tick`.
+    """
+
+    scheduler = None
+    """
+    The `FrameScheduler` running the screen ticks (created by `autorun`).
+    """
+
     def __init__(self, name, description, parser=None):
         """
         The basic constructor of this class. You need to inform basic
@@ -180,22 +213,21 @@ class ScreenBase(ScreenHelperBase):
         self.parser = parser
         if self.parser:
             self.parser.prog = "termsaver " + name
+            self.parser.add_argument("--fps", type=float, default=None,
+                help=_("Limits the frames (cycles) per second of the screen."))
 
         self.name = name
         self.description = description
-        
-        if pynput_installed is not None:
-            self.listener = keyboard.Listener(
-                on_press=self.on_press,
-                on_release=self.on_release
-            )
     
     def on_press(self, key):
         """
         This method is called when a key is pressed.
         """
-        if pynput_installed is not None:
+        if self.listener is not None:
             self.listener.stop()
+        if self.scheduler is not None:
+            # no need to wait for the next frame to exit
+            self.scheduler.wake()
     
     def on_release(self, key):
         """
@@ -204,6 +236,26 @@ class ScreenBase(ScreenHelperBase):
         """
         pass
 
+    def register_tick(self, interval, callback=None, aligned=False):
+        """
+        Registers a method to be called by `autorun` every `interval`
+        seconds, on a fixed schedule (the time spent in the method does not
+        delay the next call). Registering the same method again only changes
+        its interval.
+
+        Arguments:
+
+            * interval: the time, in seconds, between calls
+
+            * callback: the method to be called (defaults to `_run_cycle`)
+
+            * aligned: if the calls should happen right after each multiple
+              of the interval in wall clock time (eg. when a second starts)
+        """
+        if self.ticks is None:
+            self.ticks = {}
+        self.ticks[callback or self._run_cycle] = (interval, aligned)
+
     def autorun(self, loop=True):
         """
         The accessible method for dynamically running a screen.
@@ -225,28 +277,54 @@ class ScreenBase(ScreenHelperBase):
                     (Ctrl+C) is pressed), or not. This is up to the screen
                     action (or end-user through configuable setting) to decide.
         """
+        if self.parser:
+            args, __ = self.parser.parse_known_args()
+            if args.fps is not None:
+                if args.fps <= 0:
+                    raise exception.InvalidOptionException("fps",
+                        _("Must be higher than zero"))
+                self.fps = args.fps
+
+        self.scheduler = FrameScheduler(self.fps)
+        ticks = self.ticks or {self._run_cycle: (0, False)}
+        for callback, (interval, aligned) in ticks.items():
+            self.scheduler.add(interval, callback, aligned)
+
+        # a resized terminal is redrawn right away
+        position.add_resize_listener(self.scheduler.redraw)
+
         # execute the cycle
         self.clear_screen()
 
-        if pynput_installed is not None:
+        if pynput_installed:
+            # only created here, so listing or parsing screens is cheap
+            self.listener = keyboard.Listener(
+                on_press=self.on_press,
+                on_release=self.on_release
+            )
             self.listener.start()
-        while(
-            (loop and pynput_installed is None)
-            or
-            (loop and pynput_installed is not None and self.listener.is_alive())
-        ):
-            try:
-                self._run_cycle()
-            except KeyboardInterrupt as e:
-                #
-                # do some cleanup if applicable
-                #
-                self._on_keyboard_interrupt()
-                raise e
-
-            # Clear screen if appropriate
-            if self.cleanup_per_cycle:
-                self.clear_screen()
+        try:
+            while(
+                (loop and not pynput_installed)
+                or
+                (loop and pynput_installed and self.listener.is_alive())
+            ):
+                try:
+                    # waits for the next frame, and runs the cycle
+                    cycles = self.scheduler.step()
+                except KeyboardInterrupt as e:
+                    #
+                    # do some cleanup if applicable
+                    #
+                    self._on_keyboard_interrupt()
+                    raise e
+
+                # Clear screen if appropriate
+                if cycles and self.cleanup_per_cycle:
+                    self.clear_screen()
+        finally:
+            position.remove_resize_listener(self.scheduler.redraw)
+            self.scheduler.close()
         show_stdout_cursor()
 
     def _run_cycle(self):
@@ -34,15 +34,15 @@ The helper class available here is:
     * `FileReaderBase`
 """
 
-import importlib
 #
 # Python built-in modules
 #
+import itertools
 import os
 import queue  # as queue
 from threading import Thread
 
-from termsaver.termsaverlib import constants, exception
+from termsaver.termsaverlib import capabilities, constants, exception
 from termsaver.termsaverlib.i18n import _
 #
 # Internal modules
@@ -50,6 +50,12 @@ from termsaver.termsaverlib.i18n import _
 from termsaver.termsaverlib.screen.base import ScreenBase
 from termsaver.termsaverlib.screen.helper.typing import TypingHelperBase
 
+# pygments is only imported when a file is actually highlighted
+pygments = capabilities.lazy_import('pygments')
+formatters = capabilities.lazy_import('pygments.formatters')
+lexers = capabilities.lazy_import('pygments.lexers')
+pygments_util = capabilities.lazy_import('pygments.util')
+
 
 class FileReaderBase(ScreenBase, TypingHelperBase):
     """
@@ -80,6 +86,13 @@ class FileReaderBase(ScreenBase, TypingHelperBase):
 
     cleanup_per_file = False
 
+    max_highlight_size = 1024 * 1024
+    """
+    Defines the maximum size, in bytes, of files colorized with pygments
+    (which requires the whole file in memory). Larger files are typed as
+    they are read, without colors.
+    """
+
     def __init__(self, name, description, parser, path=None, delay=None):
         """
         Creates a new instance of this class.
@@ -112,14 +125,7 @@ class FileReaderBase(ScreenBase, TypingHelperBase):
 
     def _run_cycle(self):
         if self.is_initalized is False:
-            #if 'pygments' in sys.modules:
-            pygments_spec = importlib.util.find_spec('pygments')
-            found = pygments_spec is not None
-            if found is True:
-                from pygments import highlight
-                from pygments.formatters import TerminalFormatter
-                from pygments.lexers import guess_lexer
-                self.pygments_installed = True
+            self.pygments_installed = capabilities.is_available('pygments')
             self.is_initalized = True
         """
         Executes a \"cycle\" of this screen.
@@ -141,7 +147,8 @@ class FileReaderBase(ScreenBase, TypingHelperBase):
                 * I imagine that this behaves unpredictably given a computer
                   with __REALLY__ slow I/O
             * Opens `nextFile` with handle-auto-closing `with` statement and
-              `typing_print()`s it
+              `typing_print_stream()`s it, chunk by chunk (or `typing_print()`s
+              it whole, if colorized)
             * Clears screen if `self.cleanup_per_file`
             * Puts `nextFile` ON the queue
                 * Because `queue_of_valid_files.get()` REMOVES a file path
@@ -177,18 +184,39 @@ class FileReaderBase(ScreenBase, TypingHelperBase):
         self.clear_screen()
 
         while nextFile:
-            with open(nextFile, 'r') as f:
-                file_data = f.read()
-                if self.pygments_installed is True:
-                    if self.colorize is True:
-                        lexer = guess_lexer(file_data)
-                        formatter = TerminalFormatter
-                        file_data = highlight(file_data,lexer,formatter())
-                self.typing_print(file_data)
+            with open(nextFile, 'rb') as f:
+                if self.pygments_installed is True and self.colorize is True \
+                        and os.fstat(f.fileno()).st_size <= \
+                        self.max_highlight_size:
+                    file_data = f.read().decode('utf-8', 'replace')
+                    self.typing_print(self._highlight(nextFile, file_data))
+                else:
+                    chunks = iter(lambda: f.read(
+                        constants.Settings.STREAM_CHUNK_SIZE), b'')
+                    self.typing_print_stream(itertools.chain(chunks, [b'\n']))
             if self.cleanup_per_file:
                 self.clear_screen()
             queue_of_valid_files.put(nextFile)
             nextFile = queue_of_valid_files.get()
+
+    def _highlight(self, path, data):
+        """
+        Returns the data colorized with pygments. The lexer is picked by
+        the file name first, which only loads that lexer, and only guessed
+        from the contents (which loads all lexers) as a last resort.
+
+        Arguments:
+
+            * path: the file location
+
+            * data: the file contents
+        """
+        try:
+            lexer = lexers.get_lexer_for_filename(path, data)
+        except pygments_util.ClassNotFound:
+            lexer = lexers.guess_lexer(data)
+        return pygments.highlight(data, lexer, formatters.TerminalFormatter())
+
     def _usage_options_example(self):
         """
         Describe here the options and examples of this screen.
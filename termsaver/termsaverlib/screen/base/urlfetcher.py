@@ -34,6 +34,11 @@ The helper classes available here are:
     * `SimpleUrlFetcherBase`
 """
 
+#
+# Python built-in modules
+#
+import itertools
+
 from termsaver.termsaverlib import constants, exception
 from termsaver.termsaverlib.i18n import _
 #
@@ -92,11 +97,12 @@ class UrlFetcherBase(TypingHelperBase,
         The actions taken here, for each cycle, are as follows:
 
             * retrieve data from `url`
-            * print using `typing_print`
+            * print using `typing_print_stream`, while downloading
         """
-        data = self.fetch(self.url)
+        # the contents are typed while still downloading
+        chunks = self.fetch_stream(self.url)
         self.clear_screen()
-        self.typing_print(data.decode("utf-8"))
+        self.typing_print_stream(itertools.chain(chunks, [b'\n']))
 
     def _message_no_url(self):
         """
@@ -39,19 +39,21 @@ import argparse
 # Python mobdules
 #
 import datetime
-import time
+import math
+import os
 
-from termsaver.termsaverlib import common
+from termsaver.termsaverlib import common, exception
+from termsaver.termsaverlib.helper import figlet
 from termsaver.termsaverlib.helper.smartformatter import SmartFormatter
 from termsaver.termsaverlib.i18n import _
 #
 # Internal modules
 #
 from termsaver.termsaverlib.screen.base import ScreenBase
-from termsaver.termsaverlib.screen.helper.position import PositionHelperBase
+from termsaver.termsaverlib.screen.helper.renderer import RendererHelperBase
 
 
-class ClockScreen(ScreenBase, PositionHelperBase):
+class ClockScreen(ScreenBase, RendererHelperBase):
     """
     Simple screen that displays the time on the terminal window.
 
@@ -61,11 +63,23 @@ class ClockScreen(ScreenBase, PositionHelperBase):
     From its base classes, the functionality provided here bases on the
     settings defined below:
 
-        * clean up each cycle: True
-          this will force the screen to be cleaned (cleared) before each new
-          cycle is displayed
+        * clean up each cycle: False
+          the clock is drawn with the renderer helper, which only updates
+          the characters that changed since the previous cycle
+
+    The glyphs of the fonts are compiled once into rows (see
+    `compile_glyphs`), and on each cycle only the glyphs whose value changed
+    are drawn again, at their position on screen.
+
+    Cycles are aligned to the wall clock: they run right after each second
+    starts (or each half second, for the blinking separator), so seconds are
+    never skipped nor displayed twice.
     """
 
+    name = "clock"
+
+    description = _("displays a digital clock on screen")
+
     ampm = False
     """
     Defines the format of the datetime to be displayed.
@@ -93,7 +107,14 @@ class ClockScreen(ScreenBase, PositionHelperBase):
 
     show_separator = True
     """
-    Defines if the clock separator should be displayed
+    Defines if the clock separator should be displayed (it blinks, being
+    hidden in the second half of each second)
+    """
+
+    time_source = None
+    """
+    A function returning the current date and time (defaults to
+    `datetime.datetime.now`), that can be replaced (eg. for testing).
     """
 
     lineindigimap = 6
@@ -145,13 +166,29 @@ class ClockScreen(ScreenBase, PositionHelperBase):
         ' ' : '     \n     \n     \n     \n     \n     \n     \n     \n     \n     \n     \n     \n     \n     \n     \n',
     }
 
+    glyphs = None
+    """
+    The glyphs of `digmap`, compiled into rows (see `compile_glyphs`).
+    """
+
+    binary_glyphs = None
+    """
+    The glyphs of the binary clock digits, compiled into rows (see
+    `compile_binary_glyphs`).
+    """
+
+    __drawn = None
+    """
+    The state of the frame (layout and glyphs drawn) after the last cycle.
+    """
+
     def __init__(self, parser = None):
         """
         The constructor of this class.
         """
         ScreenBase.__init__(self,
-            "clock",
-            _("displays a digital clock on screen"),
+            self.name,
+            self.description,
             parser
         )
         if self.parser:
@@ -159,43 +196,58 @@ class ClockScreen(ScreenBase, PositionHelperBase):
             self.parser.add_argument("-g","--giant", help="Giant mode using a constrast block method.", action="store_true", default=False)
             self.parser.add_argument("-b", "--binary", help="Binary clock mode.", action="store_true", default=False)
             self.parser.add_argument("-s","--size", help="Size of the binary clock in characters.", action="store", default=3, type=int)
+            self.parser.add_argument("-f","--font", help="Path of a FIGlet font (.flf) to draw the clock with.", action="store", default=None)
 
-        self.cleanup_per_cycle = True
+        self.cleanup_per_cycle = False
 
     def _run_cycle(self):
         """
         Executes a cycle of this screen.
         """
-        # calculate random position based on screen size
-        self.get_terminal_size()
-
-        date_time = datetime.datetime.now()
-
-        text = """
-%s
-%s
-""" % (
-       date_time.strftime('%A, %%d%%s %B %Y') % (date_time.day,
-                common.get_day_suffix(date_time.day)),
-       self.get_binary_coded_clock(date_time) if self.binary else self.get_ascii_time(date_time),
-       )
-
-        text = self.center_text_horizontally(text)
-        text = self.center_text_vertically(text)
+        # also calculates the position based on screen size
+        frame = self.begin_frame(clear=False)
 
-        print(text)
+        date_time = self.get_time()
+        date = date_time.strftime('%A, %%d%%s %B %Y') % (date_time.day,
+            common.get_day_suffix(date_time.day))
 
-        sleep_time = 1 # usually one cycle per second
-        if self.ampm:
-            # special case to show blinking separator
-            sleep_time = 0.7
-
-        time.sleep(sleep_time)
+        if self.binary:
+            glyphs = self.get_binary_glyphs()
+            keys = self.get_binary_digits(date_time)
+        else:
+            glyphs = self.get_glyphs()
+            keys = self.get_clock_text(date_time)
+
+        # the date and the clock are each centered on screen, with a blank
+        # line above the date, and two below the clock
+        widths = tuple([len(glyphs[key][0]) for key in keys])
+        height = len(glyphs[keys[0]])
+        x = max(0, int(math.ceil((self.geometry['x'] - sum(widths)) / 2.0)))
+        date_x = max(0, int(math.ceil(
+            (self.geometry['x'] - len(date)) / 2.0)))
+        y = max(0, int(math.floor((self.geometry['y'] - height - 4) / 2.0)))
+
+        state = (frame, x, y, date, widths)
+        if self.__drawn is None or self.__drawn[0] != state:
+            frame.clear()
+            frame.draw(date, date_x, y + 1)
+            self.__drawn = (state, [None] * len(keys))
+
+        # only the glyphs that changed are drawn again
+        drawn = self.__drawn[1]
+        for i, key in enumerate(keys):
+            if drawn[i] != key:
+                frame.draw("\n".join(glyphs[key]), x, y + 2)
+                drawn[i] = key
+            x += widths[i]
+
+        self.render()
 
     def _usage_options_example(self):
         return (_("""
         termsaver clock -mb         Shows the clock in 12 hour and big mode.
-        termsaver clock --big       Shows the clock in big mode."""))
+        termsaver clock --big       Shows the clock in big mode.
+        termsaver clock -f big.flf  Shows the clock with a FIGlet font."""))
 
     def _parse_args(self, launchScreenImmediately=True):
         
@@ -210,58 +262,107 @@ class ClockScreen(ScreenBase, PositionHelperBase):
             self.lineindigimap = 15
             self.digmap = self.digimapbig
 
+        # compiled again on the next cycle
+        self.glyphs = None
+        self.binary_glyphs = None
+
+        if args.font:
+            self.glyphs = self.load_font(args.font)
+
+        # one cycle when each second starts
+        interval = 1
+        if (self.ampm or self.giant) and not self.binary:
+            # and another in the middle, to blink the separator
+            interval = 0.5
+        self.register_tick(interval, aligned=True)
+
         if launchScreenImmediately:
             self.autorun()
         else:
             return self
             
 
-    
-    def get_binary_coded_clock(self, date_time):
-        
-        hours = int(date_time.strftime('%H'))
+    def get_time(self):
+        """
+        Returns the current date and time (see `time_source`).
+        """
+        return (self.time_source or datetime.datetime.now)()
+
+    def load_font(self, path):
+        """
+        Returns the glyphs of a FIGlet font file (see `figlet.load_font`),
+        with a blank separator as wide as the colon, for blinking.
+        """
+        if not os.path.exists(path):
+            raise exception.PathNotFoundException(path,
+                _("Make sure the file or directory exists."))
+        try:
+            font = figlet.load_font(path)
+        except (OSError, ValueError) as e:
+            raise exception.InvalidOptionException("font",
+                _("Not a valid FIGlet font: %s") % e)
+
+        glyphs = dict(font.glyphs)
+        self.lineindigimap = font.height
+        glyphs[' '] = tuple([' ' * len(glyphs[':'][0])] * font.height)
+        return glyphs
+
+    def get_glyphs(self):
+        """
+        Returns the glyphs of `digmap`, compiled into rows (only once).
+        """
+        if self.glyphs is None:
+            self.glyphs = compile_glyphs(self.digmap, self.lineindigimap)
+        return self.glyphs
+
+    def get_binary_glyphs(self):
+        """
+        Returns the glyphs of the binary clock digits, compiled into rows
+        (only once).
+        """
+        if self.binary_glyphs is None:
+            self.binary_glyphs = compile_binary_glyphs(self.cube_size)
+        return self.binary_glyphs
+
+    def get_binary_digits(self, date_time):
+        """
+        Returns the six digits (hours, minutes and seconds) displayed by the
+        binary clock.
+        """
+        hours = date_time.hour
         if self.ampm and hours >= 12:
             hours -= 12
-        minutes = int(date_time.strftime('%M'))
-        seconds = int(date_time.strftime('%S'))
+        return "%02d%02d%02d" % (hours, date_time.minute, date_time.second)
 
-        h1 = bin(hours // 10)[2:].zfill(4)
-        h2 = bin(hours % 10)[2:].zfill(4)
-        
-        m1 = bin(minutes // 10)[2:].zfill(4)
-        m2 = bin(minutes % 10)[2:].zfill(4)
-        
-        s1 = bin(seconds // 10)[2:].zfill(4)
-        s2 = bin(seconds % 10)[2:].zfill(4)
-        
-        output = ""
-        for x in range(0, 4):
-            line = [h1[x],h2[x],m1[x],m2[x],s1[x],s2[x]]
-            for w in range(0, 1):
-                for h in range(0, self.cube_size):
-                    for num in line:
-                        if (num == "1"):
-                            output += "".join(["#" for c in range(0,self.cube_size)]) + " "
-                        else:
-                            output += "".join([" " for c in range(0,self.cube_size)]) + " "
-                    output += "\n"
-                output += "\n"
-        return output
+    def get_binary_coded_clock(self, date_time):
+        """
+        Returns the binary coded (BCD) representation of a time, each digit
+        in a column of four bits.
+        """
+        return compose_glyphs(self.get_binary_glyphs(),
+                              self.get_binary_digits(date_time))
 
     def get_ascii_time(self, date_time):
         """
         Returns the ASCII representation of a date.
         """
+        return compose_glyphs(self.get_glyphs(),
+                              self.get_clock_text(date_time))
+
+    def get_clock_text(self, date_time):
+        """
+        Returns the characters of the clock (keys of `digmap`) for the time
+        informed. The separator blinks in 12 hour and giant modes.
+        """
 
         # shows/hides separator for a blinking effect
         # Moved here so as not to duplicate in big number. Default used self.cseparator
+        self.show_separator = date_time.microsecond < 500000
         separator = ""
         if self.show_separator:
             separator = self.cseparator
-            self.show_separator = False
         else:
             separator = " "
-            self.show_separator = True
 
         # define clock string based on options (12/24)
         if self.ampm:
@@ -283,14 +384,42 @@ class ClockScreen(ScreenBase, PositionHelperBase):
             # 24hs format includes seconds
             clock = date_time.strftime('%H' + self.cseparator + '%M' + self.cseparator + '%S')
 
-        items = []
-        for c in clock:
-            items.append(self.digmap[c])
-        output = ''
-        for i in range(self.lineindigimap):  # loop lines of chars - Increased to six for extra font line
-            temp = ''
-            for item in items:
-                temp += item.split('\n')[i]
-            output += temp + '\n'
-
-        return output
+        return clock
+
+
+def compile_glyphs(digmap, lines):
+    """
+    Compiles the glyphs of a font map (character to its ascii art, with one
+    line per row) into a dictionary of tuples with the rows of each glyph,
+    all padded to the width of the glyph.
+    """
+    glyphs = {}
+    for char, art in digmap.items():
+        rows = (art.split('\n') + [''] * lines)[:lines]
+        width = max([len(row) for row in rows])
+        glyphs[char] = tuple([row.ljust(width) for row in rows])
+    return glyphs
+
+
+def compile_binary_glyphs(size):
+    """
+    Compiles the glyphs of the binary clock digits (0 to 9): a column of
+    four bits, each a cube of the informed size followed by a blank row.
+    """
+    on, off = "#" * size + " ", " " * (size + 1)
+    glyphs = {}
+    for digit in range(10):
+        rows = []
+        for bit in bin(digit)[2:].zfill(4):
+            rows.extend([on if bit == "1" else off] * size)
+            rows.append(off)
+        glyphs[str(digit)] = tuple(rows)
+    return glyphs
+
+
+def compose_glyphs(glyphs, text):
+    """
+    Returns the text composed with the compiled glyphs, side by side.
+    """
+    items = [glyphs[char] for char in text]
+    return ''.join([''.join(row) + '\n' for row in zip(*items)])
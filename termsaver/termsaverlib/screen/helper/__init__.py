@@ -37,6 +37,12 @@ The available classes in this package are:
     * `ScreenHelperBase`: the main helper class from which all helper classes
       will inherit from.
 
+    * `position.PositionHelperBase`: helper functionality to position
+      text on screen, based on the terminal dimensions.
+
+    * `renderer.RendererHelperBase`: helper functionality to render frames
+      on screen, writing only what changed since the previous frame.
+
     * `typing.TypingHelperBase`: helper functionality to display typing writer
       effects for screens.
 
@@ -50,6 +56,7 @@ The available classes in this package are:
 #
 # Python built-in modules
 #
+import sys
 from os import system
 
 #
@@ -76,5 +83,7 @@ class ScreenHelperBase(object):
             # Execute command for Windows Platform, DOS console
             __ = system('cls')  # Windows prints the output of this call
         else:
-            # Execute command for Unix based Platform
-            system('clear')
+            # Unix based terminals understand ANSI escapes (no need to spawn
+            # a `clear` process for every cycle)
+            sys.stdout.write("\033[H\033[2J")
+            sys.stdout.flush()
@@ -0,0 +1,209 @@
+###############################################################################
+#
+# file:     chart.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+A scrolling bar chart, drawn by screens based on `RendererHelperBase` (eg.
+the system monitor).
+
+The chart is kept as columns of cells, one per sample: when a sample is
+added, the chart scrolls one column to the left (see
+`RendererHelperBase.scroll_left`) and only the new column is drawn, so the
+cost of a sample does not depend on the size of the chart. The whole chart
+is only drawn again when its position, size or scale changes.
+
+Columns merging several samples (eg. a downsampled window of history) can
+also be drawn with their range: solid up to their lowest value, and dimmed
+from there up to their highest one.
+
+The class available here is:
+
+    * `ScrollingChart`
+"""
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib.screen.helper.renderer import to_cells
+
+
+class ScrollingChart(object):
+    """
+    A bar chart of the samples of a `SampleStore` field, from the oldest (on
+    the left) to the most recent (on the right), one column per sample.
+
+    The main method available here is:
+
+        * `update`: draws the samples added since the previous update
+    """
+
+    blocks = None
+    """
+    The cells (see `to_cells`) of the symbols used to draw the bars: the
+    first one is blank, the second one marks a zero value (at the bottom),
+    and the last one fills the bars.
+    """
+
+    dimmed = None
+    """
+    The cell of the symbol filling the bars, dimmed (see `get_column`).
+    """
+
+    columns = None
+    """
+    The column of cells (from top to bottom) of each bar height, from zero
+    to the chart height.
+    """
+
+    ranges = None
+    """
+    The column of cells (from top to bottom) of each range of heights drawn
+    (see `get_column`), as a dictionary keyed by the low and high heights
+    (and the height of the chart).
+    """
+
+    state = None
+    """
+    The position, size and scale the chart was last drawn with (a change
+    means it must be drawn again entirely).
+    """
+
+    total = None
+    """
+    The number of samples appended to the store when the chart was last
+    drawn (see `SampleStore.total`).
+    """
+
+    drawn = 0
+    """
+    The number of columns drawn (the chart scrolls once it is full).
+    """
+
+    def __init__(self, blocks):
+        """
+        Creates a new chart, drawn with the informed symbols (single-width
+        characters, possibly with attributes).
+        """
+        self.blocks = [to_cells(block)[0] for block in blocks]
+        self.dimmed = to_cells("\033[2m" + blocks[-1])[0]
+        self.columns = []
+        self.ranges = {}
+
+    def get_column(self, value, ceiling, height, floor=0, low=None):
+        """
+        Returns the cells of the column of a value, from top to bottom. With
+        a `low` value, the bar is dimmed above it.
+        """
+        ratio = 1
+        if ceiling > floor:
+            ratio = int((value - floor) * height / (ceiling - floor))
+        ratio = max(0, min(ratio, height))
+        if low is not None:
+            base = 0
+            if ceiling > floor:
+                base = int((low - floor) * height / (ceiling - floor))
+            base = max(0, min(base, ratio))
+            if base < ratio:
+                key = (base, ratio, height)
+                column = self.ranges.get(key)
+                if column is None:
+                    column = self.ranges[key] = \
+                        [self.blocks[0]] * (height - ratio) \
+                        + [self.dimmed] * (ratio - base) \
+                        + [self.blocks[-1]] * base
+                return column
+        if len(self.columns) != height + 1:
+            full, blank = self.blocks[-1], self.blocks[0]
+            self.columns = [
+                [blank] * (height - size) + [full] * size
+                for size in range(height + 1)]
+            if height > 0:
+                self.columns[0][-1] = self.blocks[1]
+        return self.columns[ratio]
+
+    def update(self, screen, samples, field, x, y, width, height, ceiling,
+               floor=0, low=None):
+        """
+        Draws the samples added to the store since the previous update into
+        the frame of the screen, scrolling the chart as needed. Returns True
+        if the whole chart was drawn again (eg. the scale changed), so the
+        caller can draw its surroundings (axes, labels) again as well.
+
+        Arguments:
+
+            * screen: the `RendererHelperBase` screen being drawn
+
+            * samples: the `SampleStore` holding the samples
+
+            * field: the name of the field charted
+
+            * x, y, width, height: the area of the chart in the frame
+
+            * ceiling: the value of a bar as tall as the chart
+
+            * floor: the value of an empty bar (eg. the lowest of negative
+              values)
+
+            * low: the name of the field of the lowest values of the
+              columns (if they merge several samples), drawn as ranges
+        """
+        state = (id(screen.frame), id(samples), x, y, width, height, ceiling,
+                 floor)
+        added = samples.total - (self.total or 0)
+        self.total = samples.total
+        if state != self.state or not 0 <= added <= width:
+            self.state = state
+            self.draw(screen, samples, field, x, y, width, height, ceiling,
+                      floor, low)
+            return True
+
+        for i in range(-added, 0):
+            if self.drawn >= width:
+                screen.scroll_left(x, y, width, height)
+            else:
+                self.drawn += 1
+            column = self.get_column(
+                samples.get(field, i), ceiling, height, floor,
+                None if low is None else samples.get(low, i))
+            screen.frame.put_cells(column, x + self.drawn - 1, y,
+                                   vertical=True)
+        return False
+
+    def draw(self, screen, samples, field, x, y, width, height, ceiling,
+             floor=0, low=None):
+        """
+        Draws the whole chart into the frame of the screen.
+        """
+        values = samples.series(field)[-width:]
+        lows = [None] * len(values)
+        if low is not None:
+            lows = samples.series(low)[-width:]
+        columns = [self.get_column(value, ceiling, height, floor, minimum)
+                   for value, minimum in zip(values, lows)]
+        self.drawn = len(columns)
+        blank = [self.blocks[0]] * (width - len(columns))
+        for row in range(height):
+            screen.frame.put_cells([column[row] for column in columns]
+                                   + blank, x, y + row)
@@ -25,10 +25,15 @@
 #
 ###############################################################################
 
-from PIL import Image
 import os
 import io
-import requests
+
+from termsaver.termsaverlib import capabilities, exception
+from termsaver.termsaverlib.i18n import _
+
+# these are only imported when an image is actually converted/fetched
+Image = capabilities.lazy_import('PIL.Image')
+requests = capabilities.lazy_import('requests')
 
 class ImageConverter:
     source_path = False
@@ -47,6 +52,10 @@ class ImageConverter:
     
     def get_image(self):
         if self.is_link():
+            if not capabilities.is_available('requests'):
+                raise exception.UrlException(self.source_path,
+                    _("The requests module is required to fetch images."),
+                    help=_("Install it with: pip install requests"))
             r = requests.get(self.source_path, stream=True)
             image = Image.open(io.BytesIO(r.content))
         else:
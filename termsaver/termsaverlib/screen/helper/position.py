@@ -35,20 +35,24 @@ The helper class available here is:
 
     * `PositionHelperBase`
 
+The terminal dimensions are cached by this module, and kept up to date by a
+SIGWINCH handler. Use `add_resize_listener` to be notified of resizes.
+
 """
-import math
-import platform
+import os
 import random
+import signal
 #
 # Python built-in modules
 #
 import sys
-import textwrap
+import threading
 import time
 
 #
 # Internal modules
 #
+from termsaver.termsaverlib.helper.layout import indent, layout
 from termsaver.termsaverlib.screen.helper import ScreenHelperBase
 
 
@@ -60,7 +64,8 @@ class PositionHelperBase(ScreenHelperBase):
     There are main methods available here:
 
         * `get_terminal_size`: retrieves the current terminal dimensions, width
-           and height, to be stored in local propertiy `geometry`.
+           and height, to be stored in local propertiy `geometry`. These are
+           cached, and updated whenever the terminal is resized (SIGWINCH).
 
         * `center_text_vertically`: centers a specified text in vertical
 
@@ -132,18 +137,7 @@ class PositionHelperBase(ScreenHelperBase):
         if self.geometry['x'] == 0:
             return text
 
-        temp = text.split("\n")
-        longest_line = max([len(x) for x in temp])
-        new_text = []
-        for l in temp:
-            # if utf string thwn width must be bigger
-            overlen = len(l)-len(l) #.decode('utf-8)'))
-            t = "\n".join(textwrap.wrap(l, width=self.geometry['x']+overlen))
-            
-            # fill in trailing blanks
-            t += " " * (min(longest_line, self.geometry['x']) - min(len(t), self.geometry['x']))
-            new_text.append(t)
-        return "\n".join(new_text)
+        return "\n".join(layout(text, self.geometry['x'], 0).lines)
     
     def center_text_vertically(self, text):
         """
@@ -155,9 +149,8 @@ class PositionHelperBase(ScreenHelperBase):
             * text: the text to be vertically centered
         """
 
-        temp = self.fix_text_wrap(text).split("\n")
-        self.position['y'] = int(math.floor(
-                (self.geometry['y'] - len(temp)) / 2))
+        self.position['y'] = layout(text, self.geometry['x'],
+                                    self.geometry['y'], vertical='center').y
         return "\n" * self.position['y'] + text
         
     def center_text_horizontally(self, text):
@@ -170,16 +163,11 @@ class PositionHelperBase(ScreenHelperBase):
             * text: the text to be horizontally centered
         """
 
-        temp = self.fix_text_wrap(text).split("\n")
-        new_text = ""
-        for t in temp:
-            self.position['x'] = int(math.ceil(
-                    (self.geometry['x'] - len(t)) / 2))
-            new_text += " " * self.position['x'] + t
-            if len(temp) > 1:
-                new_text += "\n"
-
-        return new_text
+        block = layout(text, self.geometry['x'], 0, horizontal='center')
+        self.position['x'] = block.x
+        if block.height > 1:
+            return block.text + "\n"
+        return block.text
 
     def align_text_right(self, text):
         """
@@ -202,20 +190,11 @@ class PositionHelperBase(ScreenHelperBase):
             * text: the text to be horizontally randomized
         """
 
-        # find longest line
-        temp = self.fix_text_wrap(text).split("\n")
-        longest_line = max([len(x) for x in temp])
-
-        self.position['x'] = random.randint(0, 
-                self.geometry['x'] - longest_line)
-        
-        new_text = ""
-        for t in temp:
-            new_text += " " * self.position['x'] + t
-            if len(temp) > 0:
-                new_text += "\n"
+        block = layout(text, self.geometry['x'], 0)
+        self.position['x'] = random.randint(0,
+                max(0, self.geometry['x'] - block.width))
 
-        return new_text
+        return indent(block.lines, self.position['x']) + "\n"
 
     def randomize_text_vertically(self, text):
         """
@@ -226,9 +205,9 @@ class PositionHelperBase(ScreenHelperBase):
 
             * text: the text to be vertically randomized
         """
-        total_lines = len(self.fix_text_wrap(text).split("\n"))
+        block = layout(text, self.geometry['x'], 0)
         self.position['y'] = random.randint(0, 
-                max(0, self.geometry['y'] - total_lines))
+                max(0, self.geometry['y'] - block.height))
         
         return "\n" * self.position['y'] + text
 
@@ -237,101 +216,11 @@ class PositionHelperBase(ScreenHelperBase):
         Retrieves the screen terminal dimensions, returning a tuple
         (width, height), and will also store them in internal property 
         `geometry`.
-        
-        Copyright note:
-        This code has been adapted from:
-        http://stackoverflow.com/questions/566746/\
-            how-to-get-console-window-width-in-python
-
-        posted by Harco Kuppens, at Jul 1 '11 at 16:23.
 
+        The dimensions are cached (see `get_cached_terminal_size`), so this
+        is cheap enough to be called on every cycle.
         """
-        
-        # This is required if you are programming from non-windows platforms
-        # more on this at: http://pydev.org/manual_adv_assistants.html
-        #@PydevCodeAnalysisIgnore
-        def _get_terminal_size_windows():
-            res = None
-            try:
-                from ctypes import create_string_buffer, windll
-
-                # stdin handle is -10
-                # stdout handle is -11
-                # stderr handle is -12
-                h = windll.kernel32.GetStdHandle(-12)
-                csbi = create_string_buffer(22)
-                res = windll.kernel32.GetConsoleScreenBufferInfo(h, csbi)
-            except:
-                return None
-            if res:
-                import struct
-                (_, _, _, _, _,
-                 left, top, right, bottom, _, _) = struct.unpack("hhhhHhhhhhh",
-                                                                 csbi.raw)
-                sizex = right - left + 1
-                sizey = bottom - top + 1
-                return sizex, sizey
-            else:
-                return None
-        
-        def _get_terminal_size_tput():
-            try:
-                import subprocess
-                proc = subprocess.Popen(["tput", "cols"], 
-                                        stdin = subprocess.PIPE, 
-                                        stdout = subprocess.PIPE)
-                output = proc.communicate(input = None)
-                cols = int(output[0])
-                proc = subprocess.Popen(["tput", "lines"], 
-                                        stdin = subprocess.PIPE, 
-                                        stdout = subprocess.PIPE)
-                output = proc.communicate(input = None)
-                rows = int(output[0])
-                return (cols, rows)
-            except:
-                return None
-        
-        
-        def _get_terminal_size_linux():
-            def ioctl_GWINSZ(fd):
-                try:
-                    import fcntl
-                    import struct
-                    import termios
-                    cr = struct.unpack('hh', fcntl.ioctl(fd, 
-                                                         termios.TIOCGWINSZ, 
-                                                         '1234'))
-                except:
-                    return None
-                return cr
-            cr = ioctl_GWINSZ(0) or ioctl_GWINSZ(1) or ioctl_GWINSZ(2)
-            if not cr:
-                try:
-                    fd = os.open(os.ctermid(), os.O_RDONLY)
-                    cr = ioctl_GWINSZ(fd)
-                    os.close(fd)
-                except:
-                    pass
-            if not cr:
-                try:
-                    cr = (os.environ['LINES'], os.environ['COLUMNS'])
-                except:
-                    return None
-            return int(cr[1]), int(cr[0])
-        
-        current_os = platform.system()
-        tuple_xy = None
-        if current_os == 'Windows':
-            tuple_xy = _get_terminal_size_windows()
-            if tuple_xy is None:
-                tuple_xy = _get_terminal_size_tput()
-                # needed for window's python in cygwin's xterm!
-        if current_os == 'Linux' or current_os == 'Darwin' or \
-                current_os.startswith('CYGWIN'):
-            tuple_xy = _get_terminal_size_linux()
-        if tuple_xy is None:
-            tuple_xy = (80, 25)  # default value
-        
+        tuple_xy = get_cached_terminal_size()
         self.geometry['x'], self.geometry['y'] = tuple_xy
 
         # store geometry changes
@@ -344,3 +233,112 @@ class PositionHelperBase(ScreenHelperBase):
             self.changed_geometry = True
         else:
             self.changed_geometry = False
+
+        return tuple_xy
+
+
+_terminal_size = None
+"""
+The cached terminal dimensions (width, height), updated by the SIGWINCH
+handler. None if not probed yet, or if it can not be cached.
+"""
+
+_resize_listeners = []
+"""
+Functions called (without arguments) whenever the terminal is resized.
+"""
+
+_watching = False
+"""
+Defines if the SIGWINCH handler is already installed.
+"""
+
+
+def probe_terminal_size():
+    """
+    Returns the current terminal dimensions (width, height), asking the
+    terminal itself (falling back to the LINES/COLUMNS environment variables,
+    and then to 80x25).
+    """
+    for fd in (1, 0, 2):
+        try:
+            columns, lines = os.get_terminal_size(fd)
+        except (OSError, ValueError):
+            continue
+        if columns > 0 and lines > 0:
+            return columns, lines
+    try:
+        return int(os.environ['COLUMNS']), int(os.environ['LINES'])
+    except (KeyError, ValueError):
+        return 80, 25  # default value
+
+
+def get_cached_terminal_size():
+    """
+    Returns the terminal dimensions (width, height). These are probed only
+    once, and then kept up to date by a SIGWINCH handler (on platforms that
+    have it). Without the handler (eg. on Windows, or outside of the main
+    thread), the terminal is probed on every call.
+    """
+    global _terminal_size
+
+    if _terminal_size is None:
+        size = probe_terminal_size()
+        if not _watch_terminal_size():
+            return size
+        _terminal_size = size
+    return _terminal_size
+
+
+def add_resize_listener(listener):
+    """
+    Registers a function to be called (without arguments) whenever the
+    terminal is resized, right after the cached dimensions are updated.
+    """
+    _watch_terminal_size()
+    if listener not in _resize_listeners:
+        _resize_listeners.append(listener)
+
+
+def remove_resize_listener(listener):
+    """
+    Unregisters a function added with `add_resize_listener`.
+    """
+    if listener in _resize_listeners:
+        _resize_listeners.remove(listener)
+
+
+def _on_resize(signum, frame, previous=None):
+    """
+    The SIGWINCH handler: updates the cached dimensions, and notifies the
+    listeners.
+    """
+    global _terminal_size
+
+    _terminal_size = probe_terminal_size()
+    for listener in list(_resize_listeners):
+        listener()
+    if callable(previous):
+        previous(signum, frame)
+
+
+def _watch_terminal_size():
+    """
+    Installs the SIGWINCH handler (only once), returning True if it is in
+    place.
+    """
+    global _watching
+
+    if _watching:
+        return True
+    if not hasattr(signal, 'SIGWINCH') or \
+            threading.current_thread() is not threading.main_thread():
+        return False
+    try:
+        previous = signal.getsignal(signal.SIGWINCH)
+        signal.signal(signal.SIGWINCH, lambda signum, frame:
+                      _on_resize(signum, frame, previous))
+    except (OSError, ValueError):
+        return False
+    _watching = True
+    return True
@@ -0,0 +1,550 @@
+###############################################################################
+#
+# file:     renderer.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+A helper class that provides double-buffered, diff-based rendering to screens.
+Instead of clearing the terminal and printing everything again on each cycle,
+screens draw into a grid of cells, and only the cells that actually changed
+since the previous frame are sent to the terminal (using cursor addressing),
+in a single write per frame.
+
+See additional information in the classes themselves.
+
+The classes available here are:
+
+    * `FrameBuffer`: the grid of cells a frame is drawn into
+
+    * `RendererHelperBase`: the screen helper that keeps the frames and
+      writes their differences to the terminal
+
+"""
+
+#
+# Python built-in modules
+#
+import os
+import sys
+
+#
+# Internal modules
+#
+from termsaver.termsaverlib.helper.textwidth import ESC, RESET, apply_sgr, \
+    char_width
+from termsaver.termsaverlib.screen.helper.position import PositionHelperBase
+
+LINE_DRAWING = ESC + "(0"
+"""
+Switches the terminal to the DEC line drawing character set.
+"""
+
+MAX_RUN_GAP = 4
+"""
+Unchanged cells between two changed ones that are still rewritten, as it is
+cheaper than addressing the cursor again (about 8 bytes).
+"""
+
+
+def split_cell(cell):
+    """
+    Splits a cell of a `FrameBuffer` into its attributes (escape sequences)
+    and the character(s) displayed.
+    """
+    k = cell.rfind(ESC)
+    if k < 0:
+        return '', cell
+    if cell[k + 1] == '(':
+        end = k + 3
+    else:
+        end = cell.index('m', k) + 1
+    return cell[:end], cell[end:]
+
+
+def to_cells(text):
+    """
+    Returns the cells (see `FrameBuffer`) of a line of text, as drawn by
+    `FrameBuffer.draw` (to be used with `FrameBuffer.put_cells`).
+    """
+    buffer = FrameBuffer(2 * len(text), 1)
+    x, __ = buffer.draw(text)
+    return buffer.rows[0][:x]
+
+
+class FrameBuffer(object):
+    """
+    A grid of cells, with the dimensions of the terminal, that holds a frame
+    to be rendered.
+
+    Each cell is a string holding the escape sequences of the attributes
+    (colours, character set) followed by the character displayed on it. The
+    cell to the right of a wide character holds an empty string, as the
+    terminal uses it to display the wide character.
+
+    The buffer also keeps, per row, the span of columns changed since the
+    last call to `reset_dirty`, so the renderer only compares those.
+    """
+
+    width = 0
+    """
+    The number of columns of the buffer.
+    """
+
+    height = 0
+    """
+    The number of rows of the buffer.
+    """
+
+    rows = None
+    """
+    The list of rows, each a list of cells.
+    """
+
+    dirty = None
+    """
+    The changed span of each row, as a list [start, end] (or None if the row
+    was not changed).
+    """
+
+    def __init__(self, width, height):
+        """
+        Creates a new (blank) buffer with the informed dimensions.
+        """
+        self.width = max(0, width)
+        self.height = max(0, height)
+        self.rows = [[' '] * self.width for __ in range(self.height)]
+        self.dirty = [None] * self.height
+
+    def clear(self):
+        """
+        Blanks all cells, marking rows with content as changed.
+        """
+        blank = [' '] * self.width
+        for y, row in enumerate(self.rows):
+            if row != blank:
+                self.rows[y] = blank[:]
+                self.__mark(y, 0, self.width)
+
+    def reset_dirty(self):
+        """
+        Forgets about the changes made so far (called after rendering).
+        """
+        self.dirty = [None] * self.height
+
+    def __mark(self, y, start, end):
+        span = self.dirty[y]
+        if span is None:
+            self.dirty[y] = [start, end]
+        else:
+            span[0] = min(span[0], start)
+            span[1] = max(span[1], end)
+
+    def __set(self, x, y, cell, width):
+        """
+        Sets a cell, fixing wide characters partially overwritten by it.
+        """
+        row = self.rows[y]
+        if row[x] == '' and x > 0:
+            # overwriting the right half of a wide character
+            row[x - 1] = ' '
+            self.__mark(y, x - 1, x)
+        end = x + width
+        if end < self.width and row[end] == '':
+            # overwriting the left half of a wide character
+            row[end] = ' '
+            end += 1
+        row[x] = cell
+        if width == 2:
+            row[x + 1] = ''
+        self.__mark(y, x, end)
+
+    def draw(self, text, x=0, y=0):
+        """
+        Draws the text starting at the informed position. New lines continue
+        on the next row, at column `x`. Anything beyond the buffer dimensions
+        is clipped (no wrapping).
+
+        The text may contain SGR escape sequences (colours, reverse, etc), and
+        the DEC line drawing switches (\\033(0 and \\033(B), which apply to the
+        following characters (until the end of the text, or a reset).
+
+        Returns the position (x, y) right after the last character drawn.
+        """
+        if text.isascii() and text.isprintable():
+            # plain text (no escapes, new lines nor wide characters)
+            self.put_cells(list(text), x, y)
+            return x + len(text), y
+
+        left = x
+        sgr = []
+        charset = ''
+        attr = ''
+        i = 0
+        length = len(text)
+        while i < length:
+            char = text[i]
+            i += 1
+            if char == ESC:
+                if text.startswith('[', i):
+                    end = i + 1
+                    while end < length and not ('@' <= text[end] <= '~'):
+                        end += 1
+                    if end < length and text[end] == 'm':
+                        sgr = apply_sgr(sgr, text[i + 1:end])
+                    i = end + 1
+                elif text.startswith('(', i):
+                    charset = LINE_DRAWING if text[i + 1:i + 2] == '0' else ''
+                    i += 2
+                else:
+                    # unsupported sequence, skip only the escape
+                    continue
+                attr = charset
+                if sgr:
+                    attr += ESC + '[' + ';'.join(sgr) + 'm'
+                continue
+            if char == '\n':
+                x = left
+                y += 1
+                continue
+            if char == '\r':
+                x = left
+                continue
+            if char < ' ':
+                continue
+            width = char_width(char)
+            if width == 0:
+                # combining characters join the previous cell
+                if 0 < x <= self.width and 0 <= y < self.height:
+                    prev = x - 1
+                    if self.rows[y][prev] == '' and prev > 0:
+                        prev -= 1
+                    self.rows[y][prev] += char
+                    self.__mark(y, prev, prev + 1)
+                continue
+            if 0 <= y < self.height and 0 <= x and x + width <= self.width:
+                self.__set(x, y, attr + char, width)
+            x += width
+        return x, y
+
+    def scroll_left(self, x, y, width, height, count=1):
+        """
+        Shifts the cells of a rectangle `count` columns to the left, blanking
+        the columns on its right. Rows with changes not rendered yet keep
+        their changed span (shifted along with the cells).
+        """
+        count = min(count, width)
+        blank = [' '] * count
+        for row_y in range(max(0, y), min(self.height, y + height)):
+            row = self.rows[row_y]
+            row[x + width:x + width] = blank
+            del row[x:x + count]
+            if self.dirty[row_y] is not None:
+                self.__mark(row_y, x, x + width)
+
+    def put_cells(self, cells, x=0, y=0, vertical=False):
+        """
+        Sets cells (in the format of `rows`, eg. as returned by `to_cells`)
+        of single-width characters, starting at the informed position, in a
+        row (or in a column, if `vertical`). Anything beyond the buffer
+        dimensions is clipped.
+
+        This is faster than `draw`, for screens that draw the same symbols
+        over and over (they can be converted to cells only once).
+        """
+        if vertical:
+            if not 0 <= x < self.width:
+                return
+            for i, cell in enumerate(cells[max(0, -y):self.height - y],
+                                     max(0, y)):
+                if self.rows[i][x] != cell:
+                    self.__set(x, i, cell, 1)
+            return
+        if not 0 <= y < self.height:
+            return
+        start = max(0, x)
+        stop = min(x + len(cells), self.width)
+        if start >= stop:
+            return
+        cells = cells[start - x:stop - x]
+        row = self.rows[y]
+        if row[start:stop] == cells:
+            return
+        if row[start] == '' and start > 0:
+            # overwriting the right half of a wide character
+            row[start - 1] = ' '
+            start -= 1
+            cells.insert(0, ' ')
+        if stop < self.width and row[stop] == '':
+            # overwriting the left half of a wide character
+            stop += 1
+            cells.append(' ')
+        row[start:stop] = cells
+        self.__mark(y, start, stop)
+
+    def get_text(self):
+        """
+        Returns the characters of the buffer (without attributes), with rows
+        separated by new lines. Useful for testing and debugging.
+        """
+        lines = []
+        for row in self.rows:
+            lines.append(''.join([split_cell(cell)[1] for cell in row]))
+        return '\n'.join(lines)
+
+
+class RendererHelperBase(PositionHelperBase):
+    """
+    This helper class gives screens a double-buffered renderer: the screen
+    draws its whole frame into `frame` (a `FrameBuffer`) on each cycle, and
+    the renderer sends to the terminal only what changed since the previous
+    frame, addressing the cursor directly to the changed cells.
+
+    This avoids clearing the screen (no flicker), and reduces a lot the
+    amount of data written to the terminal, which matters over slow
+    connections (eg. SSH).
+
+    The methods available here are:
+
+        * `begin_frame`: prepares the buffer for a new frame (adjusting it to
+          the terminal size, which is checked here)
+
+        * `draw`: draws text into the frame buffer
+
+        * `render`: writes the changes to the terminal, in a single write
+
+        * `invalidate`: forces the next `render` to redraw everything (eg.
+          if something else wrote on the terminal)
+
+        * `scroll_left`: shifts a rectangle of the frame to the left, moving
+          what is displayed with a few escape sequences instead of writing
+          all of its cells again (eg. for scrolling charts)
+
+    Screens using this helper should not clean up per cycle, nor call
+    `clear_screen` on their own.
+    """
+
+    frame = None
+    """
+    The `FrameBuffer` being drawn (the next frame).
+    """
+
+    __shown = None
+    """
+    The rows currently displayed on the terminal, or None if unknown (the
+    next render will then redraw everything).
+    """
+
+    last_render_size = 0
+    """
+    The number of bytes written to the terminal by the last `render`.
+    """
+
+    __scrolls = None
+    """
+    The escape sequences of the scrolls (see `scroll_left`) done on the frame
+    since the last render, to be written before the changed cells.
+    """
+
+    def begin_frame(self, clear=True):
+        """
+        Prepares the frame buffer for drawing a new frame, checking the
+        terminal size (a new size means the whole screen is redrawn).
+
+        Arguments:
+
+            * clear: if the frame should start blank (default), or on top of
+              the previous one (for screens that only change a few cells)
+        """
+        self.get_terminal_size()
+        width, height = self.geometry['x'], self.geometry['y']
+        if self.frame is None or self.frame.width != width \
+                or self.frame.height != height:
+            self.frame = FrameBuffer(width, height)
+            self.invalidate()
+        elif clear:
+            self.frame.clear()
+        return self.frame
+
+    def draw(self, text, x=0, y=0):
+        """
+        Draws text into the frame buffer (see `FrameBuffer.draw`).
+        """
+        if self.frame is None:
+            self.begin_frame()
+        return self.frame.draw(text, x, y)
+
+    def invalidate(self):
+        """
+        Forgets about what is displayed on the terminal, so the next call to
+        `render` redraws the whole frame.
+        """
+        self.__shown = None
+        self.__scrolls = None
+
+    def scroll_left(self, x, y, width, height, count=1):
+        """
+        Shifts a rectangle of the frame `count` columns to the left, blanking
+        the columns on its right (to be drawn next).
+
+        On the terminal, each row of the rectangle is moved with the delete
+        character (DCH) and insert character (ICH) sequences, so the next
+        `render` only writes the cells drawn after the scroll, instead of
+        every cell of the rectangle. The rectangle must not split wide
+        characters on its edges.
+        """
+        if self.frame is None:
+            return
+        frame = self.frame
+        x, width = max(0, x), min(width, frame.width - max(0, x))
+        count = min(count, width)
+        if count <= 0:
+            return
+        frame.scroll_left(x, y, width, height, count)
+
+        shown = self.__shown
+        if shown is None or len(shown) != frame.height:
+            # the next render redraws everything anyway
+            return
+        blank = [' '] * count
+        blank_row = [' '] * width
+        right = [' '] * (frame.width - x - width)
+        out = self.__scrolls or [RESET]
+        delete = ESC + "[%d;" + str(x + 1) + "H" + ESC + "[" + str(count) + "P"
+        insert = ESC + "[" + str(x + width - count + 1) + "G" + ESC + "[" \
+            + str(count) + "@"
+        for row_y in range(max(0, y), min(frame.height, y + height)):
+            row = shown[row_y]
+            if row[x:x + width] == blank_row:
+                # nothing would move
+                continue
+            out.append(delete % (row_y + 1))
+            if row[x + width:] != right:
+                # bring back what was on the right of the rectangle
+                out.append(insert)
+            row[x + width:x + width] = blank
+            del row[x:x + count]
+        self.__scrolls = out
+
+    def clear_screen(self):
+        """
+        Clears the screen (see `ScreenHelperBase.clear_screen`), making sure
+        the next `render` redraws the whole frame.
+        """
+        PositionHelperBase.clear_screen()
+        self.invalidate()
+
+    def render(self):
+        """
+        Writes the differences between the frame buffer and what is currently
+        displayed to the terminal, in a single write.
+
+        Returns the number of bytes written.
+        """
+        frame = self.frame
+        if frame is None:
+            return 0
+
+        out = []
+        full = self.__shown is None or len(self.__shown) != frame.height
+        if full:
+            out.append(RESET + ESC + "[H" + ESC + "[2J")
+            self.__shown = [[' '] * frame.width for __ in range(frame.height)]
+        elif self.__scrolls:
+            out.extend(self.__scrolls)
+        self.__scrolls = None
+        shown = self.__shown
+
+        attr = ''
+        for y in range(frame.height):
+            span = frame.dirty[y]
+            if not full and span is None:
+                continue
+            row, old = frame.rows[y], shown[y]
+            start, end = (0, frame.width) if full else span
+            if row[start:end] == old[start:end]:
+                continue
+            x = start
+            run_end = -1
+            while x < end:
+                if row[x] == old[x]:
+                    x += 1
+                    continue
+                if x > run_end + MAX_RUN_GAP or run_end < 0:
+                    # address the cursor (cells on the right of wide
+                    # characters are written together with them)
+                    if row[x] == '' and x > 0:
+                        x -= 1
+                    out.append(ESC + "[%d;%dH" % (y + 1, x + 1))
+                    run_x = x
+                else:
+                    run_x = run_end + 1
+                for cell in row[run_x:x + 1]:
+                    if not cell:
+                        continue
+                    cell_attr, char = split_cell(cell)
+                    if cell_attr != attr:
+                        out.append(RESET + cell_attr)
+                        attr = cell_attr
+                    out.append(char)
+                run_end = x
+                x += 1
+            # (including the wide characters written with the span edges)
+            start, end = max(0, start - 1), min(frame.width, end + 1)
+            old[start:end] = row[start:end]
+
+        frame.reset_dirty()
+        if not out:
+            self.last_render_size = 0
+            return 0
+        if attr:
+            out.append(RESET)
+        self.last_render_size = self.write_frame(''.join(out))
+        return self.last_render_size
+
+    @staticmethod
+    def write_frame(data):
+        """
+        Writes the frame data (text, or bytes already encoded as UTF-8) to
+        the terminal with a single system call (if possible), returning the
+        number of bytes written.
+        """
+        if not isinstance(data, bytes):
+            data = data.encode('utf-8')
+        try:
+            fd = sys.stdout.fileno()
+        except (AttributeError, ValueError, OSError):
+            fd = None
+        if fd is None:
+            # not a real file (eg. captured output)
+            sys.stdout.write(data.decode('utf-8'))
+            sys.stdout.flush()
+            return len(data)
+
+        # anything printed before must reach the terminal first
+        sys.stdout.flush()
+        view = memoryview(data)
+        while view:
+            written = os.write(fd, view)
+            view = view[written:]
+        return len(data)
@@ -36,6 +36,7 @@ The helper class available here is:
 #
 # Python built-in modules
 #
+import codecs
 import sys
 import time
 
@@ -67,6 +68,12 @@ class TypingHelperBase(ScreenHelperBase):
         * `typing_print`: this will print the specified text string using the
            speed controls `delay` and `line_delay`.
 
+        * `typing_print_stream`: same as `typing_print`, for text that comes
+           in chunks (eg. read from a file or URL), typed as they arrive.
+
+        * `typing_draw`: same as above, for screens drawing with the
+           `renderer.RendererHelperBase` helper.
+
     """
 
     delay = None
@@ -97,26 +104,134 @@ class TypingHelperBase(ScreenHelperBase):
             * This also supports new lines (\n)
             * blank spaces, due to its lack of meaning, are ignored for speed
               limiting, so they will be flushed all at once.
+            * the characters are not written one by one: on every frame (see
+              `constants.Settings.TYPING_FRAME_SECONDS`) all characters due
+              are written at once, so the overall speed matches the delays.
+
+        """
+        self._typing_write([text, '\n'])
+
+    def typing_print_stream(self, chunks, encoding='utf-8'):
+        """
+        Prints text in typing style (see `typing_print`), from an iterable of
+        chunks, which are only consumed as they are typed. This allows large
+        files or slow downloads to start being typed right away, without
+        keeping the whole text in memory.
+
+        Arguments:
+
+            * chunks: an iterable of strings or bytes (or a mix of them);
+              bytes are decoded incrementally, so multi-byte characters may
+              be split between chunks
+
+            * encoding: the encoding of the chunks given as bytes (invalid
+              data is replaced, instead of raising errors)
+
+        Notes:
 
+            * differently from `typing_print`, no new line is added at the end
+        """
+        decoder = codecs.getincrementaldecoder(encoding)(errors='replace')
+
+        def decode():
+            for chunk in chunks:
+                if isinstance(chunk, bytes):
+                    chunk = decoder.decode(chunk)
+                if chunk:
+                    yield chunk
+            tail = decoder.decode(b'', True)
+            if tail:
+                yield tail
+
+        return self._typing_write(decode())
+
+    def __typing_defaults(self):
+        """
+        Sets the default values of `delay` and `line_delay`, if not defined.
         """
-        # set defaults
         if self.delay is None:
             self.delay = constants.Settings.CHAR_DELAY_SECONDS
 
         if self.line_delay is None:
             self.line_delay = 10 * self.delay
-        splitText = text.split("\n")
-        for line in splitText:
-            for char in line:
-                sys.stdout.write(char)
 
-                # only pause if it is not a blank space
-                if char != ' ':
-                    time.sleep(self.delay)
+    def _typing_write(self, chunks, output=None):
+        """
+        The typing engine: writes the text chunks (strings) to standard output
+        (or passes them to `output`, a function taking each batch of text) in
+        batches, following a time budget where each character costs
+        `delay` seconds (blank spaces are free) and each new line costs
+        `line_delay` seconds.
+
+        Instead of sleeping after every character (which costs a system call
+        per character, and oversleeps on most systems), this works out how
+        many characters are due at every frame, and writes them at once.
+
+        Returns the time, in seconds, the text was supposed to take (based on
+        the delays).
+        """
+        self.__typing_defaults()
+        delay, line_delay = self.delay, self.line_delay
+        frame = constants.Settings.TYPING_FRAME_SECONDS
+        clock = time.monotonic
+        if output is None:
+            write, flush = sys.stdout.write, sys.stdout.flush
+
+            def output(text):
+                write(text)
+                flush()
+
+        start = clock()
+        due = 0.0  # when the next character is due, relative to start
+        for text in chunks:
+            pos, size = 0, len(text)
+            while pos < size:
+                elapsed = clock() - start
+                end = pos
+                while end < size and due <= elapsed:
+                    char = text[end]
+                    if char == '\n':
+                        due += line_delay
+                    elif char != ' ':
+                        due += delay
+                    end += 1
+                if end > pos:
+                    output(text[pos:end])
+                    pos = end
+                if pos < size:
+                    time.sleep(max(frame, due - (clock() - start)))
+
+        # keep the pace of whatever comes next
+        remaining = due - (clock() - start)
+        if remaining > 0:
+            time.sleep(remaining)
+        return due
+
+    def typing_draw(self, text, x=0, y=0):
+        """
+        Draws text into the frame buffer, rendering it in typing style (the
+        same as `typing_print`, for screens inheriting from
+        `renderer.RendererHelperBase`): the characters due at each frame are
+        drawn, and rendered, at once.
 
-                sys.stdout.flush()
+        Arguments:
 
-            # need to re-print the line removed from the split
-            sys.stdout.write('\n')
+            * text: the text to be drawn in typing style
 
-            time.sleep(self.line_delay)  # specific pause for new lines
+            * x, y: the position where the text starts
+
+        Returns the time, in seconds, the text was supposed to take (based on
+        the delays).
+        """
+        left = x
+        position = [x, y]
+
+        def output(batch):
+            for i, line in enumerate(batch.split("\n")):
+                if i:
+                    position[:] = left, position[1] + 1
+                if line:
+                    position[:] = self.draw(line, *position)
+            self.render()
+
+        return self._typing_write([text, '\n'], output)
@@ -65,6 +65,9 @@ class URLFetcherHelperBase(ScreenHelperBase):
            additionally, this will also set a `raw` property with the data
            last fetched.
 
+        * `fetch_stream`: for a specified URI, it returns an iterator of its
+           contents, read as they are consumed.
+
         * `fix_uri`: uses an algorithm to fix and validate a string as URL
           format. This should be used to prepare the URL before calling `fetch`
           method.
@@ -144,6 +147,56 @@ class URLFetcherHelperBase(ScreenHelperBase):
                 constants.Settings.FETCH_INTERVAL_SECONDS:
             return self.raw
 
+        resp = self.__open(uri, method_override, user_agent_override)
+        try:
+            self.raw = resp.read()
+            # make sure the content is not binary (eg. image)
+            if self.__is_response_binary(self.raw):
+                raise exception.UrlException(uri, _("Fetched data is binary."))
+        finally:
+            resp.close()
+
+        return self.raw
+
+    def fetch_stream(self, uri, method_override="POST",
+                     user_agent_override=None):
+        """
+        Same as `fetch`, but returns an iterator of the data chunks (bytes),
+        read from the connection as they are consumed, so the contents can be
+        handled while still downloading (see
+        `TypingHelperBase.typing_print_stream`). The data is not kept in the
+        `raw` property.
+
+        Arguments:
+
+            * uri: the path to be fetched
+        """
+        # connects right away, only the reading is deferred
+        resp = self.__open(uri, method_override, user_agent_override)
+
+        def read():
+            try:
+                first = True
+                while True:
+                    chunk = resp.read1(constants.Settings.STREAM_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    # make sure the content is not binary (eg. image)
+                    if first and self.__is_response_binary(chunk):
+                        raise exception.UrlException(uri,
+                            _("Fetched data is binary."))
+                    first = False
+                    yield chunk
+            finally:
+                resp.close()
+
+        return read()
+
+    def __open(self, uri, method_override, user_agent_override):
+        """
+        Connects to the specified URI, returning the response object (see
+        `fetch` for details on the arguments).
+        """
         if not user_agent_override:
             headers = {'User-Agent': "%s/%s" % (constants.App.NAME,
                                             constants.App.VERSION)}
@@ -167,7 +220,6 @@ class URLFetcherHelperBase(ScreenHelperBase):
 
         # execute URL fetch
         req = Request(url, data, headers, method=method_override)
-        resp = None
         try:
             resp = urlopen(req)
         except HTTPError as e:
@@ -176,18 +228,9 @@ class URLFetcherHelperBase(ScreenHelperBase):
         except URLError as e:
             raise exception.UrlException(uri,
                 _("Could not fetch URL, because %s") % e.reason)
-        else:
-            self.__last_fetched = time.time()
 
-            self.raw = resp.read()
-            # make sure the content is not binary (eg. image)
-            if self.__is_response_binary(self.raw):
-                raise exception.UrlException(uri, _("Fetched data is binary."))
-        finally:
-            if resp:
-                resp.close()
-
-        return self.raw
+        self.__last_fetched = time.time()
+        return resp
 
     def __is_response_binary(self, raw):
         """
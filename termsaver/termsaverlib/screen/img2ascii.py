@@ -40,7 +40,7 @@ import queue
 import time
 from threading import Thread
 
-from termsaver.termsaverlib import constants, exception
+from termsaver.termsaverlib import capabilities, constants, exception
 from termsaver.termsaverlib.i18n import _
 #
 # Internal modules
@@ -56,6 +56,10 @@ class Img2Ascii(ScreenBase, TypingHelperBase, PositionHelperBase):
     A simple screen that will display any jpg or png image,
     on screen in a typing writer animation.
     """
+
+    name = "img2ascii"
+
+    description = _("displays images in typing animation")
     
     path = ''
 
@@ -146,8 +150,8 @@ You may also use online images by sending a url instead of image path.
               each new file is displayed
         """
         ScreenBase.__init__(self,
-            "img2ascii",
-            _("displays images in typing animation"),
+            self.name,
+            self.description,
             parser
         )
         
@@ -181,6 +185,11 @@ You may also use online images by sending a url instead of image path.
         
         args, unknown = self.parser.parse_known_args()
 
+        if not capabilities.is_available('PIL'):
+            raise exception.TermSaverException(
+                _("The pillow module is required by this screen."),
+                help=_("Install it with: pip install pillow"))
+
         if args.invert:
             self.options['invert'] = True
         
@@ -75,6 +75,10 @@ class Jokes4AllRSSFeedScreen(SimpleUrlFetcherBase, PositionHelperBase):
       * center in vertical
     """
 
+    name = "jokes4all"
+
+    description = _("displays random jokes from jokes4all.net (NSFW)")
+
     def __init__(self, parser = None):
         """
         The constructor of this class, using most default values from its super
@@ -83,8 +87,8 @@ class Jokes4AllRSSFeedScreen(SimpleUrlFetcherBase, PositionHelperBase):
         NOTE: Maybe NSFW (Not Safe For Work)
         """
         SimpleUrlFetcherBase.__init__(self,
-          'jokes4all',
-          _("displays random jokes from jokes4all.net (NSFW)"),
+          self.name,
+          self.description,
           parser,
           'https://jokes4all.net'
         )
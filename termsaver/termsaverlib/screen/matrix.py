@@ -42,8 +42,10 @@ import argparse
 #
 # Python mobdules
 #
+import math
+import os
 import random
-import time
+from collections import deque
 
 from termsaver.termsaverlib import constants, exception
 from termsaver.termsaverlib.i18n import _
@@ -51,10 +53,11 @@ from termsaver.termsaverlib.i18n import _
 # Internal modules
 #
 from termsaver.termsaverlib.screen.base import ScreenBase
-from termsaver.termsaverlib.screen.helper.position import PositionHelperBase
+from termsaver.termsaverlib.screen.helper.renderer import (RendererHelperBase,
+                                                          split_cell)
 
 
-class MatrixScreen(ScreenBase, PositionHelperBase):
+class MatrixScreen(ScreenBase, RendererHelperBase):
     """
     Fancy screen that displays falling Japanese and alpha - numeric characters
     simulating the Matrix movie.
@@ -67,8 +70,21 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
 
         * clean up each cycle: False
           to give a sense of continuity, there will be no screen cleaning up
+
+    There are two display modes:
+
+        * the default one prints a new line of characters on every cycle,
+          relying on the terminal scrolling
+
+        * the rain mode (`--rain`) draws drops falling at different speeds,
+          with a bright head and a fading trail, only updating the cells that
+          change on each cycle (see `RendererHelperBase`)
     """
 
+    name = "matrix"
+
+    description = _("displays a matrix movie alike screensaver")
+
     line_delay = None
     """
     Defines the line printing delay, to give a cool visual of a
@@ -173,10 +189,22 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
     otherwise.
     """
 
+    glyphs = []
+    """
+    The characters of `digmap`, encoded (UTF-8) once, so the lines of the
+    `screen_map` are written as they are.
+    """
+
+    space_glyph = b''
+    """
+    The `space`, encoded (UTF-8) once, as the `glyphs`.
+    """
+
     screen_map = []
     """
     The mapping of xy position and length of each line. This will hold the
-    randomized values that are show on screen line by line.
+    randomized values that are show on screen line by line, as one ring
+    buffer (deque) of encoded characters (see `glyphs`) per column.
     """
     
     use_zenkaku = False
@@ -192,14 +220,57 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
     """
     
     use_kana_only = False
+
+    rain = False
+    """
+    Defines if the screen should use the rain mode (see `--rain` option).
+    """
+
+    truecolor = False
+    """
+    Defines if the rain mode should use 24-bit colors, instead of the 256
+    color palette. By default, it is detected from the COLORTERM environment
+    variable.
+    """
+
+    rain_colors_256 = [231, 46, 40, 34, 28, 22]
+    """
+    The colors of the 256 color palette used by the rain mode, from the head
+    of a drop to the end of its trail.
+    """
+
+    rain_colors_truecolor = [
+        (210, 255, 210),
+        (0, 255, 70),
+        (0, 205, 55),
+        (0, 155, 45),
+        (0, 110, 30),
+        (0, 70, 20),
+    ]
+    """
+    The colors (RGB) used by the rain mode with 24-bit colors, from the head
+    of a drop to the end of its trail.
+    """
+
+    drops = []
+    """
+    The drops falling on the rain mode, as lists:
+    [column, head position, speed (rows per cycle), trail length, fade bounds]
+    """
+
+    rain_attrs = []
+    """
+    The escape sequences of each fading level of the rain mode, built from
+    `rain_colors_256` or `rain_colors_truecolor`.
+    """
     
     def __init__(self, parser = None):
         """
         The constructor of this class.
         """
         ScreenBase.__init__(self,
-            "matrix",
-            _("displays a matrix movie alike screensaver"),
+            self.name,
+            self.description,
             parser
         )
 
@@ -223,8 +294,21 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
                 action="store_true",
                 default=self.use_zenkaku
             )
+            self.parser.add_argument("-r", "--rain",
+                help="Displays falling drops with fading trails, instead of scrolling lines.",
+                action="store_true",
+                default=self.rain
+            )
+            self.parser.add_argument("-t", "--truecolor",
+                help="Uses 24-bit colors in rain mode (detected from COLORTERM by default).",
+                action="store_true",
+                default=None
+            )
         self.cleanup_per_cycle = False
 
+        # per instance (the class attribute is shared by all of them)
+        self.drops = []
+
         # set defaults
         if self.line_delay is None:
             self.line_delay = 30 * constants.Settings.CHAR_DELAY_SECONDS
@@ -235,6 +319,10 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
         Executes a cycle of this screen.
         """
 
+        if self.rain:
+            self.rain_cycle()
+            return
+
         # Identify terminal geometry
         self.get_terminal_size()
         
@@ -242,8 +330,8 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
             # build it for the first time or whenever the geometry changes
             self.__build_screen_map()
 
-        print(self.print_line())
-        time.sleep(self.line_delay)
+        # the line and its new line, in a single write
+        self.write_frame(self.print_line() + b"\n")
 
     def _parse_args(self, launchScreenImmediately=True):
         """
@@ -257,6 +345,13 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
             self.use_kana_only = True
         if args.zenkaku:
             self.use_zenkaku = True
+        if args.rain:
+            self.rain = True
+        if args.truecolor is None:
+            self.truecolor = os.environ.get('COLORTERM', '').lower() in \
+                ('truecolor', '24bit')
+        else:
+            self.truecolor = args.truecolor
         if args.granularity:
             try:
                 # make sure argument is a valid value (int)
@@ -276,7 +371,8 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
                 raise exception.InvalidOptionException("delay",
                     "Must be higher than zero")
 
-        # fill in other important properties
+        # fill in other important properties (per instance)
+        self.digmap = []
         if self.use_zenkaku:
             digmap_kana = self.digmap_kana_zenkaku
             digmap_alpha_num = self.digmap_alpha_num_zenkaku
@@ -291,6 +387,20 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
         self.digmap.extend(digmap_kana)
         if not self.use_kana_only:
             self.digmap.extend(digmap_alpha_num)
+        self.glyphs = [glyph.encode('utf-8') for glyph in self.digmap]
+        self.space_glyph = self.space.encode('utf-8')
+
+        if self.truecolor:
+            self.rain_attrs = ["\033[38;2;%d;%d;%dm" % rgb
+                               for rgb in self.rain_colors_truecolor]
+        else:
+            self.rain_attrs = ["\033[38;5;%dm" % color
+                               for color in self.rain_colors_256]
+        # the head of the drops is also bold
+        self.rain_attrs[0] = "\033[1m" + self.rain_attrs[0]
+
+        # one line is printed on every delay
+        self.register_tick(self.line_delay)
         
         if launchScreenImmediately:
             self.autorun()
@@ -314,40 +424,101 @@ class MatrixScreen(ScreenBase, PositionHelperBase):
             if random.random() > 0.5:
                 char_list = self.get_char_list()
             else:
-                char_list = [self.space for __ in \
-                    range(0, random.randint(0, self.geometry['y']))]
-            self.screen_map.append(char_list)
+                char_list = [self.space_glyph] * random.randint(
+                    0, self.geometry['y'])
+            self.screen_map.append(deque(char_list))
 
     def get_char_list(self):
         """
-        creates a randomized list of characters to be used in the `screen_map`.
+        creates a randomized list of (encoded) characters to be used in the
+        `screen_map`.
         """
         result = []
         while(len(result) == 0):
-            bt = [self.space for __ in range(0, 
-                    min((self.geometry['y'], random.randint(0, 
-                        int(self.geometry['y'] * 20 / (self.granularity * \
-                            self.proportion))))))]
-            cl = [self.digmap[random.randint(0, len(self.digmap)) - 1] \
-                  for __ in range(0, random.randint(0, 
-                      self.geometry['y'] - len(bt)))]
-            result = bt
-            result.extend(cl)
+            blanks = min(self.geometry['y'], random.randint(0,
+                int(self.geometry['y'] * 20 / (self.granularity * \
+                    self.proportion))))
+            # all characters picked at once (much cheaper than one by one)
+            result = [self.space_glyph] * blanks + random.choices(
+                self.glyphs, k=random.randint(0, self.geometry['y'] - blanks))
         return result
 
 
     def print_line(self):
         """
         Prints the line picking up the first available char of each list within
-        the `screen_map`, and creating (renewing) them if empty.
+        the `screen_map`, and creating (renewing) them if empty. The line is
+        returned encoded (UTF-8), as its characters.
         """
-        result = ""
-        for i in range(0, len(self.screen_map)):
-            if len(self.screen_map[i]) == 0:
-                self.screen_map[i] = self.get_char_list()
-            try:
-                result += self.screen_map[i].pop(0)
-            except:
-                # ignore errors in here
-                pass
-        return result
+        result = []
+        for column in self.screen_map:
+            if not column:
+                column.extend(self.get_char_list())
+            result.append(column.popleft())
+        return b"".join(result)
+
+    def rain_cycle(self):
+        """
+        Executes a cycle of the rain mode: moves all drops, spawns new ones
+        and renders only the cells that changed.
+
+        For every row a drop moves, only a few cells change: the new head,
+        the cells crossing to the next (dimmer) fading level, and the end of
+        the trail (erased). So the output of each cycle depends on the number
+        of drops, not on the size of the terminal.
+        """
+        self.begin_frame(clear=False)
+        if self.changed_geometry:
+            self.drops = []
+
+        columns = self.geometry['x'] // self.proportion
+        height = self.geometry['y']
+        if columns <= 0 or height <= 0:
+            return
+
+        # spawn new drops (about the same number per cycle, based on the
+        # granularity), picked all at once
+        expected = columns * self.granularity * 0.65 / (40.0 * height)
+        count = int(expected)
+        if random.random() < expected - count:
+            count += 1
+        lengths = (4, max(5, height // 2))
+        for column in random.sample(range(columns), min(count, columns)):
+            length = random.randint(*lengths)
+            levels = len(self.rain_attrs) - 1
+            bounds = sorted(set([max(1, level * length // levels)
+                                 for level in range(levels)]))
+            self.drops.append([column * self.proportion, -1.0,
+                               random.uniform(0.3, 1.0), length, bounds])
+
+        frame = self.frame
+        alive = []
+        glyphs = iter(random.choices(self.digmap, k=len(self.drops) * 2 + 1))
+        for drop in self.drops:
+            x, head, speed, length, bounds = drop
+            drop[1] = head + speed
+            # rows crossed by the head (drops start above the screen, so
+            # positions are floored, not truncated toward zero)
+            for row in range(math.floor(head) + 1, math.floor(drop[1]) + 1):
+                if row < height:
+                    glyph = next(glyphs, None) or random.choice(self.digmap)
+                    frame.draw(self.rain_attrs[0] + glyph, x, row)
+                # the trail fades as the head goes away
+                for level, bound in enumerate(bounds):
+                    self.__recolor(x, row - bound, self.rain_attrs[level + 1])
+                if 0 <= row - length < height:
+                    frame.draw(self.space, x, row - length)
+            if math.floor(drop[1]) - length < height:
+                alive.append(drop)
+        self.drops = alive
+
+        self.render()
+
+    def __recolor(self, x, y, attr):
+        """
+        Redraws a cell of the frame with another color, keeping its glyph.
+        """
+        if 0 <= y < self.frame.height:
+            glyph = split_cell(self.frame.rows[y][x])[1]
+            if glyph.strip():
+                self.frame.draw(attr + glyph, x, y)
@@ -52,6 +52,10 @@ class ProgrammerScreen(FileReaderBase):
         * `FileReaderBase.cleanup_per_file` as True
     """
 
+    name = "programmer"
+
+    description = _("displays source code in typing animation (with pygments support)")
+
     def __init__(self, parser = None):
         """
         Creates a new instance of this class (used by termsaver script)
@@ -68,8 +72,8 @@ class ProgrammerScreen(FileReaderBase):
               each new file is displayed
         """
         FileReaderBase.__init__(self,
-            "programmer",
-            _("displays source code in typing animation (with pygments support)"),
+            self.name,
+            self.description,
             parser
         )
 
@@ -80,13 +80,17 @@ class Quotes4AllScreen(SimpleUrlFetcherBase, PositionHelperBase):
 
     """
 
+    name = "quotes4all"
+
+    description = _("displays random quotes from quotes4all.net (NSFW)")
+
     def __init__(self, parser = None):
         """
         Creates a new instance of this class (used by termsaver script)
         """
         SimpleUrlFetcherBase.__init__(self,
-          'quotes4all',
-          _("displays random quotes from quotes4all.net (NSFW)"),
+          self.name,
+          self.description,
           parser,
           'https://quotes4all.net'
         )
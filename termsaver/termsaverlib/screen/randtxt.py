@@ -40,13 +40,13 @@ import time
 from termsaver.termsaverlib import constants, exception
 from termsaver.termsaverlib.i18n import _
 from termsaver.termsaverlib.screen.base import ScreenBase
-from termsaver.termsaverlib.screen.helper.position import PositionHelperBase
+from termsaver.termsaverlib.screen.helper.renderer import RendererHelperBase
 from termsaver.termsaverlib.screen.helper.typing import TypingHelperBase
 
 
 class RandTxtScreen(ScreenBase,
                     TypingHelperBase,
-                    PositionHelperBase):
+                    RendererHelperBase):
     """
     Simple screensaver that displays a text in random position on screen.
 
@@ -60,6 +60,10 @@ class RandTxtScreen(ScreenBase,
           for files
     """
 
+    name = "randtxt"
+
+    description = _("displays word in random places on screen")
+
     word = ''
     """
     Holds the word to be displayed on screen
@@ -83,8 +87,8 @@ class RandTxtScreen(ScreenBase,
         Creates a new instance of this class.
         """
         ScreenBase.__init__(self,
-            "randtxt",
-            _("displays word in random places on screen"),
+            self.name,
+            self.description,
             parser
         )
         if self.parser:
@@ -93,7 +97,7 @@ class RandTxtScreen(ScreenBase,
         self.word = constants.App.TITLE
         self.delay = 0.01
         self.line_delay = 0
-        self.cleanup_per_cycle = True
+        self.cleanup_per_cycle = False
         self.freeze_delay = self.FREEZE_WORD_DELAY
 
     def _run_cycle(self):
@@ -102,16 +106,18 @@ class RandTxtScreen(ScreenBase,
 
         The actions taken here, for each cycle, are as follows:
 
+            * erase the previous text (only the cells it used)
             * randomize text position vertically and horizontally
-            * print using `typing_print`
+            * draw it using `typing_draw`
         """
-        # calculate random position based on screen size
-        self.get_terminal_size()
+        # also calculates the random position based on screen size
+        self.begin_frame()
+        self.render()
 
-        txt = self.randomize_text_vertically(
+        self.randomize_text_vertically(
             self.randomize_text_horizontally(self.word))
 
-        self.typing_print(txt)
+        self.typing_draw(self.word, self.position['x'], self.position['y'])
 
         time.sleep(self.freeze_delay)
 
@@ -35,6 +35,7 @@ The screen class available here is:
 #
 # Python built-in modules
 #
+import itertools
 import random
 
 from termsaver.termsaverlib.i18n import _
@@ -67,6 +68,10 @@ class RFCScreen(SimpleUrlFetcherBase):
     not affect the main purpose of this screen.
     """
 
+    name = "rfc"
+
+    description = _("randomly displays RFC contents")
+
     valid_rfc = [
          768, 791, 792, 793, 826, 854, 855, 862, 863, 864, 868, 903,
         1034, 1035, 1036, 1058, 1059, 1087, 1112, 1119, 1149, 1157, 1176, 1294,
@@ -96,8 +101,8 @@ class RFCScreen(SimpleUrlFetcherBase):
         class, `SimpleUrlFetcherBase`.
         """
         SimpleUrlFetcherBase.__init__(self,
-            "rfc",
-            _("randomly displays RFC contents"),
+            self.name,
+            self.description,
             parser,
             "localhost",
         )  # base class require a URL
@@ -111,9 +116,10 @@ class RFCScreen(SimpleUrlFetcherBase):
         self.url = self.url_format % self.valid_rfc[
             random.randint(0, len(self.valid_rfc) - 1)]
 
-        data = self.fetch(self.url)
+        # the contents are typed while still downloading
+        chunks = self.fetch_stream(self.url)
         self.clear_screen()
-        self.typing_print(data.decode("utf-8"))
+        self.typing_print_stream(itertools.chain(chunks, [b'\n']))
 
     def _parse_args(self, launchScreenImmediately=True):
         if launchScreenImmediately:
@@ -68,14 +68,18 @@ class RSSFeedScreen(ScreenBase, RSSFeedScreenBase):
           '%(title)s (%(pubDate)s)\n%(description)s\n%(link)s\n.\n'
     """
 
+    name = "rssfeed"
+
+    description = _("displays rss feed information")
+
     def __init__(self, parser = None):
         """
         Creates a new instance of this class.
         """
 
         ScreenBase.__init__(self,
-            "rssfeed",
-            _("displays rss feed information"),
+            self.name,
+            self.description,
             parser
         )
         
@@ -61,13 +61,17 @@ class StarWarsScreen(ScreenBase, PositionHelperBase):
           cycle is displayed
     """
 
+    name = "starwars"
+
+    description = _("displays the star wars asciimation on screen")
+
     def __init__(self, parser = None):
         """
         The constructor of this class.
         """
         ScreenBase.__init__(self,
-            "starwars",
-            _("displays the star wars asciimation on screen"),
+            self.name,
+            self.description,
             parser
         )
         self.cleanup_per_cycle = True
@@ -46,11 +46,20 @@ from termsaver.termsaverlib.i18n import _
 #
 # Internal modules
 #
+from termsaver.termsaverlib.helper.collectors import PROC_ROOT, SYS_ROOT, \
+    get_collectors
+from termsaver.termsaverlib.helper.processes import ProcessScanner
+from termsaver.termsaverlib.helper.sampler import ProcSampler, \
+    SharedSampler
+from termsaver.termsaverlib.helper.samplestore import RollupStore, \
+    SampleStore
+from termsaver.termsaverlib.helper.stream import StreamReader
 from termsaver.termsaverlib.screen.base import ScreenBase
-from termsaver.termsaverlib.screen.helper.position import PositionHelperBase
+from termsaver.termsaverlib.screen.helper.chart import ScrollingChart
+from termsaver.termsaverlib.screen.helper.renderer import RendererHelperBase
 
 
-class SysmonScreen(ScreenBase, PositionHelperBase):
+class SysmonScreen(ScreenBase, RendererHelperBase):
     """
     Simple screen that displays CPU/MEM usage charts on a terminal window.
 
@@ -58,30 +67,66 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
     settings defined below:
 
         * clean up each cycle: False
-          The screen will be cleared manually after the CPU calculation
-          is completed (it requires a sleep)
+          The charts are drawn with the renderer helper, which only updates
+          what changed since the previous cycle
 
     """
 
+    name = "sysmon"
+
+    description = _("displays a graphical system monitor")
+
     path = None
     """
     Defines the path of the file containing a monitoring value, from 0 to 100.
     """
 
-    info = {
-            'db': [
-                #
-                # store data in format: 
-                # {'time': ??, 'cpu': ??, 'mem': ??, 'extra': ??}
-                #
-            ],
-            'total_mem': 0,
-            'max_cpu': 0,
-            'max_mem': 0,
-            'max_extra': 0, # for an external path
-    }
+    stream = None
+    """
+    Defines the location of a stream of values to be charted (see
+    `--stream`), or "-" for the standard input.
+    """
+
+    reader = None
+    """
+    The `StreamReader` of the stream of values.
+    """
+
+    aggregates = None
+    """
+    The values of each series read from the stream on the latest cycle (see
+    `StreamReader.read`).
+    """
+
+    samples = None
+    """
+    The history of the charted metrics (or of the monitored file), used to
+    build the charts, as a `SampleStore` holding as many samples as the
+    charts can display.
+    """
+
+    charts = None
     """
-    Registers the history of CPU/MEM usage, used to build the charts
+    The `ScrollingChart` of each field charted, keyed by field name.
+    """
+
+    window = None
+    """
+    The seconds of history charted (see `--window`), or None to chart one
+    sample per column.
+    """
+
+    rollups = None
+    """
+    The history of the samples in tiers of rollups (a `RollupStore`), kept
+    only to chart a window of history.
+    """
+
+    view = None
+    """
+    The window of history last charted, as a tuple (state, `SampleStore`),
+    downsampled again only when a sample is added or the terminal is
+    resized.
     """
 
     delay = None
@@ -135,18 +180,74 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
     Holds the index of the symbol set we're using.
     """
 
+    collectors = None
+    """
+    The collectors of the metrics displayed (see `--collectors`).
+    """
+
+    proc_root = PROC_ROOT
+    """
+    The location of the proc file system read by the collectors.
+    """
+
+    sys_root = SYS_ROOT
+    """
+    The location of the sys file system read by the collectors.
+    """
+
+    sampler = None
+    """
+    The `ProcSampler` taking the samples of the collectors, on a thread of
+    its own (or the `SharedSampler` reading them, see `--shared`).
+    """
+
+    shared = False
+    """
+    Defines if the samples are shared with the other instances on the host
+    (see `--shared`).
+    """
+
+    shared_dir = None
+    """
+    The location of the file of shared samples (the temporary directory, by
+    default).
+    """
+
+    top = 0
+    """
+    The number of processes listed on the right of the charts (see
+    `--top`), the ones using the most CPU.
+    """
+
+    scanner = None
+    """
+    The `ProcessScanner` of the processes listed.
+    """
+
+    panel_width = 36
+    """
+    The width of the list of processes (only displayed if the terminal is
+    at least twice as wide).
+    """
+
+    snapshot = None
+    """
+    The latest snapshot of the collectors (see `update_stats`).
+    """
+
 
     def __init__(self, parser = None):
         """
         The constructor of this class.
         """
         ScreenBase.__init__(self,
-            "sysmon",
-            _("displays a graphical system monitor"),
+            self.name,
+            self.description,
             parser
         )
         if self.delay is None:
             self.delay = 0.5
+        self.charts = {}
 
         if self.parser:
             self.parser.add_argument("-d","--delay", help="""
@@ -167,10 +268,31 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
             Sets the ASCII mode, which uses only ASCII characters to draw the charts.
             Will not work with -v / -variant option.
             """)
-        #
-        # Due to a time delay to calculate CPU usage
-        # we need to clear the screen manually
-        #
+            self.parser.add_argument("-c", "--collectors", default="system", help="""
+            Sets the metrics displayed, as a comma-separated list of collectors:
+            system (CPU and memory usage, the default, relative to the limits of the container when running in a cgroup v2 with limits),
+            cores (usage of each CPU core),
+            disk (disk reads and writes), net (network traffic), load (load average)
+            and temp (temperature sensors). Linux only, except for system.
+            """)
+            self.parser.add_argument("-s", "--shared", action="store_true", default=False, help="""
+            Shares the samples with the other instances of the user on the host (with the same collectors and delay):
+            only one of them (or termsaver-sysmond) reads the system metrics, and the history outlives each instance.
+            """)
+            self.parser.add_argument("-w", "--window", help="""
+            Sets the period of history charted (eg. 10m, 1h or 24h), instead of one sample per column.
+            Each column then shows the range of values of its part of the window: solid up to the lowest one,
+            and dimmed up to the highest one (up to a day of history is kept).
+            """)
+            self.parser.add_argument("-S", "--stream", nargs="?", const="-", help="""
+            Charts the values written to the standard input (or to the informed file or FIFO), one or more per line,
+            either numbers or named values (name=value) for several series. Values are averaged on each cycle, and the
+            charts are scaled to the values. Will not work with -p / --path option.
+            """)
+            self.parser.add_argument("-t", "--top", type=int, default=0, help="""
+            Lists the processes using the most CPU on the right of the charts (as many as informed).
+            Linux only. On hosts with many processes, they are read in parts, on successive cycles.
+            """)
         self.cleanup_per_cycle = False
 
     def _run_cycle(self):
@@ -178,8 +300,9 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
         Executes a cycle of this screen.
         """
 
-        # calculate random position based on screen size
-        self.get_terminal_size()
+        # also calculates the position based on screen size (the frame
+        # keeps the previous cycle, so the charts only scroll)
+        self.begin_frame(clear=False)
 
         # update info data
         if self.path:
@@ -188,62 +311,66 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
             #
             self.update_stats_extra()
             
-            if self.geometry['x'] > 16: # just to avoid unexpected exceptions
-                title = "%s: %s" % (_('Monitoring'), (self.path[:(self.geometry['x'] - 16)] 
-                        + (self.path[(self.geometry['x'] - 16):] and '...')))
+            area = self.get_area_width()
+            if area > 16: # just to avoid unexpected exceptions
+                title = "%s: %s" % (_('Monitoring'), (self.path[:(area - 16)] 
+                        + (self.path[(area - 16):] and '...')))
             else:
                 title = _("Monitoring file")
                 
-            txt = self.get_xy_chart(title, 'extra')
+            y = self.draw_xy_chart(title, 'extra', 0,
+                                   int((self.geometry['y'] - 13)/2))
             
-            txt += self.center_text_horizontally(
-                "\n  Load: %s%%   %s " % (
-                ("%02d" % self.info['db'][-1]['extra']),
-                self.get_chart(self.info['db'][-1]['extra']),
+            self.draw_line(self.center_text(
+                "  Load: %s%%   %s " % (
+                ("%02d" % self.samples.last('extra')),
+                self.get_chart(self.samples.last('extra')),
                 )
-            ) 
+            ), y + 1)
             
         else:
-            #
-            # run the flow for CPU/Mem as default
-            #
-            self.update_stats()
-
-            txt = self.get_xy_chart("CPU Monitor", 'cpu')
-    
-            txt += "\n"
-    
-            txt += self.get_xy_chart("MEM Monitor", 'mem')
-    
-            txt += self.center_text_horizontally(
-                "\n%s  CPU: %s%%   %s  MEM: %s%% (total %sMB)" % (
-                self.get_chart(self.info['db'][-1]['cpu']),
-                ('%.1f' % self.info['db'][-1]['cpu']),
-                self.get_chart(self.info['db'][-1]['mem']),
-                self.info['db'][-1]['mem'],
-                int(self.info['total_mem'])
-            ))
-
-        #
-        # Due to a time delay to calculate CPU usage
-        # we need to clear the screen manually
-        #
-        self.clear_screen()
-
-        # just print the whole text
-        print(txt)
-
-        #
-        # The sleep happens here in the CPU calculation instead
-        #
-        #time.sleep(self.delay)
+            if self.stream:
+                #
+                # run the flow for a stream of values
+                #
+                charts, status = self.update_stats_stream()
+            else:
+                #
+                # run the flow for the collectors (CPU/Mem as default)
+                #
+                self.update_stats()
+
+                charts = self.get_charted_fields()
+                status = [collector.format(
+                    self.snapshot.records[collector.name], self.get_chart)
+                    for collector in self.collectors]
+
+            # charts share the rows left by the status lines
+            ysize = int((self.geometry['y'] - 2 - 5 * len(charts)
+                         - len(status)) / max(1, len(charts)))
+
+            y = -1
+            for key, title, unit in charts:
+                # values of streams may be negative
+                floor = 0
+                if self.stream:
+                    floor = min([0] + self.get_history().series(key))
+                y = self.draw_xy_chart(title, key, y + 1, ysize, unit, floor)
+
+            for line in status:
+                y += 1
+                self.draw_line(self.center_text(line), y)
+
+        if self.top:
+            self.draw_top()
+
+        # only the changes since the previous cycle reach the terminal
+        self.render()
 
     def update_stats_extra(self):
         """
         Updates the info property with latest information on an extra path, 
         defined by --path argument option
-
-        Note: This also takes care of sleep (defined by delay property)
         """
         
         f = open(self.path, 'r')
@@ -257,61 +384,163 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
                 _('The file contains invalid data (must be between 0 and 100).'))
         f.close()
 
-        # cut the data to keep only recent values
-        self.info['db'] = self.info['db'][-(self.geometry['x'] - 5):]
-
-        max_extra = 0
-        for item in self.info['db']:
-            if item['extra'] > max_extra:
-                max_extra = item['extra']
-        self.info['max_extra'] = max_extra
-        self.info['db'].append( {
-                'time': time.time(),
-                'extra': val,
-             }
-        )
-        time.sleep(self.delay)
-        
-        
+        self.add_sample(('time', 'extra'), (time.time(), val))
+
+    def get_samples(self, fields):
+        """
+        Returns the store of samples, with as many samples as the charts can
+        display (adjusting it to the terminal width, if it changed).
+        """
+        capacity = max(1, self.get_area_width() - 5)
+        if self.samples is not None and self.samples.fields != fields \
+                and set(self.samples.fields) < set(fields):
+            # new fields (eg. a new series of a stream) start at zero
+            old = self.samples
+            self.samples = SampleStore(fields, capacity)
+            self.samples.extend(*[
+                old.series(name) if name in old.fields else [0] * len(old)
+                for name in fields])
+        elif self.samples is None or self.samples.fields != fields:
+            self.samples = SampleStore(fields, capacity)
+        elif self.samples.capacity != capacity:
+            self.samples.resize(capacity)
+        return self.samples
+
+    def add_sample(self, fields, values):
+        """
+        Adds a sample to the history (and to its rollups, if a window of
+        history is charted).
+        """
+        self.get_samples(fields).append(*values)
+        if self.window:
+            if self.rollups is None or self.rollups.fields != fields[1:]:
+                self.rollups = RollupStore(fields[1:], self.delay)
+            self.rollups.append(*values)
+
+    def get_history(self):
+        """
+        Returns the samples charted: the latest ones (one per column), or
+        the window of history downsampled to the width of the charts (see
+        `--window`).
+        """
+        if not self.window:
+            return self.samples
+        width = max(1, self.get_area_width() - 5)
+        state = (self.rollups.total, width)
+        if self.view is None or self.view[0] != state:
+            self.view = (state, self.rollups.downsample(self.window, width))
+        return self.view[1]
+
+    def update_stats_stream(self):
+        """
+        Updates the samples with the values written to the stream since the
+        previous cycle (see `--stream`), averaged per series. Series without
+        new values keep their previous value. Returns the charts (as in
+        `get_charted_fields`) and the status lines of the series.
+        """
+        if self.reader is None:
+            try:
+                self.reader = StreamReader(self.stream)
+            except OSError as e:
+                raise exception.PathNotFoundException(self.stream, str(e))
+        self.aggregates = self.reader.read()
+
+        keys = ["stream.%s" % name for name in self.reader.names]
+        values = [time.time()]
+        for name, key in zip(self.reader.names, keys):
+            aggregate = self.aggregates.get(name)
+            if aggregate is not None:
+                values.append(aggregate.total / aggregate.count)
+            elif self.samples is not None and key in self.samples.fields:
+                values.append(self.samples.last(key))
+            else:
+                values.append(0)
+
+        if not keys:
+            return [], [_("Waiting for values on %(stream)s...") % {
+                'stream': _("standard input") if self.stream == '-'
+                else self.stream}]
+        status = []
+        for name in self.reader.names:
+            aggregate = self.aggregates.get(name)
+            if aggregate is None:
+                status.append(_("%(name)s: no new values") % {'name': name})
+                continue
+            status.append(_("%(name)s: %(last)g (min %(min)g, max %(max)g, "
+                            "%(rate).0f/s)") % {
+                'name': name, 'last': aggregate.last, 'min': aggregate.min,
+                'max': aggregate.max, 'rate': aggregate.count / self.delay})
+        self.add_sample(tuple(['time'] + keys), values)
+        return [(key, name, '') for key, name in
+                zip(keys, self.reader.names)], status
+
+    def get_charted_fields(self):
+        """
+        Returns the fields charted by the collectors, as tuples (key, title,
+        unit), where the key is the name of the collector and of the field,
+        separated by a dot (eg. system.cpu).
+        """
+        return [("%s.%s" % (collector.name, field), title, unit)
+                for collector in self.collectors
+                for field, title, unit in collector.charts]
+
     def update_stats(self):
         """
-        Updates the info property with latest information on CPU and MEM usage.
+        Updates the samples with the latest metrics of the collectors.
 
-        Note: This also takes care of sleep (defined by delay property)
+        The metrics are sampled every `delay` on a separate thread (see
+        `ProcSampler`), so this never blocks: values such as the CPU usage
+        are the ones since the previous sample. Shared samples (see
+        `SharedSampler`) may be sampled by another process, and the first
+        update also gets the history they kept.
         """
         
-        # TODO - Implement similar features for Windows/Mac OS
+        # TODO - Implement similar features for Windows
         #        maybe consider psutil package
         if os.name != "posix":
             raise exception.TermSaverException(help_msg="OS is not supported!")
 
-        # memory info
-        mem_info = common.get_mem_usage()
-        
-        # cpu info
-        cpu = common.get_cpu_usage(self.delay)
-
-        self.info['total_mem'] = mem_info[1]
-
-        # insert into history data
-        self.info['db'].append( {
-                'time': time.time(),
-                'cpu': cpu,
-                'mem': mem_info[0]
-             }
-        )
-        # cut the data to keep only recent values
-        self.info['db'] = self.info['db'][-(self.geometry['x'] - 5):]
-
-        # recalculate the cpu ceiling value
-        max_cpu, max_mem = 0, 0
-        for item in self.info['db']:
-            if item['cpu'] > max_cpu:
-                max_cpu = item['cpu']
-            if item['mem'] > max_mem:
-                max_mem = item['mem']
-        self.info['max_cpu'] = max_cpu
-        self.info['max_mem'] = max_mem
+        if self.sampler is None:
+            # samples are taken on a thread of their own, so cycles
+            # only read the latest one
+            if self.shared:
+                self.sampler = SharedSampler(self.delay, self.collectors,
+                                             self.shared_dir)
+            else:
+                self.sampler = ProcSampler(self.delay, self.collectors)
+            self.sampler.start()
+        if self.sampler.error is not None:
+            raise self.sampler.error
+
+        fields = tuple(['time'] + [key for key, __, __ in
+                                   self.get_charted_fields()])
+        # a window of history also takes the history kept by a shared
+        # sampler (beyond what fits in the charts)
+        limit = None
+        if not self.window:
+            limit = self.get_samples(fields).capacity
+        for snapshot in self.sampler.get_snapshots(limit):
+            self.snapshot = snapshot
+            values = [snapshot.time]
+            for collector in self.collectors:
+                record = snapshot.records[collector.name]
+                for field, __, __ in collector.charts:
+                    values.append(record[collector.fields.index(field)])
+
+            # insert into history data (the oldest sample is dropped when
+            # the store is full)
+            self.add_sample(fields, values)
+
+    def _on_keyboard_interrupt(self):
+        """
+        Stops the sampling thread (see `update_stats`).
+        """
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
 
 
     def format_time(self, epoch):
@@ -340,50 +569,106 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
         else:
             return ""
 
-    def get_xy_chart(self, title, key):
+    def get_area_width(self):
+        """
+        Returns the width of the area of the charts (the whole terminal,
+        unless processes are listed on their right, see `--top`).
+        """
+        if self.top and self.geometry['x'] >= 2 * self.panel_width:
+            return self.geometry['x'] - self.panel_width
+        return self.geometry['x']
+
+    def center_text(self, text):
+        """
+        Returns the text with additional blank spaces, to display it in the
+        horizontal center of the area of the charts.
+        """
+        return " " * max(0, (self.get_area_width() - len(text)) // 2) + text
+
+    def draw_line(self, text, y, x=0, width=None):
+        """
+        Draws a line of text, blanking the rest of the row (as the frame
+        keeps what was drawn on previous cycles), up to the `width` of the
+        area of the charts (by default).
+        """
+        if width is None:
+            width = self.get_area_width()
+        end, __ = self.draw(text, x, y)
+        if end < x + width:
+            self.draw(" " * (x + width - end), end, y)
 
+    def draw_top(self):
+        """
+        Draws the processes using the most CPU (see `--top`) on the right
+        of the charts, followed by the number of processes read on this
+        cycle (out of all processes), and the time spent reading them.
+        """
+        area = self.get_area_width()
+        width = self.geometry['x'] - area
+        if width <= 0:
+            return
+        if self.scanner is None:
+            self.scanner = ProcessScanner(self.proc_root)
+        self.scanner.scan()
+
+        lines = ["%6s %5s %6s  %s" % (_("PID"), _("CPU%"), _("MEM"),
+                                      _("COMMAND"))]
+        for process in self.scanner.top(self.top):
+            lines.append("%6d %5.1f %5dM  %s" % (
+                process.pid, process.cpu, process.rss // 1048576,
+                process.name))
+        lines += [""] * (self.top + 2 - len(lines))
+        lines.append(_("scan: %(scanned)d/%(total)d in %(cost).1fms") % {
+            'scanned': self.scanner.scanned,
+            'total': len(self.scanner.processes),
+            'cost': self.scanner.cost * 1000})
+        for y, line in enumerate(lines[:self.geometry['y']]):
+            self.draw_line(" " + line, y, area, width)
+
+    def draw_xy_chart(self, title, key, y, ysize, unit='%', floor=0):
+        """
+        Draws the chart of a field of the samples, starting at row `y`, with
+        `ysize` rows of bars, and returns the row right after it. Values in
+        percentages (the `unit`) can be charted on a fixed 0 ~ 100 scale
+        (see `--no-adjust`), the others are always adjusted (from the
+        `floor`, the value of an empty bar).
+
+        Only the column of the new sample is drawn on each cycle (the chart
+        scrolls), unless the chart must be drawn again entirely (eg. the
+        terminal was resized, or its ceiling changed). A window of history
+        (see `--window`) is downsampled again on each sample, and so drawn
+        again entirely, at a cost bound by the size of the chart (not by
+        the length of the window).
+        """
+        samples = self.get_history()
         ceiling = 100
-        if self.adjust:
-            ceiling = self.info['max_' + key]
-
-        ysize = int((self.geometry['y'] - 13)/2) # remove lines used
-        current_position = 0
-
-        txt = self.align_text_right(title) + "\n" \
-            + ('%.0f' % ceiling) + "%\n"
-        # create output (11 lines)
-        for y in range(ysize - 1, -1, -1):
-            current_position = 0
-            txt += " " + self.axis_v[self.symbol_index]
-            for x in range(self.geometry['x'] - 5): # padding
-                if len(self.info['db']) - 1 < x:
-                    txt += " "
-                else:
-                    current_position += 1
-
-                    # to keep proportions
-                    ratio = 1
-                    if ceiling > 0:
-                        ratio = int(self.info['db'][x][key] * ysize / ceiling)
-
-                    # based on number of blocks (10)
-                    if ratio >= y + 1:
-                        txt += self.block[self.symbol_index][-1]
-                    elif y > 0 and ratio > y:
-                        txt += self.block[self.symbol_index][ratio - y]
-                    elif y > 0:
-                        txt += self.block[self.symbol_index][0]
-                    else:
-                        txt += self.block[self.symbol_index][1]
-
-            txt += "\n"
-
-        txt += " " + self.axis_corner[self.symbol_index] + self.axis_h[self.symbol_index] * (self.geometry['x'] - 5) + "\n"
-
-        txt += "%s%s%s\n" % (self.format_time(self.info['db'][0]['time']),
-                " " * (current_position - 5), _("now"))
-
-        return txt
+        if self.adjust or unit != '%':
+            ceiling = samples.max(key)
+
+        area = self.get_area_width()
+        width = area - 5 # padding
+        ysize = max(0, ysize)
+
+        if key not in self.charts:
+            self.charts[key] = ScrollingChart(self.block[self.symbol_index])
+        # a window of history is charted with the range of each column
+        low = '%s:min' % key if self.window else None
+        if self.charts[key].update(self, samples, key, 2, y + 2, width,
+                                   ysize, ceiling, floor, low):
+            self.draw_line(" " * (area - len(title)) + title, y)
+            self.draw_line(('%.0f' if unit == '%' or ceiling >= 10
+                            else '%.2f') % ceiling + unit, y + 1)
+            self.draw((" " + self.axis_v[self.symbol_index] + "\n") * ysize,
+                      0, y + 2)
+            self.draw_line(" " + self.axis_corner[self.symbol_index]
+                           + self.axis_h[self.symbol_index] * width,
+                           y + 2 + ysize)
+
+        current_position = min(len(samples), width)
+        self.draw_line("%s%s%s" % (self.format_time(samples.first('time')),
+                " " * (current_position - 5), _("now")), y + 3 + ysize)
+
+        return y + 4 + ysize
 
     def _usage_options_example(self):
         """
@@ -404,6 +689,23 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
     $ %(app_name)s %(screen)s -d 5
     Overrides the default delay to 5 seconds
 
+    $ %(app_name)s %(screen)s -c cores,load
+    Charts the usage of the busiest CPU core, and the load average
+
+    $ %(app_name)s %(screen)s -w 24h
+    Charts the last 24 hours (the range of values of each period of time)
+
+    $ %(app_name)s %(screen)s -t 10
+    Also lists the 10 processes using the most CPU
+
+    $ my-app --metrics | %(app_name)s %(screen)s -S
+    Charts the values written by an application (eg. one per line, or
+    latency=3.2 errors=0 for several series)
+
+    $ %(app_name)s %(screen)s -s
+    Shares the samples (and their history) with the other instances using
+    the same options, on the same host
+
 """) % {
         'app_name': constants.App.NAME,
         'screen': self.name,
@@ -442,11 +744,44 @@ class SysmonScreen(ScreenBase, PositionHelperBase):
             except:
                 raise exception.InvalidOptionException("delay")
 
+        if args.stream:
+            if self.path:
+                raise exception.InvalidOptionException("stream",
+                    _("It can not be used along with --path"))
+            self.stream = args.stream
+            if self.stream != '-' and not os.path.exists(self.stream):
+                raise exception.PathNotFoundException(self.stream,
+                    _("Make sure the file (or FIFO) exists."))
+
+        if not self.path and not self.stream:
+            try:
+                self.collectors = get_collectors(
+                    [name.strip() for name in args.collectors.split(',')
+                     if name.strip()] or ['system'],
+                    self.proc_root, self.sys_root)
+            except (OSError, ValueError) as e:
+                raise exception.InvalidOptionException("collectors", str(e))
+
+        self.shared = args.shared
+
+        if args.top < 0:
+            raise exception.InvalidOptionException("top")
+        self.top = args.top
+
+        if args.window:
+            try:
+                self.window = common.parse_duration(args.window)
+            except ValueError:
+                raise exception.InvalidOptionException("window")
+
         if args.variant:
             self.symbol_index = 1
         elif args.ascii:
             self.symbol_index = 2
 
+        # samples are taken (and charts drawn) on every delay
+        self.register_tick(self.delay)
+
         if launchScreenImmediately:
             self.autorun()
         else:
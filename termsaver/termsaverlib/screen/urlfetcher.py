@@ -47,14 +47,18 @@ class UrlFetcherScreen(SimpleUrlFetcherBase):
     Simple screensaver that displays data from a URL.
     """
 
+    name = "urlfetcher"
+
+    description = _("displays url contents with typing animation")
+
     def __init__(self, parser = None):
         """
         Creates a new instance of this class.
         """
 
         SimpleUrlFetcherBase.__init__(self,
-            "urlfetcher",
-            _("displays url contents with typing animation"),
+            self.name,
+            self.description,
             parser,
             ''
         )
@@ -42,6 +42,10 @@ from termsaver.termsaverlib.screen.helper.position import PositionHelperBase
 
 
 class WTTRScreen(SimpleUrlFetcherBase, PositionHelperBase):
+
+    name = "wttr"
+
+    description = _("displays a weather report from wttr.in")
     
     units = None
     typing = False
@@ -50,8 +54,8 @@ class WTTRScreen(SimpleUrlFetcherBase, PositionHelperBase):
     def __init__(self, parser = None):
 
         SimpleUrlFetcherBase.__init__(self,
-            "wttr",
-            _("displays a weather report from wttr.in"),
+            self.name,
+            self.description,
             parser,
             'https://wttr.in/?a'
         )
@@ -0,0 +1,723 @@
+###############################################################################
+#
+# file:     benchmarks.py
+#
+# Purpose:  refer to module documentation for details
+#
+# Note:     This file is part of Termsaver application, and should not be used
+#           or executed separately.
+#
+###############################################################################
+#
+# Copyright 2012 Termsaver
+#
+# Licensed under the Apache License, Version 2.0 (the "License"); you may
+# not use this file except in compliance with the License. You may obtain
+# a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS, WITHOUT
+# WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied. See the
+# License for the specific language governing permissions and limitations
+# under the License.
+#
+###############################################################################
+"""
+Performance benchmarks for termsaver. These are not unit tests (they do not
+assert anything), just measurements printed on screen.
+
+Usage:
+
+    $ python benchmarks.py              runs all benchmarks
+    $ python benchmarks.py startup      runs only the named benchmark(s)
+
+Available benchmarks: startup, typing, matrix, textwidth, figlet, sysmon,
+sampler, shared, rollups, top, stream.
+"""
+
+#
+# Python built-in modules
+#
+import argparse
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+
+bin_path = os.path.dirname(os.path.realpath(__file__))
+par_path = os.path.abspath(os.path.join(bin_path, os.path.pardir))
+sys.path.insert(0, par_path)
+
+#
+# Internal modules (can only call this after the above PATH update)
+#
+from termsaver.termsaverlib import constants
+
+
+def _measure_process(code, env):
+    """
+    Runs the informed python code in a fresh interpreter, returning the
+    seconds it reported (the code must print the elapsed time).
+    """
+    output = subprocess.check_output([sys.executable, '-c', code], env=env)
+    return float(output.decode().strip().split('\n')[-1])
+
+
+def benchmark_startup():
+    """
+    Measures the time to resolve a screen on launch (import termsaver and
+    find the screen class), with an increasing number of installed screens.
+    With the registry manifest in place, it should not grow with the number
+    of screens (compared to importing all of them, as launch used to do).
+    """
+    screen_template = '''
+from termsaver.termsaverlib.screen.base import ScreenBase
+
+class BenchScreen%(i)d(ScreenBase):
+    name = "bench%(i)d"
+    description = "benchmark screen %(i)d"
+'''
+    launch = '''
+import time
+start = time.perf_counter()
+from termsaver.termsaverlib import registry
+sources = registry.get_screen_sources() + [("tsbench.screen", %(path)r)]
+registry.find_screen("clock", sources, %(manifest)r)
+print(time.perf_counter() - start)
+'''
+    legacy = '''
+import time
+start = time.perf_counter()
+from termsaver.termsaverlib import registry
+sources = registry.get_screen_sources() + [("tsbench.screen", %(path)r)]
+registry.scan_screens(registry.list_screen_modules(sources))
+print(time.perf_counter() - start)
+'''
+    print("%8s %14s %14s" % ("screens", "registry (ms)", "import all (ms)"))
+    for total in (10, 100, 1000):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'tsbench', 'screen')
+            os.makedirs(path)
+            open(os.path.join(temp_dir, 'tsbench', '__init__.py'), 'w').close()
+            open(os.path.join(path, '__init__.py'), 'w').close()
+            for i in range(total):
+                with open(os.path.join(path, 'bench%d.py' % i), 'w') as f:
+                    f.write(screen_template % {'i': i})
+
+            env = dict(os.environ)
+            env['PYTHONPATH'] = os.pathsep.join([par_path, temp_dir])
+            args = {
+                'path': path,
+                'manifest': os.path.join(temp_dir, 'screens.json'),
+            }
+            # first run builds the manifest (and the bytecode cache)
+            _measure_process(launch % args, env)
+            _measure_process(legacy % args, env)
+            fast = min([_measure_process(launch % args, env)
+                        for __ in range(5)])
+            slow = min([_measure_process(legacy % args, env)
+                        for __ in range(3)])
+            print("%8d %14.1f %14.1f" % (total, fast * 1000, slow * 1000))
+
+
+def _legacy_typing_print(screen, text):
+    """
+    The former implementation of `TypingHelperBase.typing_print` (a write,
+    flush and sleep per character), kept here for comparison.
+    """
+    for line in text.split("\n"):
+        for char in line:
+            sys.stdout.write(char)
+            if char != ' ':
+                time.sleep(screen.delay)
+            sys.stdout.flush()
+        sys.stdout.write('\n')
+        time.sleep(screen.line_delay)
+
+
+def _typing_sample(screen):
+    """
+    Returns a text sample similar to what each screen usually types.
+    """
+    if screen == 'programmer':
+        with open(os.path.join(par_path, 'termsaver', 'termsaverlib',
+                               'screen', 'base', '__init__.py')) as f:
+            return f.read()
+    if screen == 'rfc':
+        paragraph = ("   The Transmission Control Protocol (TCP) is intended "
+                     "for use as a highly\n   reliable host-to-host protocol "
+                     "between hosts in packet-switched computer\n   "
+                     "communication networks, and in interconnected systems "
+                     "of such networks.\n\n")
+        return paragraph * 50
+    # img2ascii: dense lines of ascii art
+    chars = "@%#*+=-:. "
+    return "\n".join([''.join([chars[(x * y + y) % len(chars)]
+                                for x in range(80)]) for y in range(200)])
+
+
+def benchmark_typing():
+    """
+    Measures the accuracy of the typing effect: the time it was supposed to
+    take (based on the character and line delays of each screen) against the
+    time it actually took, together with the number of writes. Each sample is
+    cut to about 1.5 seconds of requested typing.
+    """
+    # imported here, so the startup benchmark is not affected
+    from termsaver.termsaverlib import registry
+
+    print("%-11s %8s %9s %9s %7s %7s %10s" % ("screen", "engine",
+          "requested", "achieved", "chars/s", "writes", "accuracy"))
+    stdout = sys.stdout
+    for name in ('programmer', 'rfc', 'img2ascii'):
+        screen = registry.find_screen(name)()
+        if screen.delay is None:
+            screen.delay = constants.Settings.CHAR_DELAY_SECONDS
+        if screen.line_delay is None:
+            screen.line_delay = 10 * screen.delay
+
+        # cut the sample to the budget
+        text, budget = _typing_sample(name), 0.0
+        for size, char in enumerate(text):
+            if char == '\n':
+                budget += screen.line_delay
+            elif char != ' ':
+                budget += screen.delay
+            if budget >= 1.5:
+                text = text[:size]
+                break
+        text = text.rstrip('\n')
+        requested = budget + screen.line_delay  # the trailing new line
+        chars = len(text.replace(' ', '').replace('\n', ''))
+
+        for engine, run in (('batched', screen.typing_print),
+                            ('legacy', lambda t: _legacy_typing_print(screen,
+                                                                      t))):
+            with open(os.devnull, 'w') as devnull:
+                writes = [0]
+
+                class Counter(object):
+                    def write(self, data):
+                        writes[0] += 1
+                        devnull.write(data)
+
+                    def flush(self):
+                        devnull.flush()
+
+                sys.stdout = Counter()
+                try:
+                    start = time.perf_counter()
+                    run(text)
+                    elapsed = time.perf_counter() - start
+                finally:
+                    sys.stdout = stdout
+            print("%-11s %8s %8.2fs %8.2fs %7d %7d %9.1f%%" % (name, engine,
+                  requested, elapsed, chars / elapsed, writes[0],
+                  100.0 * requested / elapsed))
+
+
+def _legacy_matrix_line(screen):
+    """
+    The former implementation of `MatrixScreen.print_line` (and its
+    `get_char_list`), based on list.pop(0) and string concatenation, kept
+    here for comparison.
+    """
+    def get_char_list():
+        result = []
+        while(len(result) == 0):
+            bt = [screen.space for __ in range(0,
+                    min((screen.geometry['y'], random.randint(0,
+                        int(screen.geometry['y'] * 20 / (screen.granularity * \
+                            screen.proportion))))))]
+            cl = [screen.digmap[random.randint(0, len(screen.digmap)) - 1] \
+                  for __ in range(0, random.randint(0,
+                      screen.geometry['y'] - len(bt)))]
+            result = bt
+            result.extend(cl)
+        return result
+
+    result = ""
+    for i in range(0, len(screen.screen_map)):
+        if len(screen.screen_map[i]) == 0:
+            screen.screen_map[i] = get_char_list()
+        try:
+            result += screen.screen_map[i].pop(0)
+        except:
+            pass
+    return result
+
+
+def benchmark_matrix():
+    """
+    Measures how many rows per second the matrix screen can generate, and the
+    CPU it would use at its default speed, for different terminal widths.
+    """
+    from termsaver.termsaverlib import registry
+
+    argv = sys.argv
+    sys.argv = ['termsaver', 'matrix']
+    try:
+        cls = registry.find_screen('matrix')
+        screen = cls(parser=argparse.ArgumentParser())._parse_args(False)
+    finally:
+        sys.argv = argv
+
+    print("%8s %8s %10s %10s" % ("columns", "engine", "rows/s", "CPU%"))
+    for columns in (80, 200, 400):
+        screen.geometry = {'x': columns, 'y': 50}
+        for engine, line in (('deque', screen.print_line),
+                             ('legacy', lambda: _legacy_matrix_line(screen))):
+            random.seed(1)
+            screen._MatrixScreen__build_screen_map()
+            if engine == 'legacy':
+                screen.screen_map = [[glyph.decode('utf-8') for glyph in c]
+                                     for c in screen.screen_map]
+            rows = 0
+            start, cpu = time.perf_counter(), time.process_time()
+            while time.perf_counter() - start < 1:
+                for __ in range(100):
+                    line()
+                rows += 100
+            cpu = time.process_time() - cpu
+            rate = rows / (time.perf_counter() - start)
+            # CPU used at the default speed (one row per line delay)
+            usage = 100.0 * (cpu / rows) / screen.line_delay
+            print("%8d %8s %10.0f %9.2f%%" % (columns, engine, rate, usage))
+
+
+def _textwidth_samples(size):
+    """
+    Returns a list of tuples (name, text) of about `size` characters each:
+    plain text, colour-escaped source code and wide (East Asian) text.
+    """
+    words = ("the quick brown fox jumps over the lazy dog while termsaver "
+             "keeps the screen busy with random words").split()
+    random.seed(1)
+    plain = []
+    while sum(map(len, plain)) < size:
+        plain.append(' '.join(random.choices(words, k=random.randint(5, 40))))
+
+    with open(os.path.join(par_path, 'termsaver', 'termsaverlib',
+                           'screen', 'base', '__init__.py')) as f:
+        source = f.read()
+    colours = ["\033[%dm" % c for c in (31, 32, 33, 34, 35, 36)]
+    ansi = []
+    for line in source.split("\n"):
+        ansi.append(' '.join([random.choice(colours) + word + "\033[39;49;00m"
+                              for word in line.split(' ')]))
+    ansi = "\n".join(ansi)
+
+    wide = ''.join([chr(random.randint(0x4E00, 0x9FFF)) +
+                    (' ' if random.random() < 0.2 else '')
+                    for __ in range(200)])
+    return [
+        ('plain', "\n".join(plain)[:size]),
+        ('ansi', (ansi * (size // len(ansi) + 1))[:size]),
+        ('wide', ("\n".join([wide] * (size // len(wide) + 1)))[:size]),
+    ]
+
+
+def benchmark_textwidth():
+    """
+    Measures the wrapping of 1 MB texts to 80 columns, with `textwrap` (as
+    the layout of `PositionHelperBase` used to do) against the
+    display-width-aware `textwidth.wrap`. Besides the speed, it shows the
+    number of lines (escape sequences counted as text make lines shorter
+    than they should) and the ones wider than the terminal (wide characters
+    counted as one column).
+    """
+    from termsaver.termsaverlib.helper import textwidth
+
+    def legacy(text, width):
+        lines = []
+        for line in text.split("\n"):
+            lines.extend(textwrap.wrap(line, width=width) or [''])
+        return lines
+
+    width = 80
+    print("%-6s %9s %8s %8s %8s %10s" % ("input", "engine", "time (s)",
+          "MB/s", "lines", "too wide"))
+    for name, text in _textwidth_samples(1024 * 1024):
+        for engine, wrap in (('textwidth', textwidth.wrap),
+                             ('textwrap', legacy)):
+            start = time.perf_counter()
+            lines = wrap(text, width)
+            elapsed = time.perf_counter() - start
+            wrong = len([line for line in lines
+                         if textwidth.display_width(line) > width])
+            print("%-6s %9s %8.3f %8.1f %8d %10d" % (name, engine, elapsed,
+                  len(text) / elapsed / 1024 / 1024, len(lines), wrong))
+
+
+def benchmark_figlet():
+    """
+    Measures the time to load FIGlet fonts of increasing sizes: parsing the
+    font file against loading its compiled glyphs from the cache (as done
+    on every launch after the first one).
+    """
+    from termsaver.termsaverlib.helper import figlet
+
+    print("%8s %10s %12s %12s" % ("glyphs", "size (KB)", "parse (ms)",
+                                  "cached (ms)"))
+    height = 12
+    for extra in (0, 500, 5000):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'bench.flf')
+            lines = ["flf2a$ %d %d 40 0 0" % (height, height - 2)]
+            codes = figlet.REQUIRED_CODES + list(range(0x4E00,
+                                                       0x4E00 + extra))
+            for i, code in enumerate(codes):
+                if code >= 0x4E00:
+                    lines.append("0x%X" % code)
+                for row in range(height):
+                    art = ''.join(random.choice(" _/\\|()$")
+                                  for __ in range(random.randint(4, 20)))
+                    lines.append(art + ("@@" if row == height - 1 else "@"))
+            with open(path, 'w') as f:
+                f.write("\n".join(lines) + "\n")
+
+            cache_dir = os.path.join(temp_dir, 'fonts')
+            figlet.load_font(path, cache_dir)
+            parse = min([_time_call(lambda: figlet.load_font(path, None))
+                         for __ in range(5)])
+            cached = min([_time_call(lambda: figlet.load_font(path,
+                                                              cache_dir))
+                          for __ in range(5)])
+            print("%8d %10.0f %12.2f %12.2f" % (len(codes),
+                  os.path.getsize(path) / 1024.0, parse * 1000,
+                  cached * 1000))
+
+
+def _time_call(function):
+    """
+    Returns the seconds it takes to call the informed function.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def benchmark_sysmon():
+    """
+    Measures the time to draw and render a cycle of the sysmon screen (with
+    a new sample), and the bytes written to the terminal, for different
+    terminal sizes: scrolling charts (with fixed and adjusted scales) against
+    building the charts entirely on every cycle, as the screen used to do.
+    """
+    from termsaver.termsaverlib import registry
+    from termsaver.termsaverlib.helper.sampler import Snapshot
+
+    argv = sys.argv
+    sys.argv = ['termsaver', 'sysmon']
+    try:
+        cls = registry.find_screen('sysmon')
+        screen = cls(parser=argparse.ArgumentParser())._parse_args(False)
+    finally:
+        sys.argv = argv
+
+    def update_stats():
+        screen.snapshot = Snapshot(time.time(), {
+            'system': (random.random() * 100, 40 + random.random(), 1024)})
+        screen.get_samples(('time', 'system.cpu', 'system.mem')).append(
+            screen.snapshot.time, *screen.snapshot.records['system'][:2])
+    screen.update_stats = update_stats
+    screen.get_terminal_size = lambda: None
+
+    print("%10s %10s %12s %12s" % ("terminal", "mode", "cycle (ms)",
+                                   "bytes"))
+    stdout = sys.stdout
+    for width, height in ((80, 24), (200, 60), (400, 100)):
+        for mode in ('scroll', 'adjust', 'legacy'):
+            random.seed(1)
+            screen.geometry = {'x': width, 'y': height}
+            screen.adjust = mode != 'scroll'
+            screen.samples = None
+            screen.charts = {}
+            screen.invalidate()
+            cycle = screen._run_cycle
+            if mode == 'legacy':
+                cycle = lambda: _legacy_sysmon_cycle(screen)
+            sys.stdout = io.StringIO()
+            try:
+                # fill the charts, so they scroll
+                for __ in range(width):
+                    screen.update_stats()
+                cycle()
+                times, sizes = [], []
+                for __ in range(20 if mode == 'legacy' else 200):
+                    start = time.perf_counter()
+                    cycle()
+                    times.append(time.perf_counter() - start)
+                    sizes.append(screen.last_render_size)
+            finally:
+                sys.stdout = stdout
+            times.sort()
+            print("%10s %10s %12.3f %12d" % ("%dx%d" % (width, height), mode,
+                  times[len(times) // 2] * 1000, sum(sizes) / len(sizes)))
+
+
+def _legacy_sysmon_cycle(screen):
+    """
+    The former implementation of `SysmonScreen._run_cycle` (and its
+    `get_xy_chart`), building the charts entirely with string concatenation
+    and rendering the differences, kept here for comparison.
+    """
+    def get_xy_chart(title, key):
+        ceiling = screen.samples.max(key)
+        ysize = int((screen.geometry['y'] - 13)/2)
+        txt = screen.align_text_right(title) + "\n" \
+            + ('%.0f' % ceiling) + "%\n"
+        values = screen.samples.series(key)
+        for y in range(ysize - 1, -1, -1):
+            current_position = 0
+            txt += " " + screen.axis_v[0]
+            for x in range(screen.geometry['x'] - 5):
+                if len(values) - 1 < x:
+                    txt += " "
+                else:
+                    current_position += 1
+                    ratio = int(values[x] * ysize / ceiling)
+                    if ratio >= y + 1:
+                        txt += screen.block[0][-1]
+                    elif y > 0:
+                        txt += screen.block[0][0]
+                    else:
+                        txt += screen.block[0][1]
+            txt += "\n"
+        txt += " " + screen.axis_corner[0] \
+            + screen.axis_h[0] * (screen.geometry['x'] - 5) + "\n"
+        txt += "%s%s%s\n" % (screen.format_time(screen.samples.first('time')),
+                " " * (current_position - 5), "now")
+        return txt
+
+    screen.begin_frame()
+    screen.update_stats()
+    txt = get_xy_chart("CPU Monitor", 'system.cpu') + "\n" \
+        + get_xy_chart("MEM Monitor", 'system.mem')
+    txt += screen.center_text_horizontally("\nCPU: %.1f%%   MEM: %s%%" % (
+        screen.samples.last('system.cpu'),
+        screen.samples.last('system.mem')))
+    screen.draw(txt)
+    screen.render()
+
+
+def benchmark_sampler():
+    """
+    Measures the time to take a sample of CPU and memory usage: reading the
+    files of /proc kept open (as the sysmon sampler does), against opening
+    them again and parsing them with regular expressions, as it used to be.
+    Also measures the time to take a sample with each collector.
+    """
+    from termsaver.termsaverlib import common
+    from termsaver.termsaverlib.helper import collectors, sampler
+
+    if not os.path.exists('/proc/stat'):
+        print("/proc is not available")
+        return
+
+    def legacy():
+        with open("/proc/stat", "r") as f:
+            [int(x) for x in f.readline().split()[1:5]]
+        common.get_mem_usage()
+
+    proc = sampler.ProcSampler(1, collectors.get_collectors(['system']))
+    try:
+        print("%10s %12s" % ("mode", "sample (us)"))
+        for mode, function in (('persistent', proc.sample),
+                               ('legacy', legacy)):
+            times = sorted([_time_call(function) for __ in range(2000)])
+            print("%10s %12.1f" % (mode, times[len(times) // 2] * 1000000))
+    finally:
+        proc.stop()
+
+    # the cost of each collector available here
+    for name in sorted(collectors.COLLECTORS):
+        try:
+            collector = collectors.get_collectors([name])[0]
+        except OSError:
+            print("%10s %12s" % (name, "n/a"))
+            continue
+        try:
+            times = sorted([_time_call(collector.sample)
+                            for __ in range(2000)])
+            print("%10s %12.1f" % (name, times[len(times) // 2] * 1000000))
+        finally:
+            collector.close()
+
+
+def benchmark_shared():
+    """
+    Measures the cost per sample of many sysmon instances on the same host:
+    each one sampling /proc on its own, against a single writer sampling
+    into the shared ring, and each instance reading the new snapshot.
+    """
+    from termsaver.termsaverlib.helper import collectors, sampler
+
+    if not os.path.exists('/proc/stat'):
+        print("/proc is not available")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        writer = sampler.SharedSampler(60, collectors.get_collectors(
+            ['system']), directory)
+        readers = [sampler.SharedSampler(60, collectors.get_collectors(
+            ['system']), directory) for __ in range(50)]
+        own = []
+        try:
+            writer.start()
+            for reader in readers:
+                reader.start()
+                reader.get_snapshots()
+            own.extend([collectors.get_collectors(['system'])[0]
+                        for __ in readers])
+
+            def shared():
+                writer.sample()
+                for reader in readers:
+                    reader.get_snapshots()
+
+            def local():
+                for collector in own:
+                    collector.sample()
+
+            print("%d instances" % len(readers))
+            print("%10s %12s" % ("mode", "sample (us)"))
+            for mode, function in (('shared', shared), ('local', local)):
+                times = sorted([_time_call(function) for __ in range(500)])
+                print("%10s %12.1f" % (mode,
+                                       times[len(times) // 2] * 1000000))
+        finally:
+            for proc in [writer] + readers:
+                proc.stop()
+            for collector in own:
+                collector.close()
+
+
+def benchmark_rollups():
+    """
+    Measures the time to add a sample to the rollups of sysmon, and to
+    downsample windows of history (after a day of samples, half a second
+    apart) to the width of a chart, along with the memory they take.
+    """
+    from termsaver.termsaverlib.helper import samplestore
+
+    store = samplestore.RollupStore(('cpu',), 0.5)
+    start = time.time() - 86400
+    for i in range(2 * 86400):
+        store.append(start + i * 0.5, random.random() * 100)
+
+    stores = [store.samples] + [rollup.buckets for rollup in store.rollups]
+    size = sum([len(buffers.fields) * buffers.capacity * 8
+                for buffers in stores])
+    times = sorted([_time_call(lambda: store.append(time.time(), 1))
+                    for __ in range(2000)])
+    print("append: %.1f us, buffers: %d KB" % (
+        times[len(times) // 2] * 1000000, size // 1024))
+
+    print("%8s %12s %14s" % ("window", "resolution", "downsample (us)"))
+    for window in (60, 3600, 6 * 3600, 86400):
+        times = sorted([_time_call(lambda: store.downsample(window, 200))
+                        for __ in range(200)])
+        rollup = store.get_rollup(window)
+        print("%8d %12d %14.1f" % (window,
+                                   rollup.resolution if rollup else 0,
+                                   times[len(times) // 2] * 1000000))
+
+
+def benchmark_top():
+    """
+    Measures the time of a scan of processes (see `sysmon --top`) on a
+    fake proc file system of 20000 processes: reading all of them on every
+    cycle, against the budget of processes read per cycle.
+    """
+    from termsaver.termsaverlib.helper import processes
+
+    line = ("%d (worker) S 1 1 1 0 -1 4194304 0 0 0 0 %d 10 0 0 20 0 1 0 "
+            "100 1000000 256 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0 0 0 0\n")
+    with tempfile.TemporaryDirectory() as root:
+        for pid in range(1, 20001):
+            os.mkdir(os.path.join(root, str(pid)))
+            with open(os.path.join(root, str(pid), 'stat'), 'w') as f:
+                f.write(line % (pid, random.randint(0, 10000)))
+
+        print("%10s %10s %12s" % ("budget", "processes", "scan (ms)"))
+        for budget in (20000, processes.ProcessScanner.budget):
+            scanner = processes.ProcessScanner(root, budget)
+            times = []
+            for __ in range(40):
+                times.append(_time_call(scanner.scan))
+                scanner.top(10)
+            times.sort()
+            print("%10d %10d %12.1f" % (budget, len(scanner.processes),
+                                        times[len(times) // 2] * 1000))
+
+
+def benchmark_stream():
+    """
+    Measures the time to read values streamed into sysmon (see `sysmon
+    --stream`) through a FIFO, per line, in bulk reads on each cycle.
+    """
+    from termsaver.termsaverlib.helper import stream
+
+    if not hasattr(os, 'mkfifo'):
+        print("FIFOs are not available")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'fifo')
+        os.mkfifo(path)
+        reader = stream.StreamReader(path)
+        writer = os.open(path, os.O_WRONLY)
+        try:
+            print("%10s %12s" % ("lines", "line (us)"))
+            for name, line in (("plain", b"%d\n"),
+                               ("named", b"latency=%d errors=0\n")):
+                data = b"".join([line % i for i in range(1000)])
+                times = []
+                for __ in range(100):
+                    os.write(writer, data)
+                    times.append(_time_call(reader.read))
+                times.sort()
+                print("%10s %12.3f" % (name, times[len(times) // 2] * 1000))
+        finally:
+            os.close(writer)
+            reader.close()
+
+
+BENCHMARKS = [
+    benchmark_startup,
+    benchmark_typing,
+    benchmark_matrix,
+    benchmark_textwidth,
+    benchmark_figlet,
+    benchmark_sysmon,
+    benchmark_sampler,
+    benchmark_shared,
+    benchmark_rollups,
+    benchmark_top,
+    benchmark_stream,
+]
+"""
+Holds the list of available benchmarks, run in order.
+"""
+
+
+def run_benchmarks(names=None):
+    for benchmark in BENCHMARKS:
+        name = benchmark.__name__[len('benchmark_'):]
+        if names and name not in names:
+            continue
+        print("\n== %s ==" % name)
+        start = time.perf_counter()
+        benchmark()
+        print("(took %.1fs)" % (time.perf_counter() - start))
+
+
+if __name__ == "__main__":
+    run_benchmarks(sys.argv[1:])
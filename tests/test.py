@@ -28,8 +28,16 @@
 #
 # Python built-in modules
 #
+import argparse
+import datetime
+import io
 import os
+import random
+import shutil
+import subprocess
 import sys
+import tempfile
+import time
 import unittest
 
 #
@@ -41,7 +49,11 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__),
 #
 # Internal Modules (can only call this after the above PATH update)
 #
-from termsaver.termsaverlib.screen.helper import position
+from termsaver.termsaverlib import capabilities, common, exception, registry
+from termsaver.termsaverlib.helper import collectors, figlet, layout, \
+    processes, sampler, samplestore, scheduler, sharedring, stream, \
+    textwidth
+from termsaver.termsaverlib.screen.helper import position, renderer, typing
 
 
 class PositionHelperTestCase(unittest.TestCase):
@@ -222,5 +234,1453 @@ class PositionHelperTestCase(unittest.TestCase):
 #        self.assertListEqual(files_list, self.files_list)
 
 
+class CapabilitiesTestCase(unittest.TestCase):
+
+    def testIsAvailable(self):
+        self.assertTrue(capabilities.is_available('json'))
+        self.assertFalse(capabilities.is_available('termsaver_no_such_module'))
+        self.assertFalse(capabilities.is_available('json.no_such_module'))
+
+    def testDetectAllDoesNotImport(self):
+        not_loaded = [name for name in capabilities.OPTIONAL_MODULES
+                      if name not in sys.modules]
+        detected = capabilities.detect_all()
+        self.assertEqual(sorted(detected), sorted(capabilities.OPTIONAL_MODULES))
+        for name in not_loaded:
+            self.assertNotIn(name, sys.modules)
+
+    def testReport(self):
+        report = capabilities.build_report()
+        for name in capabilities.OPTIONAL_MODULES:
+            self.assertIn(name, report)
+
+
+class RegistryTestCase(unittest.TestCase):
+
+    def testManifest(self):
+        sources = registry.get_screen_sources()
+        modules = registry.list_screen_modules(sources)
+        fingerprint = registry.build_fingerprint(modules)
+        entries = registry.scan_screens(modules)
+        self.assertIn('clock', [e['name'] for e in entries])
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, registry.MANIFEST_FILE)
+            self.assertEqual(registry.read_manifest(path, fingerprint), None)
+            registry.write_manifest(path, fingerprint, entries)
+            self.assertEqual(registry.read_manifest(path, fingerprint), entries)
+
+            # any change to the screen modules invalidates the manifest
+            fingerprint['files'][0][1] += 1
+            self.assertEqual(registry.read_manifest(path, fingerprint), None)
+
+    def testFindScreen(self):
+        screen = registry.find_screen('clock', manifest_path=None)
+        self.assertEqual(screen.__name__, 'ClockScreen')
+        self.assertEqual(registry.find_screen('no-such-screen',
+                                              manifest_path=None), None)
+
+
+class ImportTimeTestCase(unittest.TestCase):
+    """
+    Regression test for the cold-start import cost of lightweight screens,
+    based on the output of `python -X importtime`.
+    """
+
+    screens = ['clock', 'matrix', 'randtxt', 'starwars', 'sysmon']
+
+    heavy_modules = ['PIL', 'requests', 'pygments', 'pynput']
+
+    max_import_time = 0.25
+    """
+    Maximum accumulated import time, in seconds, for launching a lightweight
+    screen (generous on purpose: importing any of the heavy modules alone
+    would go beyond it on most machines).
+    """
+
+    def get_import_times(self, screen):
+        code = ("from termsaver.termsaverlib import registry; "
+                "registry.find_screen(%r)" % screen)
+        env = dict(os.environ)
+        env['PYTHONPATH'] = os.path.abspath(os.path.join(
+            os.path.dirname(__file__), os.path.pardir))
+        # the registry manifest is written into a temporary home, instead of
+        # the one of the user running the tests
+        home = tempfile.TemporaryDirectory()
+        self.addCleanup(home.cleanup)
+        env['HOME'] = home.name
+        # first run builds the registry manifest and bytecode caches
+        subprocess.check_output([sys.executable, '-c', code], env=env)
+        output = subprocess.run([sys.executable, '-X', 'importtime', '-c',
+            code], env=env, stderr=subprocess.PIPE, check=True).stderr
+        times = {}
+        for line in output.decode().splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            __, cumulative, name = line[len('import time:'):].split('|')
+            times[name.rstrip()] = int(cumulative)
+        return times
+
+    def testLightweightScreens(self):
+        for screen in self.screens:
+            times = self.get_import_times(screen)
+            for name in times:
+                self.assertNotIn(name.strip().split('.')[0],
+                    self.heavy_modules,
+                    "%s imported by %s screen" % (name.strip(), screen))
+
+            # only top-level imports, as cumulative values include children
+            total = sum([value for name, value in times.items()
+                         if not name.startswith('  ')])
+            self.assertLess(total / 1000000.0, self.max_import_time,
+                "%s screen took %d us to import" % (screen, total))
+
+
+class TextWidthTestCase(unittest.TestCase):
+
+    def testDisplayWidth(self):
+        self.assertEqual(textwidth.display_width("abc"), 3)
+        self.assertEqual(textwidth.display_width("\033[1;31mabc\033[0m"), 3)
+        self.assertEqual(textwidth.display_width("中文"), 4)
+        self.assertEqual(textwidth.display_width("ﾊﾟ"), 2)
+        self.assertEqual(textwidth.display_width("e\u0301"), 1)
+        self.assertEqual(textwidth.display_width("\033(0qq\033(B"), 2)
+
+    def testWrap(self):
+        self.assertEqual(textwidth.wrap("ab  cd\n\nef", 10),
+            ["ab  cd", "", "ef"])
+        self.assertEqual(textwidth.wrap("abc def ghi", 7), ["abc def", "ghi"])
+        self.assertEqual(textwidth.wrap("abc def ghi", 0), ["abc def ghi"])
+        self.assertEqual(textwidth.wrap("abcdefgh", 3), ["abc", "def", "gh"])
+        # wide characters are never split in half
+        self.assertEqual(textwidth.wrap("中文字", 5), ["中文", "字"])
+
+    def testWrapKeepsEscapes(self):
+        lines = textwidth.wrap("\033[31mred text\033[0m plain", 5)
+        self.assertEqual(lines, [
+            "\033[31mred" + textwidth.RESET,
+            "\033[31mtext\033[0m",
+            "plain",
+        ])
+        # lines that fit are kept, but their colours do not leak
+        lines = textwidth.wrap("\033[1mbold\nstill bold", 20)
+        self.assertEqual(lines, ["\033[1mbold" + textwidth.RESET,
+                                 "\033[1mstill bold" + textwidth.RESET])
+
+
+class FigletTestCase(unittest.TestCase):
+
+    @staticmethod
+    def make_font(path):
+        """
+        Writes a 2-row test font, where each glyph is its character repeated
+        (with a hard blank in between), plus a code-tagged arrow.
+        """
+        lines = ["flf2a$ 2 2 6 0 1", "test font"]
+        for code in figlet.REQUIRED_CODES:
+            char = chr(code)
+            lines += [char + "$" + char + "@", char * 2 + "@@"]
+        lines += ["0x2192  RIGHTWARDS ARROW", "->#", "  ##"]
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def testParse(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'test.flf')
+            self.make_font(path)
+            font = figlet.load_font(path, cache_dir=None)
+        self.assertEqual(font.height, 2)
+        self.assertEqual(font.glyphs['7'], ("7 7", "77 "))
+        self.assertEqual(font.glyphs['\u00df'], ("\u00df \u00df", "\u00df\u00df "))
+        self.assertEqual(font.glyphs['\u2192'], ("->", "  "))
+        with self.assertRaises(ValueError):
+            figlet.parse_font("not a font")
+        with self.assertRaises(ValueError):
+            figlet.parse_font("flf2a$ 2 2 6 0 0\na@\nb@@\n")
+
+    def testCache(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'test.flf')
+            cache_dir = os.path.join(temp_dir, 'fonts')
+            self.make_font(path)
+            font = figlet.load_font(path, cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+            # cached fonts are not parsed again
+            parse_font = figlet.parse_font
+            figlet.parse_font = None
+            try:
+                self.assertEqual(figlet.load_font(path, cache_dir), font)
+            finally:
+                figlet.parse_font = parse_font
+
+            # a changed file is compiled again
+            with open(path, 'a') as f:
+                f.write("66\nBB@\nBB@@\n")
+            self.assertEqual(figlet.load_font(path, cache_dir).glyphs['B'],
+                             ("BB", "BB"))
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+
+class SampleStoreTestCase(unittest.TestCase):
+
+    def testRingBuffer(self):
+        store = samplestore.SampleStore(('time', 'value'), 3)
+        self.assertEqual(len(store), 0)
+        self.assertEqual(store.last('value'), 0)
+        for i in range(5):
+            store.append(i, i * 10)
+        self.assertEqual(len(store), 3)
+        self.assertEqual(store.series('value'), [20, 30, 40])
+        self.assertEqual(store.first('time'), 2)
+        self.assertEqual(store.get('value', -1), 40)
+        self.assertRaises(IndexError, store.get, 'value', 3)
+        store.append(value=50)
+        self.assertEqual(store.series('time'), [3, 4, 0])
+        store.extend([5, 6], [60, 70])
+        self.assertEqual(store.series('value'), [50, 60, 70])
+        self.assertEqual(store.max('value'), 70)
+        self.assertEqual(store.total, 8)
+
+    def testRollingMax(self):
+        store = samplestore.SampleStore(('value',), 10)
+        values = []
+        for __ in range(500):
+            value = random.choice([random.random() * 100, 0])
+            values.append(value)
+            store.append(value)
+            self.assertEqual(store.max('value'), max(values[-10:]))
+
+    def testResize(self):
+        store = samplestore.SampleStore(('value',), 5)
+        for value in [9, 1, 2, 3, 4]:
+            store.append(value)
+        store.resize(3)
+        self.assertEqual(store.series('value'), [2, 3, 4])
+        self.assertEqual(store.max('value'), 4)
+        store.resize(6)
+        store.append(5)
+        self.assertEqual(store.series('value'), [2, 3, 4, 5])
+        store.clear()
+        self.assertEqual(len(store), 0)
+
+    def testRollup(self):
+        rollup = samplestore.Rollup(('value',), 10, 3)
+        for time_, value in [(100, 1), (105, 5), (109, 3), (112, 7),
+                             (135, 2)]:
+            rollup.add(time_, (value,))
+        self.assertEqual(rollup.buckets.series('time'), [100, 110])
+        self.assertEqual(rollup.series('time'), [100, 110, 130])
+        self.assertEqual(rollup.series('value:min'), [1, 7, 2])
+        self.assertEqual(rollup.series('value:max'), [5, 7, 2])
+        self.assertEqual(rollup.buckets.fields,
+                         ('time', 'value:min', 'value:max'))
+        self.assertEqual(rollup.coverage, 30)
+
+    def testRollupStore(self):
+        store = samplestore.RollupStore(('value',), 1, raw=60,
+                                        tiers=((10, 60), (60, 60)))
+        # an hour of samples, with a single spike and a single dip
+        for i in range(3600):
+            store.append(i, {1234: 100, 2345: -50}.get(i, i % 10))
+        self.assertEqual(store.total, 3600)
+        self.assertIsNone(store.get_rollup(60))
+        self.assertEqual(store.get_rollup(600).resolution, 10)
+        self.assertEqual(store.get_rollup(3600).resolution, 60)
+        self.assertEqual(store.get_rollup(86400).resolution, 60)
+
+        columns = store.downsample(60, 30)
+        self.assertEqual(len(columns), 30)
+        self.assertEqual(columns.first('time'), 3540)
+        self.assertEqual(columns.series('value')[:3], [1, 3, 5])
+        self.assertEqual(columns.series('value:min')[:3], [0, 2, 4])
+
+        # the spike and the dip are kept, whatever the width
+        for width in (1, 7, 40, 100):
+            columns = store.downsample(3600, width)
+            self.assertEqual(len(columns), min(width, 60))
+            self.assertEqual(columns.max('value'), 100)
+            self.assertEqual(min(columns.series('value:min')), -50)
+        self.assertEqual(store.downsample(600, 1).last('value:min'), 0)
+
+        # the recent samples are kept as they are, one value per field
+        self.assertEqual(store.samples.fields, ('time', 'value'))
+        self.assertEqual(store.samples.series('value')[-3:], [7, 8, 9])
+
+        empty = samplestore.RollupStore(('value',), 1)
+        self.assertEqual(len(empty.downsample(60, 10)), 0)
+
+
+PROC_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                            'proc-for-tests')
+"""
+A fixture proc file system, for testing collectors.
+"""
+
+SYS_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                           'sys-for-tests')
+"""
+A fixture sys file system, for testing collectors.
+"""
+
+CGROUP_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                              'cgroup-for-tests')
+"""
+A copy of the sys file system of a container (only its control group v2),
+with a CPU quota of 1.5 CPUs, and a memory limit of 1GB.
+"""
+
+
+class CollectorsTestCase(unittest.TestCase):
+
+    def setUp(self):
+        # a copy of the fixture, to be changed between samples
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'proc')
+        shutil.copytree(PROC_FIXTURE, self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def replace(self, name, old, new):
+        # rewritten in place, as collectors keep the files open (and never
+        # truncated first, as they may be sampled meanwhile)
+        path = os.path.join(self.root, name)
+        with open(path, 'r+') as f:
+            text = f.read()
+            f.seek(0)
+            f.write(text.replace(old, new))
+            f.truncate()
+
+    def get_collectors(self, *names):
+        result = collectors.get_collectors(names, self.root, SYS_FIXTURE)
+        self.addCleanup(lambda: [c.close() for c in result])
+        return result
+
+    def testFields(self):
+        records = dict([(c.name, (c.fields, c.sample())) for c in
+                        self.get_collectors(*sorted(collectors.COLLECTORS))])
+        self.assertEqual(records['system'], (('cpu', 'mem', 'total_mem'),
+                                             (40.0, 75.0, 2000.0)))
+        self.assertEqual(records['cores'], (('busiest', 'cpu0', 'cpu1'),
+                                            (50.0, 50.0, 30.0)))
+        self.assertEqual(records['load'][1], (0.52, 0.58, 0.59))
+        self.assertEqual(records['temp'], (
+            ('max', 'Package id 0', 'coretemp2', 'acpitz1'),
+            (52.5, 45.0, 52.5, 30.0)))
+        # rates need two samples
+        self.assertEqual(records['disk'][1], (0, 0, 0))
+        self.assertEqual(records['net'][1], (0, 0, 0))
+
+        self.assertRaises(ValueError, collectors.get_collectors, ['foo'],
+                          self.root, SYS_FIXTURE)
+        self.assertRaises(OSError, collectors.get_collectors, ['temp'],
+                          self.root, self.temp_dir.name)
+
+    def testSamples(self):
+        now = [0]
+        system, cores, disk, net = self.get_collectors('system', 'cores',
+                                                       'disk', 'net')
+        for collector in (disk, net):
+            collector.clock = lambda: now[0]
+            collector.sample()
+        system.sample()
+        cores.sample()
+
+        self.replace('stat', "cpu  3000 0 1000 6000", "cpu  3300 0 1100 6100")
+        self.replace('stat', "cpu1 1000 0 500 3500", "cpu1 1000 0 500 3600")
+        # only whole disks count (no partitions nor loop devices)
+        self.replace('diskstats', "sda 1000 0 4096 100 500 0 2048",
+                     "sda 1000 0 6144 100 500 0 3072")
+        self.replace('diskstats', "loop0 100 0 800", "loop0 100 0 8000")
+        self.replace('net/dev', "1024000   1000", "3072000   1000")
+        self.replace('net/dev', "lo:  500000", "lo:  900000")
+        now[0] = 2
+
+        self.assertAlmostEqual(system.sample()[0], 80)
+        self.assertEqual(cores.sample(), (0, 0, 0))
+        self.assertEqual(disk.sample(), (768, 512, 256))
+        self.assertEqual(net.sample(), (1000, 1000, 0))
+
+    def testCgroup(self):
+        sys_root = os.path.join(self.temp_dir.name, 'sys')
+        shutil.copytree(CGROUP_FIXTURE, sys_root)
+        group = os.path.join(sys_root, 'fs', 'cgroup')
+
+        def write(name, text):
+            with open(os.path.join(group, name), 'w') as f:
+                f.write(text)
+
+        # only limited groups replace the usage of the system
+        self.assertTrue(collectors.CgroupCollector.is_limited(self.root,
+                                                              sys_root))
+        self.assertFalse(collectors.CgroupCollector.is_limited(self.root,
+                                                               SYS_FIXTURE))
+        system, = collectors.get_collectors(['system'], self.root, sys_root)
+        self.addCleanup(system.close)
+        self.assertIsInstance(system, collectors.CgroupCollector)
+
+        now = [0]
+        system.clock = lambda: now[0]
+        self.assertEqual(system.sample(), (0, 25, 1024, 1.5))
+        write('cpu.stat', "usage_usec 2500000\n")
+        write('cpu.max', "max 100000\n")
+        write('memory.max', "max\n")
+        now[0] = 2
+        # 0.75 CPU seconds per second, out of the 2 CPUs of the system
+        record = system.sample()
+        self.assertEqual(record, (37.5, 12.8, 2000, 2))
+        self.assertIn("CPU: 37.5% (of 2)", system.format(record, str))
+
+        # no limits at all
+        self.assertFalse(collectors.CgroupCollector.is_limited(self.root,
+                                                               sys_root))
+        # the group of the process is found in /proc/self/cgroup
+        os.mkdir(os.path.join(self.root, 'self'))
+        with open(os.path.join(self.root, 'self', 'cgroup'), 'w') as f:
+            f.write("0::/app.slice\n")
+        # but only if it is mounted (otherwise, the root is used)
+        self.assertEqual(collectors.CgroupCollector.get_path(self.root,
+                                                             sys_root),
+                         group)
+        os.mkdir(os.path.join(group, 'app.slice'))
+        for name in ('cpu.stat', 'cpu.max', 'memory.current', 'memory.max'):
+            shutil.copy(os.path.join(group, name),
+                        os.path.join(group, 'app.slice', name))
+        self.assertEqual(collectors.CgroupCollector.get_path(self.root,
+                                                             sys_root),
+                         os.path.join(group, 'app.slice'))
+        write('app.slice/cpu.max', "50000 100000\n")
+        self.assertTrue(collectors.CgroupCollector.is_limited(self.root,
+                                                              sys_root))
+
+    @unittest.skipUnless(sys.platform.startswith('linux'), "Linux only")
+    def testCommonCpuUsage(self):
+        # the former (synchronous) path, still used outside of sysmon
+        usage = common.get_cpu_usage(0.05)
+        self.assertGreaterEqual(usage, 0)
+        self.assertLessEqual(usage, 100)
+
+    def testParseMemInfo(self):
+        self.assertEqual(collectors.parse_mem_info(
+            b"MemFree: 10 kB\nFoo: 1\nMemTotal: 40 kB\n"), (40, 10))
+
+    def testSampler(self):
+        proc = sampler.ProcSampler(0.05, self.get_collectors('system',
+                                                             'load'))
+        proc.start()
+        try:
+            self.assertEqual(proc.snapshot.records['load'],
+                             (0.52, 0.58, 0.59))
+            self.replace('stat', "cpu  3000 0 1000 6000",
+                         "cpu  3100 0 1000 6000")
+            # the usage is the one between the latest two samples, so it is
+            # only 100 until the next one (polled more often than sampled)
+            seen = set()
+            for __ in range(200):
+                seen.add(proc.snapshot.records['system'][0])
+                if 100 in seen:
+                    break
+                time.sleep(0.005)
+            self.assertIn(100, seen)
+        finally:
+            proc.stop()
+        self.assertIsNone(proc.error)
+
+
+class ProcessScannerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.temp_dir.name, 'proc')
+        shutil.copytree(PROC_FIXTURE, self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def set_ticks(self, pid, utime, stime):
+        path = os.path.join(self.root, str(pid), 'stat')
+        with open(path) as f:
+            values = f.read().split(' ')
+        # the name of 42 holds spaces
+        offset = 2 if pid == 42 else 0
+        values[13 + offset], values[14 + offset] = str(utime), str(stime)
+        with open(path, 'w') as f:
+            f.write(' '.join(values))
+
+    def testScan(self):
+        now = [0]
+        scanner = processes.ProcessScanner(self.root)
+        scanner.hz = 100
+        scanner.clock = lambda: now[0]
+        scanner.scan()
+        self.assertEqual(scanner.scanned, 3)
+        self.assertEqual(scanner.processes[42].name, "my (weird) app")
+        self.assertEqual(scanner.processes[42].ticks, 1500)
+        self.assertEqual(scanner.processes[1].rss, 3000 * scanner.page_size)
+
+        self.set_ticks(1, 400, 200)
+        self.set_ticks(42, 1100, 550)
+        now[0] = 2
+        scanner.scan()
+        # ticks are hundredths of a second of CPU
+        self.assertEqual([(p.pid, p.cpu) for p in scanner.top(2)],
+                         [(42, 75.0), (1, 50.0)])
+
+        # processes gone are dropped, new ones read first
+        shutil.rmtree(os.path.join(self.root, '1'))
+        shutil.copytree(os.path.join(self.root, '100'),
+                        os.path.join(self.root, '7'))
+        scanner.budget = 1
+        scanner.scan()
+        self.assertNotIn(1, scanner.processes)
+        self.assertEqual(sorted(scanner.processes), [7, 42, 100])
+        self.assertEqual(scanner.scanned, 1)
+        scanner.scan()
+        scanner.scan()
+        self.assertEqual(scanner.scanned, 1)
+
+
+class StreamReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'fifo')
+        os.mkfifo(self.path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def testRead(self):
+        # opening the FIFO does not wait for a writer
+        reader = stream.StreamReader(self.path)
+        self.addCleanup(reader.close)
+        self.assertEqual(reader.read(), {})
+
+        writer = os.open(self.path, os.O_WRONLY)
+        self.addCleanup(os.close, writer)
+        os.write(writer, b"1\n2.5\nfoo\nlatency=3,errors=0\nlatency=9\n4")
+        values = reader.read()
+        self.assertEqual(values['value'], (2, 3.5, 1, 2.5, 2.5))
+        self.assertEqual(values['latency'], (2, 12, 3, 9, 9))
+        self.assertEqual(values['errors'].count, 1)
+        self.assertEqual(reader.names, ['value', 'latency', 'errors'])
+        self.assertEqual(reader.errors, 1)
+
+        # incomplete lines wait for their end
+        self.assertEqual(reader.read(), {})
+        os.write(writer, b"2\n" + b"x=1\n" * 5000)
+        values = reader.read()
+        self.assertEqual(values['value'], (1, 42, 42, 42, 42))
+        self.assertEqual(values['x'].count, 5000)
+
+        # the number of series is limited
+        reader.max_series = 4
+        os.write(writer, b"y=1 z=2\n")
+        self.assertEqual(sorted(reader.read()), [])
+
+    def testLongLine(self):
+        reader = stream.StreamReader(self.path)
+        self.addCleanup(reader.close)
+        reader.limit = reader.chunk = 16
+        writer = os.open(self.path, os.O_WRONLY)
+        self.addCleanup(os.close, writer)
+
+        # data without new lines is not kept beyond the limit
+        os.write(writer, b"1\n" + b"9" * 40)
+        self.assertEqual(reader.read()['value'].count, 1)
+        self.assertEqual(reader.read(), {})
+        self.assertEqual(reader.errors, 1)
+        # the line is dropped up to its end (and counted once)
+        os.write(writer, b"9" * 10 + b"\n3\n")
+        self.assertEqual(reader.read(), {})
+        self.assertEqual(reader.read()['value'], (1, 3, 3, 3, 3))
+        self.assertEqual(reader.errors, 1)
+
+
+class SharedSamplerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def get_sampler(self, *names, **kwargs):
+        proc = sampler.SharedSampler(
+            0.01, collectors.get_collectors(names, PROC_FIXTURE, SYS_FIXTURE),
+            self.temp_dir.name, **kwargs)
+        self.addCleanup(proc.stop)
+        return proc
+
+    def testRing(self):
+        path = os.path.join(self.temp_dir.name, 'ring')
+        writer = sharedring.SharedRing(path, ['a', 'b'], 2, 4)
+        reader = sharedring.SharedRing(path, ['a', 'b'], 2, 4)
+        other = sharedring.SharedRing(path, ['a', 'c'], 2, 4)
+        self.addCleanup(lambda: [r.close() for r in (writer, reader, other)])
+
+        # a single writer, and nothing to read before it starts
+        self.assertTrue(writer.lock())
+        self.assertFalse(reader.lock())
+        self.assertFalse(reader.attach())
+        writer.initialize()
+        self.assertTrue(reader.attach())
+        self.assertEqual(reader.read(), (0, []))
+
+        for i in range(6):
+            writer.append((i, i * 10))
+        self.assertEqual(reader.read(), (6, [(2, 20), (3, 30), (4, 40),
+                                            (5, 50)]))
+        self.assertEqual(reader.read(since=5), (6, [(5, 50)]))
+        self.assertEqual(reader.read(since=1, limit=2), (6, [(4, 40),
+                                                            (5, 50)]))
+        # rings of other schemas are never read
+        self.assertFalse(other.attach())
+
+        # the records survive a change of writer
+        writer.close()
+        self.assertTrue(reader.lock())
+        reader.initialize()
+        self.assertEqual(reader.read(since=4), (6, [(4, 40), (5, 50)]))
+
+        # only the owner can read the file
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        self.assertIn("-%d-" % os.getuid(), sharedring.get_ring_path(
+            'sysmon', ['a'], 1, 4, self.temp_dir.name))
+
+    def testInterruptedWrite(self):
+        path = os.path.join(self.temp_dir.name, 'ring')
+        writer = sharedring.SharedRing(path, ['a'], 1, 4)
+        reader = sharedring.SharedRing(path, ['a'], 1, 4)
+        self.addCleanup(lambda: [r.close() for r in (writer, reader)])
+        self.assertTrue(writer.lock())
+        writer.initialize()
+        writer.append((1,))
+        # the writer died in the middle of a write
+        sharedring.COUNTER.pack_into(writer.map, sharedring.SEQUENCE_OFFSET,
+                                     3)
+        writer.close()
+
+        # readers give up, instead of waiting forever
+        reader.retries = 10
+        self.assertTrue(reader.attach())
+        with self.assertRaises(TimeoutError):
+            reader.read()
+
+        # the next writer starts the ring again
+        self.assertTrue(reader.lock())
+        reader.initialize()
+        self.assertEqual(reader.read(), (0, []))
+        reader.append((2,))
+        self.assertEqual(reader.read(), (1, [(2,)]))
+
+    def testStoppedWriter(self):
+        # a writer stopped in the middle of a write (holding the lock)
+        proc = self.get_sampler('load')
+        ring = sharedring.SharedRing(proc.open().path, proc.schema, 4,
+                                     proc.capacity)
+        self.addCleanup(ring.close)
+        self.assertTrue(ring.lock())
+        ring.initialize()
+        ring.append((1, 2, 3, 4))
+        sharedring.COUNTER.pack_into(ring.map, sharedring.SEQUENCE_OFFSET, 3)
+
+        proc.start()
+        self.assertEqual(proc.role, 'reader')
+        proc.ring.retries = 10
+        snapshots = proc.get_snapshots()
+        self.assertEqual(proc.role, 'local')
+        self.assertEqual(snapshots[-1].records['load'], (0.52, 0.58, 0.59))
+
+        # as when the ring can not be opened
+        other = self.get_sampler('load')
+
+        def open_ring():
+            raise PermissionError("the ring belongs to another user")
+        other.open = open_ring
+        other.start()
+        self.assertEqual(other.role, 'local')
+        self.assertEqual(other.get_snapshots()[-1].records['load'],
+                         (0.52, 0.58, 0.59))
+
+    def testRoles(self):
+        first = self.get_sampler('system', 'load')
+        first.start()
+        second = self.get_sampler('system', 'load')
+        second.start()
+        self.assertEqual((first.role, second.role), ('writer', 'reader'))
+
+        # the reader gets the history written so far
+        snapshots = second.get_snapshots(100)
+        self.assertGreaterEqual(len(snapshots), 1)
+        self.assertEqual(snapshots[-1].records['load'], (0.52, 0.58, 0.59))
+        self.assertEqual(snapshots[-1].records['system'][1:], (75, 2000))
+
+        # other collectors use another ring
+        third = self.get_sampler('load')
+        third.start()
+        self.assertEqual(third.role, 'writer')
+
+        # the reader takes over once the writer is gone
+        first.stop()
+        second.patience = 0
+        for __ in range(300):
+            second.get_snapshots()
+            if second.role == 'writer':
+                break
+            time.sleep(0.01)
+        self.assertEqual(second.role, 'writer')
+        self.assertIsNone(second.error)
+
+    def testHistory(self):
+        first = self.get_sampler('load', capacity=8)
+        first.start()
+        for __ in range(100):
+            if first.ring.count >= 8:
+                break
+            time.sleep(0.01)
+        first.stop()
+
+        # a new instance starts with the history of the previous ones
+        second = self.get_sampler('load', capacity=8)
+        second.start()
+        snapshots = second.get_snapshots(5)
+        self.assertEqual(len(snapshots), 5)
+        self.assertEqual(snapshots, sorted(snapshots))
+        self.assertEqual(second.get_snapshots(5), [])
+
+
+class LayoutTestCase(unittest.TestCase):
+
+    def testAlignment(self):
+        block = layout.layout("\033[32m中文\033[0m\nab", 10, 0, 'center')
+        self.assertEqual(block.width, 4)
+        self.assertEqual(block.x, 3)
+
+        block = layout.layout("ab\nabcd", 10, 6, 'center', 'center')
+        self.assertEqual(block.lines, ("ab  ", "abcd"))
+        self.assertEqual((block.width, block.height), (4, 2))
+        self.assertEqual((block.x, block.y), (3, 2))
+        self.assertEqual(block.text, "   ab  \n   abcd")
+        block = layout.layout("ab", 10, 6, 'right', 'bottom')
+        self.assertEqual((block.x, block.y), (8, 5))
+        # blocks larger than the terminal stay in the corner
+        block = layout.layout("a b c d e f", 3, 2, 'center', 'center')
+        self.assertEqual((block.x, block.y), (0, 0))
+
+    def testMemoized(self):
+        text = "memoized %d" % random.random()
+        first = layout.layout(text, 80, 25, 'center')
+        hits = layout.layout.cache_info().hits
+        self.assertIs(layout.layout(text, 80, 25, 'center'), first)
+        self.assertEqual(layout.layout.cache_info().hits, hits + 1)
+        self.assertIsNot(layout.layout(text, 40, 25, 'center'), first)
+
+
+def emulate_terminal(rows, data):
+    """
+    Applies the output of a renderer to the rows (lists of characters) of a
+    minimal terminal, supporting only the sequences used by the renderer
+    (attributes are ignored).
+    """
+    x = y = 0
+    i = 0
+    while i < len(data):
+        char = data[i]
+        i += 1
+        if char != "\033":
+            rows[y][x] = char
+            x = min(x + 1, len(rows[y]) - 1)
+            continue
+        if data[i] == '(':
+            i += 2
+            continue
+        end = i + 1
+        while not data[end].isalpha() and data[end] != '@':
+            end += 1
+        params, command = data[i + 1:end], data[end]
+        i = end + 1
+        count = int(params or 1) if ';' not in params else 0
+        if command == 'H':
+            y, x = [int(value) - 1 for value in (params or "1;1").split(';')]
+        elif command == 'G':
+            x = count - 1
+        elif command == 'J':
+            for row in rows:
+                row[:] = [' '] * len(row)
+        elif command == 'P':
+            rows[y][x:] = rows[y][x + count:] + [' '] * count
+        elif command == '@':
+            rows[y][x:] = ([' '] * count + rows[y][x:])[:len(rows[y]) - x]
+    return '\n'.join([''.join(row) for row in rows])
+
+
+class RendererTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.screen = renderer.RendererHelperBase()
+        self.screen.get_terminal_size = lambda: None
+        self.screen.geometry = {'x': 20, 'y': 5}
+        self.stdout = sys.stdout
+        sys.stdout = io.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+
+    def render(self, text, x=0, y=0):
+        sys.stdout.seek(0)
+        sys.stdout.truncate()
+        self.screen.begin_frame()
+        self.screen.draw(text, x, y)
+        self.screen.render()
+        return sys.stdout.getvalue()
+
+    def testDraw(self):
+        frame = renderer.FrameBuffer(6, 2)
+        self.assertEqual(frame.draw("ab\n\033[31mc\033[0md", 1), (3, 1))
+        self.assertEqual(frame.get_text(), " ab   \n cd   ")
+        self.assertEqual(frame.rows[1][1], "\033[31mc")
+        self.assertEqual(frame.rows[1][2], "d")
+
+        # wide characters use two cells, and are clipped (not wrapped)
+        self.assertEqual(frame.draw("\u4e2d\u6587", 3), (7, 0))
+        self.assertEqual(frame.rows[0][3:], ["\u4e2d", "", " "])
+        self.assertEqual(frame.get_text().split("\n")[0], " ab\u4e2d ")
+
+        # overwriting half of a wide character blanks the other half
+        frame.draw("y", 4)
+        self.assertEqual(frame.get_text().split("\n")[0], " ab y ")
+
+    def testAttributes(self):
+        self.assertEqual(renderer.apply_sgr([], "1;31"), ["1", "31"])
+        self.assertEqual(renderer.apply_sgr(["1", "31"], "32"), ["1", "32"])
+        self.assertEqual(renderer.apply_sgr(["7"], "27"), [])
+        self.assertEqual(renderer.apply_sgr(["1"], "38;5;196"),
+            ["1", "38;5;196"])
+        self.assertEqual(renderer.apply_sgr(["1", "31"], ""), [])
+
+    def testRenderOnlyChanges(self):
+        first = self.render("12:00:00", 5, 2)
+        self.assertIn("\033[2J", first)
+        self.assertIn("12:00:00", first)
+
+        # nothing changed, nothing written
+        self.assertEqual(self.render("12:00:00", 5, 2), "")
+
+        # a single changed cell is addressed directly
+        self.assertEqual(self.render("12:00:01", 5, 2), "\033[3;13H1")
+
+        # close changes are written in a single run
+        self.assertEqual(self.render("12:00:10", 5, 2), "\033[3;12H10")
+
+        # moved text erases the previous cells
+        output = self.render("12:00:10", 0, 0)
+        self.assertIn("\033[1;1H12:00:10", output)
+        self.assertIn("\033[3;6H", output)
+        self.assertNotIn("\033[2J", output)
+
+    def testScrollLeft(self):
+        rows = [[' '] * 20 for __ in range(5)]
+        emulate_terminal(rows, self.render("abcdefgh|xy\n12345678|zw", 0, 1))
+
+        for char in "ij":
+            sys.stdout.seek(0)
+            sys.stdout.truncate()
+            self.screen.scroll_left(0, 1, 8, 2)
+            self.screen.draw(char + "\n" + char, 7, 1)
+            self.screen.render()
+            output = sys.stdout.getvalue()
+            # only the scroll and the new column are written
+            self.assertIn("\033[1P", output)
+            self.assertNotIn("fgh", output)
+            text = emulate_terminal(rows, output)
+            self.assertEqual(text, self.screen.frame.get_text())
+        self.assertEqual(text.split("\n")[1:3],
+                         ["cdefghij|xy         ", "345678ij|zw         "])
+
+    def testRenderInvalidate(self):
+        self.render("abc")
+        self.screen.invalidate()
+        self.assertIn("\033[2J", self.render("abc"))
+
+        # a new terminal size also redraws everything
+        self.screen.geometry = {'x': 30, 'y': 5}
+        self.assertIn("\033[2J", self.render("abc"))
+
+
+class SchedulerTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 100.0
+        self.calls = []
+
+    def clock(self):
+        return self.now
+
+    def wait(self, timeout):
+        self.now += timeout
+        return False
+
+    def callback(self, cost=0):
+        def run():
+            self.calls.append(self.now)
+            self.now += cost
+        return run
+
+    def testNoDrift(self):
+        s = scheduler.FrameScheduler(clock=self.clock, wait=self.wait)
+        s.add(1, self.callback(0.3))
+        for __ in range(5):
+            s.step()
+        self.assertEqual(self.calls, [100.0, 101.0, 102.0, 103.0, 104.0])
+        self.assertEqual(s.skipped, 0)
+
+    def testSkipFrames(self):
+        s = scheduler.FrameScheduler(clock=self.clock, wait=self.wait)
+        s.add(1, self.callback(2.5))
+        for __ in range(3):
+            s.step()
+        # late frames run right away, but the ones missed entirely are skipped
+        self.assertEqual(self.calls, [100.0, 102.5, 105.0])
+        self.assertEqual(s.skipped, 4)
+        self.assertEqual(s.ticks[0][2], 107.0)
+
+    def testFpsCap(self):
+        s = scheduler.FrameScheduler(fps=10, clock=self.clock, wait=self.wait)
+        s.add(0, self.callback())
+        for __ in range(3):
+            s.step()
+        self.assertEqual([round(t, 6) for t in self.calls],
+            [100.0, 100.1, 100.2])
+
+    def testWake(self):
+        s = scheduler.FrameScheduler()
+        s.add(60, self.callback())
+        self.assertEqual(s.step(), 1)
+        s.wake()
+        # interrupted wait, nothing run
+        self.assertEqual(s.step(), 0)
+        s.close()
+
+    def testRedraw(self):
+        s = scheduler.FrameScheduler()
+        s.add(60, self.callback())
+        s.step()
+        deadline = s.ticks[0][2]
+        s.redraw()
+        # all ticks run right away, keeping their schedule
+        self.assertEqual(s.step(), 1)
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(s.ticks[0][2], deadline)
+        s.close()
+
+    def testResizeListener(self):
+        s = scheduler.FrameScheduler()
+        s.add(60, self.callback())
+        s.step()
+        position.add_resize_listener(s.redraw)
+        try:
+            position._on_resize(None, None)
+        finally:
+            position.remove_resize_listener(s.redraw)
+        # redrawn without waiting for the next deadline
+        self.assertEqual(s.step(), 1)
+        self.assertEqual(len(self.calls), 2)
+        s.close()
+
+
+class TypingHelperTestCase(unittest.TestCase):
+
+    class Output(io.StringIO):
+        writes = 0
+
+        def write(self, data):
+            self.writes += 1
+            return io.StringIO.write(self, data)
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = self.Output()
+        self.t = typing.TypingHelperBase()
+        self.t.delay = 0.001
+        self.t.line_delay = 0.002
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+
+    def testTypingPrint(self):
+        text = "abc de\n" * 30
+        self.t.typing_print(text)
+        self.assertEqual(sys.stdout.getvalue(), text + "\n")
+        # characters are written in batches, not one by one
+        self.assertLess(sys.stdout.writes, len(text) / 2)
+
+    def testTypingBudget(self):
+        # 150 characters (blank spaces are free) and 30 new lines
+        self.assertAlmostEqual(self.t._typing_write(["abc de\n" * 30]),
+            0.15 + 0.06)
+
+    def testTypingPrintStream(self):
+        text = "caf\u00e9 \u4e2d\u6587\n" * 20
+        data = text.encode('utf-8')
+        consumed = []
+
+        def chunks():
+            # split in the middle of multi-byte characters
+            for i in range(0, len(data), 5):
+                consumed.append(i)
+                yield data[i:i + 5]
+            yield "done"
+
+        self.t.typing_print_stream(chunks())
+        self.assertEqual(sys.stdout.getvalue(), text + "done")
+        self.assertEqual(len(consumed), (len(data) + 4) // 5)
+
+        # invalid data does not break typing
+        sys.stdout = self.Output()
+        self.t.typing_print_stream([b"a\xff", b"b"])
+        self.assertEqual(sys.stdout.getvalue(), "a\ufffdb")
+
+    def testTypingDraw(self):
+
+        class Screen(renderer.RendererHelperBase, typing.TypingHelperBase):
+            renders = 0
+
+            def render(self):
+                self.renders += 1
+                renderer.RendererHelperBase.render(self)
+
+        screen = Screen()
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': 10, 'y': 12}
+        screen.delay, screen.line_delay = self.t.delay, self.t.line_delay
+        text = "abc de\n" * 9 + "abc de"
+        self.assertAlmostEqual(screen.typing_draw(text, 2, 1), 0.05 + 0.02)
+        self.assertEqual(screen.frame.get_text().split("\n")[1:11],
+                         ["  abc de  "] * 10)
+        # characters are drawn and rendered in batches, not one by one
+        self.assertLess(screen.renders, len(text) / 2)
+
+
+class MatrixTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        self.argv = sys.argv
+        sys.argv = ['termsaver', 'matrix', '-z']
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        sys.argv = self.argv
+
+    def testLines(self):
+        screen = registry.find_screen('matrix', manifest_path=None)(
+            parser=argparse.ArgumentParser())._parse_args(False)
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': 80, 'y': 20}
+        random.seed(1)
+        for __ in range(30):
+            screen._run_cycle()
+        lines = sys.stdout.getvalue().split("\n")
+        self.assertEqual(len(lines), 31)
+        # full-width characters, each one taking two columns
+        for line in lines[:-1]:
+            self.assertEqual(len(line), 40)
+            self.assertTrue(set(line) <= set(screen.digmap + [screen.space]))
+
+
+class MatrixRainTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        self.argv = sys.argv
+        sys.argv = ['termsaver', 'matrix', '--rain']
+        # 256 color palette
+        self.colorterm = os.environ.pop('COLORTERM', None)
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        sys.argv = self.argv
+        if self.colorterm is not None:
+            os.environ['COLORTERM'] = self.colorterm
+
+    def get_screen(self, width):
+        screen = registry.find_screen('matrix', manifest_path=None)(
+            parser=argparse.ArgumentParser())._parse_args(False)
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': width, 'y': 20}
+        screen.granularity = 0  # no new drops
+        random.seed(1)
+        screen.begin_frame()
+        screen.drops = [[10, -1.0, 1.0, 6, [1, 2, 3, 4, 5]]]
+        return screen
+
+    def testRain(self):
+        sizes = []
+        for width in (80, 400):
+            screen = self.get_screen(width)
+            for __ in range(10):
+                screen.rain_cycle()
+            sizes.append(screen.last_render_size)
+
+            column = [row[10] for row in screen.frame.rows]
+            # bright head, fading trail and erased tail
+            self.assertTrue(column[9].startswith("\033[1;38;5;231m"))
+            self.assertTrue(column[8].startswith("\033[38;5;46m"))
+            self.assertTrue(column[4].startswith("\033[38;5;22m"))
+            self.assertEqual(column[3], " ")
+            self.assertEqual(column[10], " ")
+
+        # the output depends on the drops, not on the terminal width
+        self.assertEqual(sizes[0], sizes[1])
+        self.assertLess(sizes[0], 200)
+
+    def testRainDrops(self):
+        first = self.get_screen(80)
+        second = registry.find_screen('matrix', manifest_path=None)(
+            parser=argparse.ArgumentParser())._parse_args(False)
+        # drops are never shared between screens
+        self.assertEqual(second.drops, [])
+        self.assertIsNot(second.drops, first.drops)
+        self.assertIsNot(second.drops, type(second).drops)
+
+    def testRainAboveScreen(self):
+        screen = self.get_screen(80)
+        screen.drops = [[10, -1.0, 0.5, 6, [1, 2, 3, 4, 5]]]
+        # the head only reaches the first row after a whole row
+        screen.rain_cycle()
+        self.assertEqual(screen.frame.rows[0][10], " ")
+        screen.rain_cycle()
+        self.assertTrue(screen.frame.rows[0][10].startswith("\033[1;"))
+        screen.rain_cycle()
+        screen.rain_cycle()
+        self.assertTrue(screen.frame.rows[1][10].startswith("\033[1;"))
+
+
+class SysmonTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        self.argv = sys.argv
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'load')
+        with open(self.path, 'w') as f:
+            f.write("0")
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        sys.argv = self.argv
+        self.temp_dir.cleanup()
+
+    def get_screen(self, *args, width=40):
+        sys.argv = ['termsaver', 'sysmon'] + list(args)
+        screen = registry.find_screen('sysmon', manifest_path=None)(
+            parser=argparse.ArgumentParser())._parse_args(False)
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': width, 'y': 24}
+        return screen
+
+    def sample(self, screen, value):
+        with open(self.path, 'w') as f:
+            f.write("%d" % value)
+        screen._run_cycle()
+
+    def testHistory(self):
+        first = self.get_screen('-p', self.path)
+        second = self.get_screen('-p', self.path)
+        for value in range(50):
+            self.sample(first, value)
+        self.sample(second, 7)
+
+        # each screen keeps its own history, limited to the chart width
+        self.assertEqual(len(first.samples), 35)
+        self.assertEqual(first.samples.series('extra'),
+                         [float(value) for value in range(15, 50)])
+        self.assertEqual(first.samples.max('extra'), 49)
+        self.assertEqual(second.samples.series('extra'), [7])
+
+        first.geometry['x'] = 20
+        self.sample(first, 50)
+        self.assertEqual(first.samples.series('extra'),
+                         [float(value) for value in range(36, 51)])
+
+    def testCollectors(self):
+        sys.argv = ['termsaver', 'sysmon', '-c', 'load,temp']
+        screen = registry.find_screen('sysmon', manifest_path=None)(
+            parser=argparse.ArgumentParser())
+        screen.proc_root, screen.sys_root = PROC_FIXTURE, SYS_FIXTURE
+        screen._parse_args(False)
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': 60, 'y': 24}
+        self.addCleanup(screen._on_keyboard_interrupt)
+        screen._run_cycle()
+
+        self.assertEqual(screen.samples.fields,
+                         ('time', 'load.load1', 'temp.max'))
+        text = screen.frame.get_text().split("\n")
+        self.assertEqual(text[0].strip(), "Load Average")
+        self.assertEqual(text[1].strip(), "0.52")
+        self.assertIn("Temperature (max)", text[10])
+        self.assertEqual(text[11].strip(), "52C")
+        self.assertEqual(text[20].strip(), "Load: 0.52 0.58 0.59")
+        self.assertIn("acpitz1 30C", text[21])
+
+        self.assertRaises(exception.InvalidOptionException,
+                          self.get_screen, '-c', 'system,foo')
+
+    def testShared(self):
+        screens = []
+        for __ in range(2):
+            sys.argv = ['termsaver', 'sysmon', '-s', '-c', 'load', '-d',
+                        '0.01']
+            screen = registry.find_screen('sysmon', manifest_path=None)(
+                parser=argparse.ArgumentParser())
+            screen.proc_root, screen.sys_root = PROC_FIXTURE, SYS_FIXTURE
+            screen.shared_dir = self.temp_dir.name
+            screen._parse_args(False)
+            screen.get_terminal_size = lambda: None
+            screen.geometry = {'x': 60, 'y': 24}
+            self.addCleanup(screen._on_keyboard_interrupt)
+            screens.append(screen)
+
+        screens[0]._run_cycle()
+        time.sleep(0.1)
+        screens[1]._run_cycle()
+        self.assertEqual(screens[1].sampler.role, 'reader')
+        # the second screen starts with the history of the first one
+        self.assertGreater(len(screens[1].samples), 1)
+        self.assertEqual(screens[1].samples.last('load.load1'), 0.52)
+
+    def testWindow(self):
+        screen = self.get_screen('-p', self.path, '-w', '1m')
+        self.assertEqual(screen.window, 60)
+        for value in range(100):
+            self.sample(screen, value)
+        # all samples are in the window, merged into the 35 columns
+        history = screen.get_history()
+        self.assertEqual(len(history), 35)
+        self.assertEqual(history.max('extra'), 99)
+        self.assertEqual(history.first('extra:min'), 0)
+        self.assertIs(screen.get_history(), history)
+
+        # each column is drawn with its range (dimmed above its lowest)
+        self.assertIn(screen.charts['extra'].dimmed,
+                      sum(screen.frame.rows, []))
+
+        self.assertRaises(exception.InvalidOptionException,
+                          self.get_screen, '-p', self.path, '-w', '1x')
+
+    def testTop(self):
+        sys.argv = ['termsaver', 'sysmon', '-c', 'load', '-t', '2']
+        screen = registry.find_screen('sysmon', manifest_path=None)(
+            parser=argparse.ArgumentParser())
+        screen.proc_root, screen.sys_root = PROC_FIXTURE, SYS_FIXTURE
+        screen._parse_args(False)
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': 80, 'y': 24}
+        self.addCleanup(screen._on_keyboard_interrupt)
+        screen._run_cycle()
+
+        # the charts leave room for the processes on their right
+        self.assertEqual(screen.samples.capacity, 80 - 36 - 5)
+        text = screen.frame.get_text().split("\n")
+        self.assertEqual(text[0][44:].split(), ["PID", "CPU%", "MEM",
+                                                "COMMAND"])
+        self.assertEqual(len(text[1][44:].split()), 4)
+        self.assertEqual(text[3][44:].strip(), "")
+        self.assertIn("scan: 3/3", text[4])
+        self.assertEqual(text[0][:44].strip(), "Load Average")
+
+        self.assertRaises(exception.InvalidOptionException,
+                          self.get_screen, '-t', '-1')
+
+    def testStream(self):
+        path = os.path.join(self.temp_dir.name, 'fifo')
+        os.mkfifo(path)
+        screen = self.get_screen('-S', path, width=60)
+        self.addCleanup(screen._on_keyboard_interrupt)
+        screen._run_cycle()
+        self.assertIn("Waiting for values", screen.frame.get_text())
+
+        writer = os.open(path, os.O_WRONLY)
+        self.addCleanup(os.close, writer)
+        os.write(writer, b"".join([b"%d\n" % i for i in range(1000)]))
+        screen._run_cycle()
+        self.assertEqual(screen.samples.last('stream.value'), 499.5)
+        os.write(writer, b"-500\nrps=20\n")
+        screen._run_cycle()
+        screen._run_cycle()
+        # values are charted from the lowest one
+        self.assertEqual(screen.samples.fields,
+                         ('time', 'stream.value', 'stream.rps'))
+        self.assertEqual(screen.samples.series('stream.value'),
+                         [499.5, -500, -500])
+        self.assertEqual(screen.samples.series('stream.rps'), [0, 20, 20])
+        text = screen.frame.get_text().split("\n")
+        self.assertEqual(text[1].strip(), "500")
+        self.assertEqual(text[20].strip(), "value: no new values")
+        self.assertEqual(text[21].strip(), "rps: no new values")
+
+        self.assertRaises(exception.InvalidOptionException,
+                          self.get_screen, '-S', path, '-p', self.path)
+
+    def testScrolling(self):
+        for args in (['-n'], []):
+            screen = self.get_screen('-p', self.path, *args)
+            rows = [[' '] * 40 for __ in range(24)]
+            sizes = []
+            for value in range(80):
+                sys.stdout.seek(0)
+                sys.stdout.truncate()
+                self.sample(screen, (value * 37) % 60 + 20)
+                sizes.append(len(sys.stdout.getvalue()))
+                # the terminal shows exactly the frame
+                self.assertEqual(
+                    emulate_terminal(rows, sys.stdout.getvalue()),
+                    screen.frame.get_text())
+            if not args:
+                continue
+            # once full, the chart scrolls (instead of being written again)
+            self.assertLess(max(sizes[40:]), 35 * 5)
+
+
+class ClockTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.stdout = sys.stdout
+        sys.stdout = io.StringIO()
+        self.argv = sys.argv
+
+    def tearDown(self):
+        sys.stdout = self.stdout
+        sys.argv = self.argv
+
+    def get_screen(self, *args):
+        sys.argv = ['termsaver', 'clock'] + list(args)
+        screen = registry.find_screen('clock', manifest_path=None)(
+            parser=argparse.ArgumentParser())._parse_args(False)
+        screen.get_terminal_size = lambda: None
+        screen.geometry = {'x': 80, 'y': 24}
+        return screen
+
+    def run_cycle(self, screen, *moment):
+        screen.time_source = lambda: datetime.datetime(2024, 1, 2, *moment)
+        screen._run_cycle()
+        return screen.last_render_size
+
+    def testGlyphs(self):
+        screen = self.get_screen()
+        rows = screen.get_ascii_time(datetime.datetime(2024, 1, 2, 12, 34, 56))
+        rows = rows.split("\n")
+        self.assertEqual(len(rows), screen.lineindigimap + 1)
+        for i, row in enumerate(rows[:-1]):
+            self.assertEqual(row, ''.join([screen.digmap[c].split("\n")[i]
+                                           for c in "12:34:56"]))
+
+        screen = self.get_screen('-b', '-s', '1')
+        rows = screen.get_binary_coded_clock(
+            datetime.datetime(2024, 1, 2, 12, 34, 59)).split("\n")
+        # one column per digit, the bits of 1, 2, 3, 4, 5 and 9
+        self.assertEqual(rows[:8], [
+            "          # ", "            ",
+            "      # #   ", "            ",
+            "  # #       ", "            ",
+            "#   #   # # ", "            "])
+
+    def testChangedDigits(self):
+        screen = self.get_screen()
+        first = self.run_cycle(screen, 12, 34, 56)
+        second = self.run_cycle(screen, 12, 34, 57)
+        # only the last digit is drawn again
+        self.assertLess(second, first / 5)
+
+        fresh = self.get_screen()
+        self.run_cycle(fresh, 12, 34, 57)
+        self.assertEqual(screen.frame.get_text(), fresh.frame.get_text())
+
+    def testCentered(self):
+        screen = self.get_screen()
+        self.run_cycle(screen, 12, 34, 56)
+        rows = [row for row in screen.frame.get_text().split("\n")
+                if row.strip()]
+        # the date and the clock are centered apart (the clock is wider)
+        date = rows[0].rstrip()
+        self.assertEqual(date.strip(), "Tuesday, 2nd January 2024")
+        self.assertEqual(len(date) - len(date.lstrip()),
+                         (80 - len(date.strip()) + 1) // 2)
+        clock = rows[1].rstrip()
+        self.assertLess(len(clock) - len(clock.lstrip()),
+                        len(date) - len(date.lstrip()))
+
+    def simulate(self, screen, seconds):
+        """
+        Runs the screen ticks on a scheduler with simulated clocks for the
+        informed seconds, returning what the clock displayed on each tick.
+        Waits oversleep a bit, cycles take some time, and the wall clock
+        runs slightly faster than the monotonic one.
+        """
+        random.seed(1)
+        clocks = {'mono': 1000.0, 'wall': 1700000000.37}
+
+        def advance(seconds):
+            clocks['mono'] += seconds
+            clocks['wall'] += seconds * 1.00005
+
+        def wait(timeout):
+            advance(timeout + random.uniform(0, 0.02))
+            return False
+
+        displayed = []
+
+        def cycle():
+            displayed.append(screen.get_clock_text(screen.get_time()))
+            advance(random.uniform(0, 0.005))
+
+        screen.time_source = lambda: datetime.datetime.fromtimestamp(
+            clocks['wall'], datetime.timezone.utc)
+        s = scheduler.FrameScheduler(clock=lambda: clocks['mono'], wait=wait,
+                                     wall_clock=lambda: clocks['wall'])
+        for interval, aligned in screen.ticks.values():
+            s.add(interval, cycle, aligned)
+        end = clocks['wall'] + seconds
+        while clocks['wall'] < end:
+            s.step()
+        self.assertEqual(s.skipped, 0)
+        return displayed
+
+    def testSecondBoundaries(self):
+        displayed = self.simulate(self.get_screen(), 24 * 3600)
+        seconds = [int(h) * 3600 + int(m) * 60 + int(s)
+                   for h, m, s in [t.split(':') for t in displayed]]
+        # every second of the day shown exactly once, in order
+        self.assertGreater(len(seconds), 24 * 3600)
+        for previous, current in zip(seconds, seconds[1:]):
+            self.assertEqual((current - previous) % (24 * 3600), 1)
+
+    def testBlinkingSeparator(self):
+        displayed = self.simulate(self.get_screen('-m'), 3600)
+        # the separator blinks every half second, and minutes are not lost
+        self.assertGreater(len(displayed), 2 * 3600)
+        for previous, current in zip(displayed, displayed[1:]):
+            self.assertNotEqual(':' in previous, ':' in current)
+        self.assertEqual(len(set([t.replace(' ', ':') for t in displayed])),
+                         61)
+
+    def testFont(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'test.flf')
+            FigletTestCase.make_font(path)
+            screen = self.get_screen('-f', path)
+        self.assertEqual(screen.lineindigimap, 2)
+        self.run_cycle(screen, 12, 34, 56)
+        text = screen.frame.get_text()
+        self.assertIn("1 12 2: :3 34 4: :5 56 6", text)
+        self.assertIn("11 22 :: 33 44 :: 55 66", text)
+
+
 if __name__ == '__main__':
     unittest.main()